@@ -1,22 +0,0 @@
-from celery.schedules import crontab
-
-# Task settings
-task_serializer = 'json'
-accept_content = ['json']
-result_serializer = 'json'
-timezone = 'UTC'
-enable_utc = True
-
-# Beat schedule
-beat_schedule = {
-    'cleanup-expired-sessions': {
-        'task': 'cleanup_expired_sessions',
-        # Run every day at midnight UTC
-        'schedule': crontab(hour=0, minute=0),
-    },
-    'cleanup-expired-password-resets': {
-        'task': 'cleanup_expired_password_resets',
-        # Run every hour
-        'schedule': crontab(minute=0),
-    },
-} 
\ No newline at end of file
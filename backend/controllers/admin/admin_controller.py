@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Request, Path
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from core.database import get_db
 from services.admin.admin_service import AdminService
 from core.roles import UserRole
-from schemas.user import UserResponse
+from schemas.user import UserResponse, NearbyUsersResponse, UserImportResponse
+from services.user.nearby_user_service import NearbyUserService
+from services.user.user_import_service import UserImportService
+from services.user.account_erasure_service import AccountErasureService
+from schemas.base import BaseResponse
+from schemas.account_erasure import AccountErasureResponse
 from core.logger import logger
 
 router = APIRouter()
@@ -128,4 +134,184 @@ async def get_payments(
         status=status,
         payment_type=payment_type,
         user_email=user_email
-    ) 
\ No newline at end of file
+    ) 
+@router.get("/users/area", response_model=NearbyUsersResponse)
+async def get_users_in_area(
+    min_latitude: Optional[float] = Query(None, ge=-90, le=90, description="South edge of the area"),
+    max_latitude: Optional[float] = Query(None, ge=-90, le=90, description="North edge of the area"),
+    min_longitude: Optional[float] = Query(None, ge=-180, le=180, description="West edge of the area (greater than max_longitude across the antimeridian)"),
+    max_longitude: Optional[float] = Query(None, ge=-180, le=180, description="East edge of the area"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90, description="Center latitude, for a radius search"),
+    longitude: Optional[float] = Query(None, ge=-180, le=180, description="Center longitude, for a radius search"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Radius in km, for a radius search"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of users to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(True, description="Also count all matching users"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    List and count users located in a bounding box or within a radius.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+
+    box = (min_latitude, max_latitude, min_longitude, max_longitude)
+    radius = (latitude, longitude, radius_km)
+    nearby_user_service = NearbyUserService(db)
+    if all(value is not None for value in radius):
+        result = nearby_user_service.search_radius(latitude, longitude, radius_km, limit=limit, cursor=cursor)
+        total = nearby_user_service.count_radius(latitude, longitude, radius_km) if include_total else None
+    elif all(value is not None for value in box):
+        if min_latitude > max_latitude:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_latitude cannot be greater than max_latitude"
+            )
+        result = nearby_user_service.search_box(*box, limit=limit, cursor=cursor)
+        total = nearby_user_service.count_box(*box) if include_total else None
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass either all four bounding box edges or latitude, longitude and radius_km"
+        )
+
+    return {
+        "message": "Users found successfully",
+        "status": "success",
+        "total": total,
+        **result
+    }
+
+@router.post("/users/import", response_model=UserImportResponse)
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, description="File format: 'csv' (with a header row) or 'ndjson'; defaults from the Content-Type"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Create user accounts in bulk from a CSV or NDJSON request body.
+    Each row takes the registration fields; invalid rows are reported without aborting the import.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    content = await request.body()
+
+    # Hashing and inserting take seconds; keep the event loop free meanwhile
+    result = await run_in_threadpool(UserImportService(db).import_users, content, format)
+    logger.info(f"Admin {current_user.email} imported {result['imported']} of {result['total_rows']} users")
+    return {
+        "message": "Users imported successfully" if not result["failed"] else "Users imported with errors",
+        "status": "success",
+        **result
+    }
+
+@router.post("/users/{user_id}/erasure", response_model=BaseResponse, status_code=status.HTTP_202_ACCEPTED)
+async def erase_user(
+    user_id: int = Path(..., description="ID of the user whose account is erased"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Enqueue the erasure of a user account: sessions, tokens, notifications and location are
+    deleted, payment and subscription records are stripped of personal data, and the user is
+    anonymized. An unfinished erasure of the user is resumed. Poll the returned erasure id for progress.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    if current_user.id == user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Admins cannot erase their own account"
+        )
+
+    result = AccountErasureService(db).enqueue_erasure(user_id, requested_by=current_user.id)
+    logger.info(f"Admin {current_user.email} requested the erasure of user {user_id}")
+    return {
+        "message": "Account erasure enqueued",
+        "status": "success",
+        "data": result
+    }
+
+@router.get("/users/erasures/{erasure_id}", response_model=AccountErasureResponse)
+async def get_user_erasure_progress(
+    erasure_id: int = Path(..., description="Erasure ID returned by POST /admin/users/{user_id}/erasure"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get the progress of an account erasure: current step, rows processed and throughput.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+
+    return {
+        "message": "Account erasure progress",
+        "status": "success",
+        "data": AccountErasureService(db).get_progress(erasure_id)
+    }
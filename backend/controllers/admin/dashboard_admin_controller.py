@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from core.database import get_db
 from services.admin.admin_service import AdminService
 from core.roles import UserRole
 from core.logger import logger
+from core.response_cache import get_cache_stats
+from core.fragment_cache import METRIC_NAME as FRAGMENT_METRIC_NAME
+from core.chunked_job import METRIC_NAME as MAINTENANCE_METRIC_NAME, get_last_run
+from core.metrics import get_metrics
+from core.celery_app import TASK_METRIC_NAME
+from core.unique_task import METRIC_NAME as UNIQUE_TASK_METRIC_NAME
+from core.lease_lock import METRIC_NAME as LEASE_METRIC_NAME, get_lease_holder
+from core.outbox import METRIC_NAME as OUTBOX_METRIC_NAME, get_backlog
+from services.user.account_erasure_service import METRIC_NAME as ERASURE_METRIC_NAME
+from models.user_rollup import LEVEL_COUNTRY, LEVEL_STATE, LEVEL_CITY
+from schemas.user import DistributionDepth, UserDistributionResponse
+from services.user.user_rollup_service import UserRollupService
 
 router = APIRouter()
 
@@ -34,4 +46,316 @@ async def get_stats(
             detail="Only admin users can access this endpoint"
         )
     
-    return admin_service.get_dashboard_stats() 
\ No newline at end of file
+    return admin_service.get_dashboard_stats()
+
+@router.get("/cache-metrics", response_model=Dict[str, Any])
+async def get_cache_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get hit/miss counters and hit ratio of the geo response cache, per endpoint,
+    and of the row fragment cache, per dataset.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    
+    try:
+        return {
+            "response_cache": get_cache_stats(),
+            "fragment_cache": get_cache_stats(FRAGMENT_METRIC_NAME)
+        }
+    except Exception as e:
+        logger.error(f"Error getting cache metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error getting cache metrics"
+        )
+
+# Maintenance jobs running on ChunkedJob
+MAINTENANCE_JOBS = (
+    "cleanup_expired_sessions",
+    "check_session_activity",
+    "cleanup_inactive_users",
+    "cleanup_expired_tokens",
+    "cleanup_sent_outbox"
+)
+
+@router.get("/maintenance-metrics", response_model=Dict[str, Any])
+async def get_maintenance_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get run, chunk, row and error counters of the chunked maintenance jobs, and their last run.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    
+    try:
+        counters = get_metrics(MAINTENANCE_METRIC_NAME)
+        return {
+            job: {
+                "counters": {
+                    field.split(":", 1)[1]: value
+                    for field, value in counters.items()
+                    if field.startswith(f"{job}:")
+                },
+                "last_run": get_last_run(job)
+            }
+            for job in MAINTENANCE_JOBS
+        }
+    except Exception as e:
+        logger.error(f"Error getting maintenance metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error getting maintenance metrics"
+        )
+
+@router.get("/erasure-metrics", response_model=Dict[str, Any])
+async def get_erasure_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get the account erasure counters (erasures completed and failed, rows per step)
+    and the overall throughput in rows per second of batch time.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    
+    try:
+        counters = get_metrics(ERASURE_METRIC_NAME)
+        milliseconds = counters.get("milliseconds", 0)
+        return {
+            "counters": counters,
+            "rows_per_second": round(counters.get("rows", 0) * 1000 / milliseconds, 2) if milliseconds else None
+        }
+    except Exception as e:
+        logger.error(f"Error getting erasure metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error getting erasure metrics"
+        )
+
+@router.get("/task-metrics", response_model=Dict[str, Any])
+async def get_task_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get per-task run counts of the Celery workers, with the average total and database
+    time per run, the share of task time spent in the database and the duplicates
+    of unique tasks suppressed at enqueue time.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    
+    try:
+        tasks: Dict[str, Dict[str, int]] = {}
+        for metric_name in (TASK_METRIC_NAME, UNIQUE_TASK_METRIC_NAME):
+            for field, value in get_metrics(metric_name).items():
+                task, counter = field.rsplit(":", 1)
+                tasks.setdefault(task, {})[counter] = value
+
+        result = {}
+        for task, counters in sorted(tasks.items()):
+            runs = counters.get("runs", 0)
+            total_ms = counters.get("total_ms", 0)
+            db_ms = counters.get("db_ms", 0)
+            result[task] = {
+                **counters,
+                "avg_total_ms": round(total_ms / runs, 2) if runs else None,
+                "avg_db_ms": round(db_ms / runs, 2) if runs else None,
+                "db_share": round(db_ms / total_ms, 3) if total_ms else None
+            }
+        return result
+    except Exception as e:
+        logger.error(f"Error getting task metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error getting task metrics"
+        )
+
+@router.get("/outbox-metrics", response_model=Dict[str, Any])
+async def get_outbox_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get the outbox relay counters (messages published and failed) and the backlog of
+    unsent messages, with the age of the oldest one.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    
+    try:
+        return {
+            "counters": get_metrics(OUTBOX_METRIC_NAME),
+            "backlog": get_backlog(db)
+        }
+    except Exception as e:
+        logger.error(f"Error getting outbox metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error getting outbox metrics"
+        )
+
+@router.get("/lease-metrics", response_model=Dict[str, Any])
+async def get_lease_metrics(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get the lease counters of the scheduled jobs (leases acquired, runs skipped because
+    another process held the lease, leases lost while running) and their current holder.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+    
+    try:
+        jobs: Dict[str, Dict[str, int]] = {}
+        for field, value in get_metrics(LEASE_METRIC_NAME).items():
+            job, counter = field.rsplit(":", 1)
+            jobs.setdefault(job, {})[counter] = value
+        return {
+            job: {"counters": counters, "holder": get_lease_holder(job)}
+            for job, counters in sorted(jobs.items())
+        }
+    except Exception as e:
+        logger.error(f"Error getting lease metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error getting lease metrics"
+        )
+
+DEPTH_LEVELS = {
+    DistributionDepth.COUNTRY: LEVEL_COUNTRY,
+    DistributionDepth.STATE: LEVEL_STATE,
+    DistributionDepth.CITY: LEVEL_CITY
+}
+
+@router.get("/user-distribution", response_model=UserDistributionResponse)
+async def get_user_distribution(
+    depth: DistributionDepth = Query(DistributionDepth.STATE, description="Deepest level of the hierarchy"),
+    country_id: Optional[int] = Query(None, description="Only this country"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get active user counts per country, state and city, from the precomputed rollups.
+    Only accessible by admin users.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    
+    access_token = authorization.split(" ")[1]
+    admin_service = AdminService(db)
+    
+    # Get current user and verify admin role
+    current_user = admin_service.get_current_user(access_token)
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can access this endpoint"
+        )
+
+    distribution = UserRollupService(db).get_distribution(depth=DEPTH_LEVELS[depth], country_id=country_id)
+    return {
+        "message": "User distribution retrieved successfully",
+        "status": "success",
+        **distribution
+    }
@@ -1,38 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Header, Response
 from sqlalchemy.orm import Session
 from core.database import get_db
+from core.http_cache import dataset_etag, json_response, cache_headers
+from core.response_cache import get_or_build
+from core.config import settings
+from core.utils import parse_id_list
+from services.catalog.geo_resolver import GeoResolver
 from services.city.city_service import CityService
+from services.city.reverse_geocoder import ReverseGeocoder
+from services.city.state_service import StateService
+from services.import_job.import_job_service import ImportJobService
 from schemas.base import BaseResponse
-from schemas.city import CitySearchParams, CitySearchResponse, StateSearchResponse
+from schemas.city import CitySearchParams, CitySearchResponse, StateSearchResponse, CityResolveResponse, CityBatchResponse
+from schemas.city import ReverseGeocodeBatchRequest, ReverseGeocodeResponse, ReverseGeocodeBatchResponse
+from schemas.import_job import ImportJobResponse
 from typing import Optional
+import gzip
 
 router = APIRouter()
 
-@router.post("/init_cities", response_model=BaseResponse)
+@router.post("/init_cities", response_model=BaseResponse, status_code=status.HTTP_202_ACCEPTED)
 async def init_cities(db: Session = Depends(get_db)):
     """
     Initialize cities in the database.
-    This endpoint will populate the cities table with predefined data.
+    Enqueues a background job that populates the cities table with predefined data,
+    resuming an unfinished job from its last checkpoint. Poll the returned job id for progress.
     """
     try:
-        city_service = CityService(db)
-        result = await city_service.initialize_cities()
+        import_job_service = ImportJobService(db)
+        result = import_job_service.enqueue_import("cities")
         
         return {
-            "message": "Cities initialized successfully",
+            "message": "City initialization enqueued",
             "status": "success",
-            "data": {
-                "total_cities": result.get("total_cities", 0),
-                "added_cities": result.get("added_cities", 0),
-                "updated_cities": result.get("updated_cities", 0)
-            }
+            "data": result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.get("/init_cities/{job_id}", response_model=ImportJobResponse)
+async def get_init_cities_progress(
+    job_id: int = Path(..., description="Import job ID returned by POST /cities/init_cities"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the progress of a city initialization job.
+    Returns rows processed, throughput and ETA.
+    """
+    import_job_service = ImportJobService(db)
+    return {
+        "message": "Import job progress",
+        "status": "success",
+        "data": import_job_service.get_progress(job_id, dataset="cities")
+    }
+
 @router.get("/search", response_model=CitySearchResponse)
 async def search_cities(
     name: Optional[str] = Query(None, description="Partial name to search for"),
@@ -44,11 +70,14 @@ async def search_cities(
     wikiDataId: Optional[str] = Query(None, description="WikiData ID to filter by"),
     limit: int = Query(10, description="Maximum number of results to return"),
     offset: int = Query(0, description="Number of results to skip"),
+    etag: Optional[str] = Depends(dataset_etag("cities")),
     db: Session = Depends(get_db)
 ):
     """
     Search for cities with various filters.
     Returns a list of cities that match the search criteria.
+    Responses carry an ETag bound to the cities dataset version and are served
+    from the shared response cache when possible.
     """
     try:
         city_service = CityService(db)
@@ -63,7 +92,128 @@ async def search_cities(
             page=offset // limit + 1,
             per_page=limit
         )
-        return city_service.search_cities(search_params)
+        content = get_or_build(
+            "cities.search",
+            ("cities",),
+            search_params.cache_key(),
+            lambda: city_service.search_cities_json(search_params)
+        )
+        return json_response(content, etag)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/resolve", response_model=CityResolveResponse)
+async def resolve_city(
+    name: str = Query(..., min_length=1, description="Possibly misspelled city or state name"),
+    country_id: Optional[int] = Query(None, description="Country ID to filter by"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of candidates to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Resolve a city or state name, tolerating typos and missing accents.
+    Returns ranked candidates with similarity scores.
+    """
+    try:
+        city_service = CityService(db)
+        return city_service.resolve(name, country_id=country_id, limit=limit)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/reverse", response_model=ReverseGeocodeResponse)
+async def reverse_geocode(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude in degrees"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude in degrees"),
+    max_distance_km: Optional[float] = Query(None, gt=0, description="Ignore cities farther than this distance"),
+    etag: Optional[str] = Depends(dataset_etag("cities")),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the city nearest to a point, with its state, country and distance.
+    """
+    try:
+        reverse_geocoder = ReverseGeocoder(db)
+        result = reverse_geocoder.reverse([(latitude, longitude)], max_distance_km=max_distance_km)[0]
+        if result["city"] is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No city found near the given coordinates"
+            )
+        return {
+            "message": "City found successfully",
+            "status": "success",
+            "data": result
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.post("/reverse/batch", response_model=ReverseGeocodeBatchResponse)
+async def reverse_geocode_batch(
+    request: ReverseGeocodeBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the nearest city of many points at once.
+    Results are returned in the order of the points; points without a city within
+    max_distance_km have no city, state or country.
+    """
+    if len(request.points) > settings.REVERSE_GEOCODE_MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.REVERSE_GEOCODE_MAX_POINTS} points are allowed"
+        )
+
+    try:
+        reverse_geocoder = ReverseGeocoder(db)
+        results = reverse_geocoder.reverse(
+            [(point.latitude, point.longitude) for point in request.points],
+            max_distance_km=request.max_distance_km
+        )
+        return {
+            "message": "Points reverse geocoded successfully",
+            "status": "success",
+            "data": results,
+            "total": len(results)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/states/bundle")
+async def get_states_bundle(
+    accept_encoding: Optional[str] = Header(None),
+    etag: Optional[str] = Depends(dataset_etag("cities")),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the whole country -> state -> city count hierarchy as one JSON document.
+    The bundle is precompressed with gzip and carries an ETag bound to the cities dataset
+    version, so revalidations are answered with 304 without touching the database.
+    """
+    try:
+        state_service = StateService(db)
+        data, _ = state_service.get_bundle(etag.strip('"') if etag else None)
+        headers = {**(cache_headers(etag) if etag else {}), "Vary": "Accept-Encoding"}
+
+        if accept_encoding and "gzip" in accept_encoding:
+            headers["Content-Encoding"] = "gzip"
+        else:
+            data = gzip.decompress(data)
+        return Response(content=data, media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -73,17 +223,60 @@ async def search_cities(
 @router.get("/states/{country_id}", response_model=StateSearchResponse)
 async def search_states_by_country(
     country_id: int = Path(..., description="Country ID to get states for"),
+    etag: Optional[str] = Depends(dataset_etag("cities")),
     db: Session = Depends(get_db)
 ):
     """
     Get all states in a country.
     Returns a list of unique states that belong to the specified country.
+    Responses carry an ETag bound to the cities dataset version and are served
+    from the shared response cache when possible.
     """
     try:
         city_service = CityService(db)
-        return city_service.search_states_by_country(country_id)
+        content = get_or_build(
+            "cities.states",
+            ("cities",),
+            str(country_id),
+            lambda: city_service.search_states_by_country(country_id).json().encode()
+        )
+        return json_response(content, etag)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/by-ids", response_model=CityBatchResponse)
+async def get_cities_by_ids(
+    ids: str = Query(..., description="Comma-separated city IDs, e.g. 1,2,3"),
+    etag: Optional[str] = Depends(dataset_etag("cities")),
+    db: Session = Depends(get_db)
+):
+    """
+    Resolve many cities at once.
+    Returns a map keyed by city ID and the list of IDs that were not found.
+    """
+    try:
+        id_list = parse_id_list(ids, settings.GEO_BATCH_MAX_IDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    try:
+        resolver = GeoResolver(db)
+        found = resolver.cities_by_ids(id_list)
+        return {
+            "message": "Cities found successfully",
+            "status": "success",
+            "data": found,
+            "missing": [city_id for city_id in id_list if city_id not in found]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
@@ -1,38 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from sqlalchemy.orm import Session
 from core.database import get_db
+from core.http_cache import dataset_etag, json_response
+from core.response_cache import get_or_build
+from core.config import settings
+from core.utils import parse_id_list
+from services.catalog.geo_catalog import get_geo_catalog, parse_utc_offset
+from services.catalog.geo_resolver import GeoResolver
 from services.country.country_service import CountryService
+from services.import_job.import_job_service import ImportJobService
 from schemas.base import BaseResponse
-from schemas.country import CountrySearchParams, CountrySearchResponse
+from schemas.country import CountrySearchParams, CountrySearchResponse, CountryBatchResponse, CountryTimezoneResponse
+from schemas.import_job import ImportJobResponse
 from typing import Optional
 
 router = APIRouter()
 
-@router.post("/init_countries", response_model=BaseResponse)
+@router.post("/init_countries", response_model=BaseResponse, status_code=status.HTTP_202_ACCEPTED)
 async def init_countries(db: Session = Depends(get_db)):
     """
     Initialize countries in the database.
-    This endpoint will populate the countries table with predefined data.
+    Enqueues a background job that populates the countries table with predefined data,
+    resuming an unfinished job from its last checkpoint. Poll the returned job id for progress.
     """
     try:
-        country_service = CountryService(db)
-        result = await country_service.initialize_countries()
+        import_job_service = ImportJobService(db)
+        result = import_job_service.enqueue_import("countries")
         
         return {
-            "message": "Countries initialized successfully",
+            "message": "Country initialization enqueued",
             "status": "success",
-            "data": {
-                "total_countries": result.get("total_countries", 0),
-                "added_countries": result.get("added_countries", 0),
-                "updated_countries": result.get("updated_countries", 0)
-            }
+            "data": result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.get("/init_countries/{job_id}", response_model=ImportJobResponse)
+async def get_init_countries_progress(
+    job_id: int = Path(..., description="Import job ID returned by POST /countries/init_countries"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the progress of a country initialization job.
+    Returns rows processed, throughput and ETA.
+    """
+    import_job_service = ImportJobService(db)
+    return {
+        "message": "Import job progress",
+        "status": "success",
+        "data": import_job_service.get_progress(job_id, dataset="countries")
+    }
+
 @router.get("/search", response_model=CountrySearchResponse)
 async def search_countries(
     name: Optional[str] = Query(None, description="Partial name to search for"),
@@ -43,11 +66,14 @@ async def search_countries(
     currency: Optional[str] = Query(None, description="Currency code"),
     limit: int = Query(10, description="Maximum number of results to return"),
     offset: int = Query(0, description="Number of results to skip"),
+    etag: Optional[str] = Depends(dataset_etag("countries")),
     db: Session = Depends(get_db)
 ):
     """
     Search for countries with various filters.
     Returns a list of countries that match the search criteria.
+    Responses carry an ETag bound to the countries dataset version and are served
+    from the shared response cache when possible.
     """
     try:
         country_service = CountryService(db)
@@ -61,9 +87,89 @@ async def search_countries(
             page=offset // limit + 1,
             per_page=limit
         )
-        return country_service.search_countries(search_params)
+        content = get_or_build(
+            "countries.search",
+            ("countries",),
+            search_params.cache_key(),
+            lambda: country_service.search_countries_json(search_params)
+        )
+        return json_response(content, etag)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/by-ids", response_model=CountryBatchResponse)
+async def get_countries_by_ids(
+    ids: str = Query(..., description="Comma-separated country IDs, e.g. 1,2,3"),
+    etag: Optional[str] = Depends(dataset_etag("countries")),
+    db: Session = Depends(get_db)
+):
+    """
+    Resolve many countries at once.
+    Returns a map keyed by country ID and the list of IDs that were not found.
+    """
+    try:
+        id_list = parse_id_list(ids, settings.GEO_BATCH_MAX_IDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    try:
+        resolver = GeoResolver(db)
+        found = resolver.countries_by_ids(id_list)
+        return {
+            "message": "Countries found successfully",
+            "status": "success",
+            "data": found,
+            "missing": [country_id for country_id in id_list if country_id not in found]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/timezones", response_model=CountryTimezoneResponse)
+async def get_countries_by_timezone(
+    zone: Optional[str] = Query(None, description="IANA zone name, e.g. Europe/Berlin"),
+    abbreviation: Optional[str] = Query(None, description="Timezone abbreviation, e.g. CET"),
+    offset: Optional[str] = Query(None, description="UTC offset, e.g. +05:30, UTC-3 or 19800 (seconds)"),
+    etag: Optional[str] = Depends(dataset_etag("countries")),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the countries that use a timezone.
+    Filters by zone name, abbreviation and/or UTC offset; several filters are combined.
+    """
+    if zone is None and abbreviation is None and offset is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="One of zone, abbreviation or offset must be provided"
+        )
+    try:
+        offset_seconds = parse_utc_offset(offset) if offset is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid UTC offset '{offset}'"
+        )
+
+    try:
+        catalog = get_geo_catalog(db)
+        countries = catalog.countries_by_timezone(zone=zone, abbreviation=abbreviation, offset_seconds=offset_seconds)
+        return {
+            "message": "Countries found successfully",
+            "status": "success",
+            "data": countries,
+            "total": len(countries)
+        }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        ) 
\ No newline at end of file
+        )
+
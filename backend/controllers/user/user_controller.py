@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, status, Header
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, status, Header, Query
 from sqlalchemy.orm import Session
-from schemas.user import LoginRequest, RegisterRequest, ForgotPasswordRequest, ResetPasswordRequest, RefreshTokenRequest, UserCreate, UserUpdate, UserResponse, PasswordChange
+from schemas.user import LoginRequest, RegisterRequest, ForgotPasswordRequest, ResetPasswordRequest, RefreshTokenRequest, UserCreate, UserUpdate, UserResponse, PasswordChange, NearbyUsersResponse
 from core.database import get_db
 from models.user import User
 from passlib.context import CryptContext
 from sqlalchemy import func, and_
 from services.user import RegisterService, LoginService, PasswordResetService, UserService
 from services.jwt.refresh_token_service import RefreshTokenService
+from services.user.nearby_user_service import NearbyUserService
+from core.config import settings
 from core.jwt import JWTManager
 from models.session import Session as SessionModel
 from datetime import datetime, timedelta
@@ -68,6 +70,63 @@ class UserController(BaseController[User]):
             updated_user = user_service.update_user_profile(current_user.id, update_data)
             return updated_user
 
+        @self.router.get("/nearby", response_model=NearbyUsersResponse)
+        async def get_nearby_users(
+            latitude: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of the center; defaults to the user's city"),
+            longitude: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of the center; defaults to the user's city"),
+            radius_km: float = Query(50, gt=0, description="Search radius in km"),
+            limit: int = Query(20, ge=1, le=100, description="Maximum number of users to return"),
+            cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+            authorization: Optional[str] = Header(None),
+            db: Session = Depends(get_db)
+        ):
+            """
+            List members near a location, nearest first.
+            Users are located at their city; the caller is left out of the results.
+            """
+            if not authorization or not authorization.startswith("Bearer "):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid authorization header"
+                )
+            if radius_km > settings.NEARBY_USERS_MAX_RADIUS_KM:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Radius cannot exceed {settings.NEARBY_USERS_MAX_RADIUS_KM} km"
+                )
+            if (latitude is None) != (longitude is None):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Latitude and longitude must be given together"
+                )
+
+            access_token = authorization.split(" ")[1]
+            current_user = UserService(db).get_current_user(access_token)
+            nearby_user_service = NearbyUserService(db)
+
+            if latitude is None:
+                location = nearby_user_service.get_user_location(current_user.id)
+                if location is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Set a city in your profile or pass coordinates"
+                    )
+                latitude, longitude = location
+
+            result = nearby_user_service.search_radius(
+                latitude,
+                longitude,
+                radius_km,
+                limit=limit,
+                cursor=cursor,
+                exclude_user_id=current_user.id
+            )
+            return {
+                "message": "Nearby users found successfully",
+                "status": "success",
+                **result
+            }
+
         @self.router.post("/login")
         async def login(
             request: Request,
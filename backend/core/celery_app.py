@@ -1,6 +1,10 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, task_prerun, task_postrun
 from .config import settings
+from .database import configure_engine, start_db_timer, stop_db_timer
+from .metrics import incr_metric
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,9 +23,49 @@ celery_app = Celery(
         'tasks.email_tasks',
         'tasks.user_tasks',
         'tasks.session_tasks',
-        'tasks.password_reset_tasks'
+        'tasks.password_reset_tasks',
+        'tasks.reference_data_tasks',
+        'tasks.outbox_tasks'
     ]
 )
+# Queues, routes, rate limits and the beat schedule
+celery_app.config_from_object('core.celeryconfig')
+
+# Per-task counters (runs, DB time, statements, total time)
+TASK_METRIC_NAME = "tasks"
+
+@worker_init.connect
+def setup_worker_engine(sender=None, **kwargs):
+    """
+    Size the pool for the worker's concurrency. With thread or green pools the tasks share
+    this process; with prefork the children replace this engine in setup_process_engine.
+    """
+    concurrency = getattr(sender, "concurrency", None) or 1
+    configure_engine(settings.CELERY_DB_POOL_SIZE or concurrency, settings.CELERY_DB_MAX_OVERFLOW)
+
+@worker_process_init.connect
+def setup_process_engine(**kwargs):
+    """Give each prefork child its own engine; it runs one task at a time."""
+    configure_engine(settings.CELERY_DB_POOL_SIZE or 1, settings.CELERY_DB_MAX_OVERFLOW)
+
+_task_started = {}
+
+@task_prerun.connect
+def start_task_metrics(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    start_db_timer()
+
+@task_postrun.connect
+def record_task_metrics(task_id=None, task=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    db_time = stop_db_timer()
+    if started is None or task is None:
+        return
+    incr_metric(TASK_METRIC_NAME, f"{task.name}:runs")
+    incr_metric(TASK_METRIC_NAME, f"{task.name}:total_ms", int((time.perf_counter() - started) * 1000))
+    if db_time:
+        incr_metric(TASK_METRIC_NAME, f"{task.name}:db_ms", int(db_time["seconds"] * 1000))
+        incr_metric(TASK_METRIC_NAME, f"{task.name}:db_statements", db_time["statements"])
 
 def init_celery():
     """Initialize Celery with application settings."""
@@ -1,7 +1,69 @@
 """
 Celery configuration file.
-Contains task annotations, rate limits, and other Celery settings.
+Contains queues, routes, task annotations, rate limits, the beat schedule and other Celery settings.
+Loaded by core.celery_app with config_from_object.
 """
+from celery.schedules import crontab
+from kombu import Queue
+from core.config import settings
+
+# Queues, each consumed by its own worker profile (see the celery-worker-* Makefile targets):
+# - transactional: emails and actions a user is waiting for (password reset, login alerts, session revocation)
+# - bulk: emails sent to many users at once, which must not delay transactional ones
+# - maintenance: scheduled cleanups, rollups, imports and account erasures
+# - billing: Stripe and payment work
+task_queues = (
+    Queue('transactional'),
+    Queue('bulk'),
+    Queue('maintenance'),
+    Queue('billing'),
+)
+task_default_queue = 'transactional'
+
+# Priorities within a queue. With the Redis broker 0 is the highest priority and
+# messages are served by priority step before order of arrival.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+task_default_priority = PRIORITY_NORMAL
+broker_transport_options = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+
+# Task routing
+task_routes = {
+    # Security emails and actions go first
+    'tasks.email_tasks.send_password_reset_email': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+    'tasks.email_tasks.send_password_change_notification': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+    'send_password_reset_notification': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+    'invalidate_user_password_resets': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+    'invalidate_user_sessions': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+    'invalidate_all_sessions': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+    'tasks.email_tasks.send_login_notification': {'queue': 'transactional'},
+    'tasks.email_tasks.send_welcome_email': {'queue': 'transactional'},
+    # Generic emails are transactional unless the caller sends them to bulk
+    'tasks.email_tasks.send_email': {'queue': 'transactional'},
+
+    # Publishes the transactional tasks written to the outbox
+    'relay_outbox': {'queue': 'transactional', 'priority': PRIORITY_HIGH},
+
+    'send_inactivity_notification': {'queue': 'bulk', 'priority': PRIORITY_LOW},
+
+    # Rebuilt after city writes; API workers serve a stale store until it is done
+    'build_city_store': {'queue': 'maintenance', 'priority': PRIORITY_HIGH},
+    'erase_user_account': {'queue': 'maintenance'},
+    'resume_account_erasures': {'queue': 'maintenance'},
+    'import_reference_data': {'queue': 'maintenance'},
+    'maintain_session_partitions': {'queue': 'maintenance'},
+    'cleanup_expired_sessions': {'queue': 'maintenance', 'priority': PRIORITY_LOW},
+    'cleanup_expired_tokens': {'queue': 'maintenance', 'priority': PRIORITY_LOW},
+    'check_session_activity': {'queue': 'maintenance', 'priority': PRIORITY_LOW},
+    'cleanup_inactive_users': {'queue': 'maintenance', 'priority': PRIORITY_LOW},
+    'rebuild_user_rollups': {'queue': 'maintenance', 'priority': PRIORITY_LOW},
+    'cleanup_sent_outbox': {'queue': 'maintenance', 'priority': PRIORITY_LOW},
+}
 
 # Task annotations for rate limiting and other settings
 task_annotations = {
@@ -12,19 +74,13 @@ task_annotations = {
         'retry_backoff': True, # Enable exponential backoff for retries
         'max_retries': 3       # Maximum number of retries
     },
-    'tasks.user_tasks.cleanup_inactive_users': {
+    'cleanup_inactive_users': {
         'rate_limit': '1/h',   # Run once per hour
         'time_limit': 300,     # 5 minutes timeout
         'soft_time_limit': 240 # Soft timeout at 4 minutes
     }
 }
 
-# Task routing
-task_routes = {
-    'tasks.email_tasks.*': {'queue': 'email'},
-    'tasks.user_tasks.*': {'queue': 'user'}
-}
-
 # Task serialization
 task_serializer = 'json'
 accept_content = ['json']
@@ -48,4 +104,39 @@ broker_connection_max_retries = 10
 
 # Logging
 worker_log_format = '[%(asctime)s: %(levelname)s/%(processName)s] %(message)s'
-worker_task_log_format = '[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s' 
\ No newline at end of file
+worker_task_log_format = '[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s'
+
+# Beat schedule
+beat_schedule = {
+    'relay-outbox': {
+        'task': 'relay_outbox',
+        'schedule': settings.OUTBOX_RELAY_INTERVAL_SECONDS,
+        # A run that could not start before the next one is redundant
+        'options': {'expires': settings.OUTBOX_RELAY_INTERVAL_SECONDS},
+    },
+    'maintain-session-partitions': {
+        'task': 'maintain_session_partitions',
+        # Run every day at midnight UTC; expired sessions go with their monthly partition
+        'schedule': crontab(hour=0, minute=0),
+    },
+    'cleanup-expired-tokens': {
+        'task': 'cleanup_expired_tokens',
+        # Run every hour
+        'schedule': crontab(minute=0),
+    },
+    'resume-account-erasures': {
+        'task': 'resume_account_erasures',
+        # Run every 15 minutes
+        'schedule': crontab(minute='*/15'),
+    },
+    'rebuild-user-rollups': {
+        'task': 'rebuild_user_rollups',
+        # Run every day at 03:00 UTC
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'cleanup-sent-outbox': {
+        'task': 'cleanup_sent_outbox',
+        # Run every hour at half past
+        'schedule': crontab(minute=30),
+    },
+}
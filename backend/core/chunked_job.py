@@ -0,0 +1,161 @@
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.database import SessionLocal
+from core.lease_lock import get_current_lease
+from core.logger import logger
+from core.metrics import incr_metric
+from core.redis_client import get_redis
+
+METRIC_NAME = "maintenance"
+CURSOR_KEY = "maintenance:cursor:{name}"
+LAST_RUN_KEY = "maintenance:last_run:{name}"
+
+class ChunkedJob:
+    """
+    Maintenance job walking a table in primary key order, one bounded chunk per transaction.
+
+    Each chunk covers the next chunk_size IDs after the cursor and runs a set-based statement
+    restricted to them (:first_id to :last_id), so no transaction holds locks on more than one
+    chunk and no row is loaded into memory. The statement must be idempotent (its own condition
+    selects the rows to change): after each commit the cursor is saved in Redis, and a crashed
+    run resumes from the last saved chunk. Rows inserted after the run started are left to the
+    next run.
+
+    When run under a lease (see core.lease_lock.with_lease), the lease is checked before each
+    chunk and the cursor is only saved while the lease is ours, so a run that lost its lease
+    stops instead of moving the cursor of the run that took over.
+
+    Override process_chunk for chunks that need more than one statement.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        statement: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.table = table
+        self.statement = statement
+        self.params = params or {}
+        self.chunk_size = chunk_size or settings.MAINTENANCE_CHUNK_SIZE
+        self.pause_seconds = settings.MAINTENANCE_CHUNK_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+
+    def process_chunk(self, db: Session, first_id: int, last_id: int) -> int:
+        """
+        Process the rows with IDs from first_id to last_id, without committing.
+
+        Returns:
+            int: Number of rows changed
+        """
+        result = db.execute(text(self.statement), {**self.params, "first_id": first_id, "last_id": last_id})
+        return result.rowcount
+
+    def after_commit(self) -> None:
+        """Hook run after each chunk commits, e.g. to invalidate caches."""
+
+    def _chunk_end(self, db: Session, after_id: int, max_id: int) -> int:
+        """Get the last ID of the chunk following after_id (index-only, however sparse the IDs are)."""
+        last_id = db.execute(
+            text(f"SELECT id FROM {self.table} WHERE id > :after_id AND id <= :max_id ORDER BY id LIMIT 1 OFFSET :offset"),
+            {"after_id": after_id, "max_id": max_id, "offset": self.chunk_size - 1}
+        ).scalar()
+        return max_id if last_id is None else last_id
+
+    def _load_cursor(self) -> Optional[Dict[str, int]]:
+        try:
+            value = get_redis().get(CURSOR_KEY.format(name=self.name))
+            return json.loads(value) if value else None
+        except RedisError as e:
+            logger.warning(f"Could not load the cursor of {self.name}, starting over: {str(e)}")
+            return None
+
+    def _save_cursor(self, cursor: Optional[Dict[str, int]]) -> None:
+        lease = get_current_lease()
+        try:
+            key = CURSOR_KEY.format(name=self.name)
+            if cursor is None:
+                get_redis().delete(key)
+            elif lease is not None:
+                lease.fenced_set(key, json.dumps(cursor), settings.MAINTENANCE_CURSOR_TTL_SECONDS)
+            else:
+                get_redis().set(key, json.dumps(cursor), ex=settings.MAINTENANCE_CURSOR_TTL_SECONDS)
+        except RedisError as e:
+            logger.warning(f"Could not save the cursor of {self.name}: {str(e)}")
+
+    def _record_run(self, stats: Dict[str, Any]) -> None:
+        incr_metric(METRIC_NAME, f"{self.name}:runs")
+        incr_metric(METRIC_NAME, f"{self.name}:chunks", stats["chunks"])
+        incr_metric(METRIC_NAME, f"{self.name}:rows", stats["rows"])
+        try:
+            get_redis().set(LAST_RUN_KEY.format(name=self.name), json.dumps(stats))
+        except RedisError as e:
+            logger.warning(f"Could not record the last run of {self.name}: {str(e)}")
+
+    def run(self, db: Optional[Session] = None) -> Dict[str, Any]:
+        """
+        Run the job over the whole table, resuming an interrupted run if there is one.
+
+        Args:
+            db (Session, optional): Session to use; a new one is opened and closed by default
+
+        Returns:
+            dict: Run statistics (rows changed, chunks, duration, whether it resumed)
+        """
+        own_session = db is None
+        db = db or SessionLocal()
+        lease = get_current_lease()
+        started = time.perf_counter()
+        stats = {"job": self.name, "started_at": datetime.utcnow().isoformat(), "rows": 0, "chunks": 0, "resumed": False}
+        if lease is not None:
+            stats["fencing_token"] = lease.token
+        try:
+            cursor = self._load_cursor()
+            if cursor:
+                stats["resumed"] = True
+                logger.info(f"Resuming {self.name} after ID {cursor['after_id']}")
+            else:
+                min_id, max_id = db.execute(text(f"SELECT MIN(id), MAX(id) FROM {self.table}")).one()
+                db.commit()
+                cursor = {"after_id": (min_id or 1) - 1, "max_id": max_id or 0}
+
+            while cursor["after_id"] < cursor["max_id"]:
+                if lease is not None:
+                    lease.check()
+                first_id = cursor["after_id"] + 1
+                last_id = self._chunk_end(db, cursor["after_id"], cursor["max_id"])
+                stats["rows"] += self.process_chunk(db, first_id, last_id)
+                db.commit()
+                self.after_commit()
+                stats["chunks"] += 1
+                cursor["after_id"] = last_id
+                self._save_cursor(cursor)
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+
+            self._save_cursor(None)
+            stats["duration_seconds"] = round(time.perf_counter() - started, 3)
+            self._record_run(stats)
+            logger.info(f"{self.name}: {stats['rows']} rows in {stats['chunks']} chunks ({stats['duration_seconds']}s)")
+            return stats
+        except Exception:
+            db.rollback()
+            incr_metric(METRIC_NAME, f"{self.name}:errors")
+            raise
+        finally:
+            if own_session:
+                db.close()
+
+def get_last_run(name: str) -> Optional[Dict[str, Any]]:
+    """Get the statistics of the last completed run of a job, if recorded."""
+    value = get_redis().get(LAST_RUN_KEY.format(name=name))
+    return json.loads(value) if value else None
@@ -83,6 +83,30 @@ class Settings(BaseSettings):
         default="redis://localhost:6379/0",
         description="Celery result backend"
     )
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = Field(
+        default=2.0,
+        description="Seconds between two runs of the outbox relay, the delay before outbox tasks reach the broker"
+    )
+    OUTBOX_BATCH_SIZE: int = Field(
+        default=100,
+        description="Outbox messages claimed and published per relay transaction"
+    )
+    OUTBOX_MAX_ATTEMPTS: int = Field(
+        default=10,
+        description="Failed publications after which an outbox message is left for inspection"
+    )
+    OUTBOX_RETENTION_HOURS: int = Field(
+        default=24,
+        description="Hours sent outbox messages are kept before cleanup"
+    )
+    CELERY_DB_POOL_SIZE: int = Field(
+        default=0,
+        description="Database connections pooled per Celery worker process (0 sizes the pool for the worker's concurrency)"
+    )
+    CELERY_DB_MAX_OVERFLOW: int = Field(
+        default=2,
+        description="Database connections a Celery worker process may open beyond its pool, e.g. for jobs with their own session"
+    )
     
     # Email settings
     SMTP_TLS: bool = Field(
@@ -119,6 +143,124 @@ class Settings(BaseSettings):
         default=7,
         description="Session expiry days"
     )
+    MAX_ACTIVE_SESSIONS_PER_USER: int = Field(
+        default=10,
+        description="Active sessions kept per user; a new session evicts the least recently active ones (0 for no cap)"
+    )
+    ONE_TIME_TOKEN_BACKEND: str = Field(
+        default="database",
+        description="Store of password reset and email verification tokens: database or redis"
+    )
+    ONE_TIME_TOKEN_EXPIRY_HOURS: int = Field(
+        default=24,
+        description="Validity of password reset and email verification tokens in hours"
+    )
+    PASSWORD_RESET_REQUEST_INTERVAL_SECONDS: int = Field(
+        default=60,
+        description="Seconds during which further password reset requests of a user are acknowledged without a new token or email"
+    )
+    SESSION_ACTIVITY_RESOLUTION_SECONDS: int = Field(
+        default=60,
+        description="Minimum interval between two last_activity writes of a session"
+    )
+    PROFILE_CACHE_TTL_SECONDS: int = Field(
+        default=300,
+        description="Lifetime of the cached user profile served by /users/me"
+    )
+
+    # Reference data import settings
+    IMPORT_JOB_STALE_SECONDS: int = Field(
+        default=600,
+        description="Seconds without a checkpoint after which a running import job is considered dead and may be resumed"
+    )
+    IMPORT_JOB_PENDING_STALE_SECONDS: int = Field(
+        default=21600,
+        description="Seconds a queued import job may wait for a worker before it is considered lost and re-enqueued"
+    )
+    GEO_CACHE_DIR: str = Field(
+        default="cache/geo",
+        description="Directory for precomputed geo artifacts (state bundles), relative to the backend directory unless absolute"
+    )
+    GEO_HTTP_MAX_AGE: int = Field(
+        default=300,
+        description="Cache-Control max-age in seconds for geographic endpoints; clients revalidate with the ETag afterwards"
+    )
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(
+        default=3600,
+        description="Lifetime of cached geo search responses in Redis; entries of old dataset versions expire on their own"
+    )
+    CITY_STORE_CHECK_SECONDS: int = Field(
+        default=5,
+        description="How often a process checks whether a new memory-mapped city store version was published"
+    )
+    GEO_CATALOG_CHECK_SECONDS: int = Field(
+        default=5,
+        description="How often a process checks the dataset versions of its in-memory geo catalog"
+    )
+    FUZZY_MATCH_MIN_SCORE: float = Field(
+        default=0.8,
+        description="Minimum similarity (0-1) for a fuzzy name match to be accepted without asking the client"
+    )
+    GEO_BATCH_MAX_IDS: int = Field(
+        default=500,
+        description="Maximum number of ids accepted by the batch city/country resolution endpoints"
+    )
+    REVERSE_GEOCODE_MAX_POINTS: int = Field(
+        default=5000,
+        description="Maximum number of points accepted by the batch reverse geocoding endpoint"
+    )
+    NEARBY_USERS_MAX_RADIUS_KM: float = Field(
+        default=500,
+        description="Largest radius accepted by the nearby users search"
+    )
+    FRAGMENT_CACHE_MAX_ENTRIES: int = Field(
+        default=100000,
+        description="Maximum number of serialized city/country rows kept per dataset in each process"
+    )
+    USER_IMPORT_MAX_ROWS: int = Field(
+        default=50000,
+        description="Maximum number of rows accepted by the bulk user import endpoint"
+    )
+    USER_IMPORT_BATCH_SIZE: int = Field(
+        default=1000,
+        description="Users inserted per multi-row INSERT by the bulk user import"
+    )
+    USER_IMPORT_HASH_WORKERS: int = Field(
+        default=0,
+        description="Processes hashing passwords during a bulk user import (0 uses all cores)"
+    )
+    ACCOUNT_ERASURE_BATCH_SIZE: int = Field(
+        default=1000,
+        description="Rows deleted or anonymized per transaction when erasing an account"
+    )
+    ACCOUNT_ERASURE_STALE_SECONDS: int = Field(
+        default=600,
+        description="Seconds without a checkpoint after which a running account erasure is considered dead and resumed"
+    )
+    ACCOUNT_ERASURE_PENDING_STALE_SECONDS: int = Field(
+        default=21600,
+        description="Seconds a queued account erasure may wait for a worker before it is considered lost and re-enqueued"
+    )
+    MAINTENANCE_CHUNK_SIZE: int = Field(
+        default=5000,
+        description="Rows (by primary key) covered by each transaction of the maintenance jobs"
+    )
+    MAINTENANCE_CHUNK_PAUSE_SECONDS: float = Field(
+        default=0.05,
+        description="Pause between two chunks of a maintenance job, to leave room for the application's writes"
+    )
+    MAINTENANCE_CURSOR_TTL_SECONDS: int = Field(
+        default=86400,
+        description="Seconds an interrupted maintenance job can be resumed from its cursor before starting over"
+    )
+    MAINTENANCE_LEASE_SECONDS: int = Field(
+        default=60,
+        description="TTL of the lease a scheduled job holds while it runs, renewed every third of it; a stalled holder loses it after this long"
+    )
+    SESSION_PARTITION_MONTHS_AHEAD: int = Field(
+        default=2,
+        description="Months past the current one kept partitioned ahead in the sessions table (raised to cover the longest session lifetime)"
+    )
     
     # Security settings
     SECRET_KEY: str = Field(
@@ -189,6 +331,10 @@ class Settings(BaseSettings):
 
     # Redis settings
     REDIS_URL: str
+    REDIS_SOCKET_TIMEOUT: float = Field(
+        default=0.5,
+        description="Socket timeout in seconds for Redis calls made on the request path"
+    )
 
     @property
     def JWT_ACCESS_TOKEN_EXPIRE(self) -> timedelta:
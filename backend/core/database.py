@@ -1,23 +1,69 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from .config import settings
 
 # Construct database URL from settings
 DATABASE_URL = f"mysql+pymysql://{settings.MYSQL_USER}:{settings.MYSQL_PASSWORD}@{settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DATABASE}"
 
-# Create SQLAlchemy engine with pymysql
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_size=5,
-    max_overflow=10
-)
+# Time spent in the database by the current Celery task, when one is being measured
+_db_time: ContextVar[Optional[Dict[str, float]]] = ContextVar("db_time", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _db_time.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_time = _db_time.get()
+    if db_time is not None and conn.info.get("query_started"):
+        db_time["seconds"] += time.perf_counter() - conn.info["query_started"].pop()
+        db_time["statements"] += 1
+
+def create_db_engine(pool_size: int = 5, max_overflow: int = 10) -> Engine:
+    """Create the SQLAlchemy engine with pymysql, instrumented for per-task DB time."""
+    new_engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_size=pool_size,
+        max_overflow=max_overflow
+    )
+    event.listen(new_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(new_engine, "after_cursor_execute", _after_cursor_execute)
+    return new_engine
+
+engine = create_db_engine()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def configure_engine(pool_size: int, max_overflow: int) -> None:
+    """
+    Replace the engine with a new one sized for this process.
+    Called in each Celery worker process: connections pooled before the fork belong to the
+    parent and are dropped without being closed, so the child never shares a socket with it.
+    SessionLocal is rebound in place, so modules that imported it use the new engine.
+    """
+    global engine
+    engine.dispose(close=False)
+    engine = create_db_engine(pool_size, max_overflow)
+    SessionLocal.configure(bind=engine)
+
+def start_db_timer() -> None:
+    """Start measuring the time the current task spends in the database."""
+    _db_time.set({"seconds": 0.0, "statements": 0})
+
+def stop_db_timer() -> Optional[Dict[str, float]]:
+    """Stop measuring and get the database time and statement count of the current task."""
+    db_time = _db_time.get()
+    _db_time.set(None)
+    return db_time
+
 # Create Base class
 Base = declarative_base()
 
@@ -27,4 +73,20 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+@contextmanager
+def task_session() -> Iterator[Session]:
+    """
+    Session for a Celery task: committed when the block completes, rolled back
+    if it raises, and always closed.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
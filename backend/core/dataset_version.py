@@ -0,0 +1,59 @@
+import time
+from typing import List, Optional
+from redis.exceptions import RedisError
+from core.redis_client import get_redis
+from core.logger import logger
+
+# Reference datasets whose version is tracked
+DATASETS = ("countries", "cities")
+
+VERSION_KEY = "dataset_version:{dataset}"
+
+def _new_version() -> str:
+    """Generate a new version stamp; time based so it stays unique if Redis is flushed."""
+    return format(time.time_ns(), "x")
+
+def get_dataset_versions(*datasets: str) -> Optional[List[str]]:
+    """
+    Get the current version stamp of one or more datasets.
+    A dataset that was never bumped gets a version on first read.
+
+    Args:
+        *datasets (str): Dataset names ('countries', 'cities')
+
+    Returns:
+        list: Version stamps in the same order, or None if Redis is unavailable
+    """
+    try:
+        client = get_redis()
+        keys = [VERSION_KEY.format(dataset=dataset) for dataset in datasets]
+        values = client.mget(keys)
+        versions = []
+        for key, value in zip(keys, values):
+            if value is None:
+                client.set(key, _new_version(), nx=True)
+                value = client.get(key)
+            versions.append(value.decode())
+        return versions
+    except RedisError as e:
+        logger.warning(f"Could not read dataset versions for {datasets}: {str(e)}")
+        return None
+
+def bump_dataset_version(dataset: str) -> Optional[str]:
+    """
+    Bump the version stamp of a dataset after its data changed.
+    Must be called after the change is committed.
+
+    Args:
+        dataset (str): Dataset name ('countries', 'cities')
+
+    Returns:
+        str: New version stamp, or None if Redis is unavailable
+    """
+    version = _new_version()
+    try:
+        get_redis().set(VERSION_KEY.format(dataset=dataset), version)
+        return version
+    except RedisError as e:
+        logger.error(f"Could not bump dataset version for {dataset}: {str(e)}")
+        return None
@@ -0,0 +1,114 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+from core.config import settings
+from core.dataset_version import get_dataset_versions
+from core.metrics import incr_metric
+
+METRIC_NAME = "fragment_cache"
+
+class FragmentCache:
+    """
+    Process-local LRU cache of serialized rows (JSON bytes) of one dataset.
+    Entries belong to a single dataset version; the cache is emptied when a newer version is seen.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.version: Optional[str] = None
+        self.entries: "OrderedDict[int, bytes]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _use_version(self, version: str) -> None:
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get_many(self, version: str, ids: Iterable[int]) -> Dict[int, bytes]:
+        """
+        Get the cached fragments of rows of a dataset version.
+
+        Args:
+            version (str): Dataset version the fragments must belong to
+            ids (Iterable[int]): Row IDs
+
+        Returns:
+            dict: Row ID to JSON bytes, for the cached rows only
+        """
+        found = {}
+        with self.lock:
+            self._use_version(version)
+            for row_id in ids:
+                fragment = self.entries.get(row_id)
+                if fragment is not None:
+                    self.entries.move_to_end(row_id)
+                    found[row_id] = fragment
+        return found
+
+    def put_many(self, version: str, fragments: Dict[int, bytes]) -> None:
+        """
+        Cache fragments of rows of a dataset version, evicting the least recently used ones.
+
+        Args:
+            version (str): Dataset version the fragments were serialized from
+            fragments (dict): Row ID to JSON bytes
+        """
+        with self.lock:
+            self._use_version(version)
+            self.entries.update(fragments)
+            for row_id in fragments:
+                self.entries.move_to_end(row_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+_caches: Dict[str, FragmentCache] = {}
+
+def get_fragment_cache(dataset: str) -> FragmentCache:
+    """Get the fragment cache of a dataset in this process."""
+    cache = _caches.get(dataset)
+    if cache is None:
+        cache = _caches.setdefault(dataset, FragmentCache(settings.FRAGMENT_CACHE_MAX_ENTRIES))
+    return cache
+
+def render_rows(dataset: str, ids: List[int], serialize: Callable[[List[int]], Dict[int, bytes]]) -> List[bytes]:
+    """
+    Get the serialized rows of a dataset, in the given order.
+    Only rows missing from the fragment cache of the current dataset version are loaded
+    and serialized; without a dataset version (Redis unavailable) nothing is cached.
+
+    Args:
+        dataset (str): Dataset of the rows ('countries', 'cities')
+        ids (List[int]): Row IDs, in response order
+        serialize (Callable): Loads rows by ID and returns their JSON bytes by ID
+
+    Returns:
+        list: JSON bytes of each row that exists
+    """
+    versions = get_dataset_versions(dataset)
+    cache = get_fragment_cache(dataset)
+    fragments = cache.get_many(versions[0], ids) if versions else {}
+
+    missing = [row_id for row_id in ids if row_id not in fragments]
+    if missing:
+        serialized = serialize(missing)
+        if versions:
+            cache.put_many(versions[0], serialized)
+        fragments.update(serialized)
+
+    if versions:
+        incr_metric(METRIC_NAME, f"{dataset}:hit", len(ids) - len(missing))
+        incr_metric(METRIC_NAME, f"{dataset}:miss", len(missing))
+    return [fragments[row_id] for row_id in ids if row_id in fragments]
+
+def list_response(message: str, fragments: List[bytes], total: int) -> bytes:
+    """
+    Assemble a list response ({message, status, data, total}) from serialized rows,
+    by byte concatenation. The output matches the Pydantic serialization of the
+    corresponding *SearchResponse model.
+    """
+    return b"".join((
+        b'{"message":', json.dumps(message, ensure_ascii=False).encode("utf-8"),
+        b',"status":"success","data":[', b",".join(fragments),
+        b'],"total":', str(total).encode(), b"}"
+    ))
@@ -0,0 +1,204 @@
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Cap on candidates verified with edit distance per query
+MAX_CANDIDATES = 64
+
+def fold(value: str) -> str:
+    """Case- and accent-insensitive form of a name ("São Paulo" -> "sao paulo")."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+def trigrams(folded: str) -> List[int]:
+    """
+    Get the distinct trigram codes of a folded string.
+    The string is padded so short names and word boundaries still produce trigrams;
+    each trigram is packed into one int64 (21 bits per code point).
+    """
+    padded = f"  {folded} "
+    codes = {
+        (ord(padded[i]) << 42) | (ord(padded[i + 1]) << 21) | ord(padded[i + 2])
+        for i in range(len(padded) - 2)
+    }
+    return list(codes)
+
+def bounded_osa(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions),
+    stopping early once it is known to exceed max_distance.
+
+    Returns:
+        int: Distance, or max_distance + 1 if it exceeds the bound
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous_previous is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    distance = previous[len(b)]
+    return distance if distance <= max_distance else max_distance + 1
+
+def default_max_distance(folded_query: str) -> int:
+    """Edit distance tolerated for a query: one typo per four characters, at most three."""
+    return min(3, max(1, len(folded_query) // 4))
+
+def best_match(matches: List[Tuple[Any, float]], min_score: float) -> Optional[Any]:
+    """
+    Get the top match if it is good enough and not tied with the runner-up.
+
+    Args:
+        matches (list): (item, score) pairs, best first
+        min_score (float): Minimum accepted score
+
+    Returns:
+        The matched item, or None if there is no unambiguous match
+    """
+    if not matches or matches[0][1] < min_score:
+        return None
+    if len(matches) > 1 and matches[1][1] >= matches[0][1]:
+        return None
+    return matches[0][0]
+
+class FuzzyIndex:
+    """
+    Trigram index over a list of names with edit-distance verification.
+
+    Candidates are the entries sharing enough trigrams with the query (q-gram lemma),
+    pre-filtered by length; the best ones are verified with a bounded OSA distance.
+    The index is a set of flat NumPy arrays (sorted trigram keys, CSR offsets and postings)
+    so it can be saved next to the data it indexes and memory-mapped.
+    """
+
+    ARRAYS = ("keys", "offsets", "postings", "lengths")
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, postings: np.ndarray, lengths: np.ndarray, text_of: Callable[[int], str]):
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.lengths = lengths
+        # Returns the folded text of an entry, used to verify candidates
+        self.text_of = text_of
+
+    @classmethod
+    def build(cls, texts: Sequence[str]) -> "FuzzyIndex":
+        """
+        Build an index over raw (unfolded) texts; entry i is texts[i].
+
+        Args:
+            texts (Sequence[str]): Names to index
+
+        Returns:
+            FuzzyIndex: In-memory index
+        """
+        folded = [fold(text or "") for text in texts]
+        pairs: Dict[int, List[int]] = {}
+        for index, value in enumerate(folded):
+            for code in trigrams(value):
+                pairs.setdefault(code, []).append(index)
+
+        keys = np.array(sorted(pairs), dtype=np.int64)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(pairs[key]) for key in keys.tolist()])
+        postings = np.fromiter(
+            (index for key in keys.tolist() for index in pairs[key]),
+            dtype=np.int32,
+            count=int(offsets[-1])
+        )
+        lengths = np.array([len(value) for value in folded], dtype=np.int32)
+        return cls(keys, offsets, postings, lengths, folded.__getitem__)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], text_of: Callable[[int], str]) -> "FuzzyIndex":
+        """Create an index from arrays previously returned by arrays() (possibly memory-mapped)."""
+        return cls(arrays["keys"], arrays["offsets"], arrays["postings"], arrays["lengths"], text_of)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Get the arrays of the index, for saving it."""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        max_distance: Optional[int] = None,
+        allowed: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the entries closest to a query.
+
+        Args:
+            query (str): Raw query text
+            limit (int): Maximum number of results
+            max_distance (int, optional): Maximum edit distance; scales with the query length by default
+            allowed (Callable, optional): Takes candidate entry indices and returns a boolean mask of the
+                ones to keep (e.g. a country filter)
+
+        Returns:
+            list: (entry index, score) pairs, best first; score is 1.0 for an exact folded match
+
+        Example:
+            Transpositions in short names are found (regression: they used to be filtered out
+            by the trigram overlap bound before verification).
+
+            >>> index = FuzzyIndex.build(["Rome", "Lima", "Oslo", "Paris", "Bern", "United States"])
+            >>> [[entry for entry, _ in index.search(query)] for query in ("Rmoe", "Lmia", "Olso", "Prais", "Bren")]
+            [[0], [1], [2], [3], [4]]
+            >>> [entry for entry, _ in index.search("Untied States")]
+            [5]
+        """
+        folded_query = fold(query or "")
+        if not folded_query or len(self.lengths) == 0:
+            return []
+        if max_distance is None:
+            max_distance = default_max_distance(folded_query)
+
+        codes = np.array(trigrams(folded_query), dtype=np.int64)
+        positions = np.searchsorted(self.keys, codes)
+        found = positions < len(self.keys)
+        found[found] = self.keys[positions[found]] == codes[found]
+        positions = positions[found]
+        if len(positions) == 0:
+            return []
+
+        hits = np.concatenate([self.postings[self.offsets[p]:self.offsets[p + 1]] for p in positions.tolist()])
+        candidates, overlaps = np.unique(hits, return_counts=True)
+
+        # Each edit destroys at most four trigrams of the query: three for an insertion, deletion
+        # or substitution, four for an adjacent transposition (a single OSA edit)
+        min_overlap = max(1, len(codes) - 4 * max_distance)
+        keep = (overlaps >= min_overlap) & (np.abs(self.lengths[candidates] - len(folded_query)) <= max_distance)
+        candidates, overlaps = candidates[keep], overlaps[keep]
+        if allowed is not None and len(candidates):
+            keep = allowed(candidates)
+            candidates, overlaps = candidates[keep], overlaps[keep]
+        if len(candidates) > MAX_CANDIDATES:
+            best = np.argpartition(-overlaps, MAX_CANDIDATES - 1)[:MAX_CANDIDATES]
+            candidates, overlaps = candidates[best], overlaps[best]
+
+        results = []
+        for index, overlap in zip(candidates.tolist(), overlaps.tolist()):
+            text = self.text_of(index)
+            distance = bounded_osa(folded_query, text, max_distance)
+            if distance > max_distance:
+                continue
+            score = 1.0 - distance / max(len(folded_query), len(text), 1)
+            results.append((index, round(score, 4), overlap))
+
+        results.sort(key=lambda result: (-result[1], -result[2], result[0]))
+        return [(index, score) for index, score, _ in results[:limit]]
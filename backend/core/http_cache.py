@@ -0,0 +1,73 @@
+import hashlib
+from typing import Callable, Dict, List, Optional
+from fastapi import Header, HTTPException, Request, Response, status
+from core.config import settings
+from core.dataset_version import get_dataset_versions
+
+def make_etag(request: Request, versions: List[str]) -> str:
+    """
+    Build a strong ETag from the dataset versions and the normalized request.
+    Query parameters are sorted and blank values dropped, so equivalent URLs share an ETag.
+    """
+    params = sorted(
+        (key, value.strip())
+        for key, value in request.query_params.multi_items()
+        if value.strip()
+    )
+    raw = "|".join([request.url.path, ",".join(versions), repr(params)])
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Get the conditional caching headers for an ETag."""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.GEO_HTTP_MAX_AGE}"
+    }
+
+def json_response(content: bytes, etag: Optional[str] = None) -> Response:
+    """
+    Build a response from pre-serialized JSON bytes.
+    Responses returned directly bypass the headers set by dataset_etag, so they are added here.
+    """
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers=cache_headers(etag) if etag else None
+    )
+
+def dataset_etag(*datasets: str) -> Callable:
+    """
+    Dependency factory for conditional caching of endpoints that only read the given datasets.
+
+    The dependency emits ETag and Cache-Control headers and answers If-None-Match with
+    304 Not Modified before the endpoint runs, so a revalidation never touches the database.
+    If the dataset versions cannot be read, the request is served without cache headers.
+
+    Args:
+        *datasets (str): Datasets the endpoint reads ('countries', 'cities')
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        if_none_match: Optional[str] = Header(None)
+    ) -> Optional[str]:
+        versions = get_dataset_versions(*datasets)
+        if versions is None:
+            return None
+
+        etag = make_etag(request, versions)
+        headers = cache_headers(etag)
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+        return etag
+
+    return dependency
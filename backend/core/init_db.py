@@ -42,16 +42,7 @@ def init_db():
     """
     try:
         # Import all models here to ensure they are registered with Base.metadata
-        from models.country import Country
-        from models.city import City
-        from models.user import User
-        from models.session import Session
-        from models.password_reset import PasswordReset
-        from models.notification import Notification
-        from models.payment import Payment
-        from models.subscription import Subscription
-        from models.subscription_user import SubscriptionUser
-        from models.email_verification import EmailVerification
+        import models.all
         
         # Create all tables at once
         Base.metadata.create_all(bind=engine)
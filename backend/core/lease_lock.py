@@ -0,0 +1,193 @@
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+from redis.exceptions import RedisError
+from core.config import settings
+from core.logger import logger
+from core.metrics import incr_metric
+from core.redis_client import get_redis
+
+METRIC_NAME = "leases"
+LEASE_KEY = "lease:{name}"
+FENCE_KEY = "lease:fence:{name}"
+
+# Extend the lease only while it still holds our token
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Write a key only while the lease holds our token
+FENCED_SET_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('set', KEYS[2], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Lease held by the job running in this context, if any
+_current_lease: ContextVar[Optional["LeaseLock"]] = ContextVar("current_lease", default=None)
+
+class LeaseLost(Exception):
+    """Raised when a job finds that its lease expired or was taken over."""
+
+class LeaseLock:
+    """
+    Redis lease giving one process at a time the right to run a job, across nodes.
+
+    The lease is a key set with NX and a TTL, holding a fencing token drawn from a counter
+    that only increases. A background thread renews it every third of the TTL while the
+    job runs; if the holder stalls or loses Redis for a whole TTL, the lease expires and
+    another process may take it with a higher token. Writes to shared state go through
+    fenced_set, which only applies them while the lease still holds our token, and jobs
+    call check between units of work to stop once the lease is lost.
+    """
+
+    def __init__(self, name: str, ttl_seconds: Optional[int] = None):
+        self.name = name
+        self.key = LEASE_KEY.format(name=name)
+        self.ttl_seconds = ttl_seconds or settings.MAINTENANCE_LEASE_SECONDS
+        self.token: Optional[int] = None
+        self.lost = False
+        self._last_renewed = 0.0
+        self._stop = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+    def acquire(self) -> bool:
+        """
+        Take the lease if no other process holds it, and start renewing it.
+        Fails closed: when Redis is unavailable the lease is not taken.
+
+        Returns:
+            bool: True if the lease was taken
+        """
+        try:
+            redis = get_redis()
+            token = redis.incr(FENCE_KEY.format(name=self.name))
+            if not redis.set(self.key, token, nx=True, px=self.ttl_seconds * 1000):
+                incr_metric(METRIC_NAME, f"{self.name}:contended")
+                logger.info(f"Lease of {self.name} is held by another process, skipping")
+                return False
+        except RedisError as e:
+            incr_metric(METRIC_NAME, f"{self.name}:errors")
+            logger.warning(f"Could not take the lease of {self.name}: {str(e)}")
+            return False
+
+        self.token = token
+        self._last_renewed = time.monotonic()
+        self._renewer = threading.Thread(target=self._renew_until_stopped, name=f"lease-{self.name}", daemon=True)
+        self._renewer.start()
+        incr_metric(METRIC_NAME, f"{self.name}:acquired")
+        return True
+
+    def renew(self) -> bool:
+        """
+        Extend the lease by its TTL.
+
+        Returns:
+            bool: False once the lease is lost
+        """
+        if self.lost:
+            return False
+        try:
+            renewed = get_redis().eval(RENEW_SCRIPT, 1, self.key, self.token, self.ttl_seconds * 1000)
+        except RedisError as e:
+            logger.warning(f"Could not renew the lease of {self.name}: {str(e)}")
+            # The lease may still be ours until a whole TTL passes without renewal
+            if time.monotonic() - self._last_renewed >= self.ttl_seconds:
+                self._mark_lost()
+            return not self.lost
+        if not renewed:
+            self._mark_lost()
+            return False
+        self._last_renewed = time.monotonic()
+        return True
+
+    def check(self) -> None:
+        """Raise LeaseLost if the lease is no longer held."""
+        if self.lost:
+            raise LeaseLost(f"Lease of {self.name} lost (token {self.token})")
+
+    def fenced_set(self, key: str, value: str, ex: int) -> None:
+        """
+        Set a key only while the lease holds our token, so that a process which lost the
+        lease cannot overwrite the state of the one that took it over.
+
+        Raises:
+            LeaseLost: If the lease is no longer ours
+        """
+        if not get_redis().eval(FENCED_SET_SCRIPT, 2, self.key, key, self.token, value, ex):
+            self._mark_lost()
+        self.check()
+
+    def release(self) -> None:
+        """Stop renewing and give the lease up if it is still ours."""
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join()
+        if self.lost or self.token is None:
+            return
+        try:
+            get_redis().eval(RELEASE_SCRIPT, 1, self.key, self.token)
+        except RedisError as e:
+            logger.warning(f"Could not release the lease of {self.name}, it expires in {self.ttl_seconds}s: {str(e)}")
+
+    def _renew_until_stopped(self) -> None:
+        while not self._stop.wait(self.ttl_seconds / 3):
+            if not self.renew():
+                return
+
+    def _mark_lost(self) -> None:
+        if not self.lost:
+            self.lost = True
+            incr_metric(METRIC_NAME, f"{self.name}:lost")
+            logger.warning(f"Lease of {self.name} lost (token {self.token})")
+
+def get_current_lease() -> Optional[LeaseLock]:
+    """Get the lease held by the job running in this context, if any."""
+    return _current_lease.get()
+
+def with_lease(name: str, ttl_seconds: Optional[int] = None):
+    """
+    Run the decorated job only in the process holding its lease.
+    Other processes skip the run and return a skipped status. The lease is available to
+    the job (e.g. to ChunkedJob) through get_current_lease.
+
+    Args:
+        name (str): Job name the lease is taken for
+        ttl_seconds (int, optional): Lease TTL, MAINTENANCE_LEASE_SECONDS by default
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            lease = LeaseLock(name, ttl_seconds)
+            if not lease.acquire():
+                return {"status": "skipped", "reason": "lease held by another process"}
+            reset = _current_lease.set(lease)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current_lease.reset(reset)
+                lease.release()
+        return wrapper
+    return decorator
+
+def get_lease_holder(name: str) -> Optional[Dict[str, int]]:
+    """Get the fencing token and remaining milliseconds of a job's lease, if held."""
+    redis = get_redis()
+    token = redis.get(LEASE_KEY.format(name=name))
+    if token is None:
+        return None
+    return {"token": int(token), "ttl_ms": redis.pttl(LEASE_KEY.format(name=name))}
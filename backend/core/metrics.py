@@ -0,0 +1,34 @@
+from typing import Dict
+from redis.exceptions import RedisError
+from core.redis_client import get_redis
+from core.logger import logger
+
+METRICS_KEY = "metrics:{name}"
+
+def incr_metric(name: str, field: str, amount: int = 1) -> None:
+    """
+    Increment a counter in a Redis hash shared by all processes.
+    Metrics are best effort: a Redis failure is logged and ignored.
+
+    Args:
+        name (str): Metric group, e.g. 'response_cache'
+        field (str): Counter within the group, e.g. 'cities.search:hit'
+        amount (int): Increment
+    """
+    try:
+        get_redis().hincrby(METRICS_KEY.format(name=name), field, amount)
+    except RedisError as e:
+        logger.warning(f"Could not record metric {name}.{field}: {str(e)}")
+
+def get_metrics(name: str) -> Dict[str, int]:
+    """
+    Get all counters of a metric group.
+
+    Args:
+        name (str): Metric group
+
+    Returns:
+        dict: Counter name to value
+    """
+    values = get_redis().hgetall(METRICS_KEY.format(name=name))
+    return {field.decode(): int(value) for field, value in values.items()}
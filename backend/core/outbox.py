@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.celery_app import celery_app
+from core.config import settings
+from core.database import SessionLocal
+from core.logger import logger
+from core.metrics import incr_metric
+from models.outbox_message import OutboxMessage
+
+METRIC_NAME = "outbox"
+
+# Seconds before retrying a failed publication, doubling per attempt up to the cap
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+
+def enqueue_task(db: Session, task, *args, **kwargs) -> OutboxMessage:
+    """
+    Queue a Celery task in the outbox, without committing: it is published only if
+    the caller's transaction commits, and without any broker round-trip in the request.
+
+    Args:
+        db (Session): Session of the business change
+        task: Celery task to run; its arguments must be JSON serializable
+    """
+    message = OutboxMessage(task_name=task.name, args=list(args), kwargs=kwargs)
+    db.add(message)
+    return message
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+def relay_outbox(db: Optional[Session] = None, max_batches: int = 50) -> Dict[str, int]:
+    """
+    Publish due outbox messages to the broker, one batch per transaction.
+    Rows are claimed with SKIP LOCKED so several relays never publish the same batch.
+    Delivery is at least once: a message published just before a failed commit is published again.
+
+    Args:
+        db (Session, optional): Session to use; a new one is opened and closed by default
+        max_batches (int): Batches published before returning, to bound a run
+
+    Returns:
+        dict: Messages published and failed
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    stats = {"published": 0, "failed": 0}
+    try:
+        for _ in range(max_batches):
+            now = datetime.utcnow()
+            messages = db.query(OutboxMessage).filter(
+                OutboxMessage.sent_at.is_(None),
+                OutboxMessage.available_at <= now,
+                OutboxMessage.attempts < settings.OUTBOX_MAX_ATTEMPTS
+            ).order_by(OutboxMessage.id).limit(settings.OUTBOX_BATCH_SIZE).with_for_update(skip_locked=True).all()
+            if not messages:
+                break
+
+            for message in messages:
+                try:
+                    # Through the registered task when there is one, so unique tasks are deduplicated
+                    task = celery_app.tasks.get(message.task_name)
+                    if task is not None:
+                        task.apply_async(args=message.args or [], kwargs=message.kwargs or {})
+                    else:
+                        celery_app.send_task(message.task_name, args=message.args or [], kwargs=message.kwargs or {})
+                    message.sent_at = now
+                    stats["published"] += 1
+                except Exception as e:
+                    message.attempts += 1
+                    message.last_error = str(e)
+                    message.available_at = now + _retry_delay(message.attempts)
+                    stats["failed"] += 1
+                    logger.warning(f"Could not publish outbox message {message.id} ({message.task_name}): {str(e)}")
+            db.commit()
+
+            if len(messages) < settings.OUTBOX_BATCH_SIZE:
+                break
+
+        incr_metric(METRIC_NAME, "published", stats["published"])
+        incr_metric(METRIC_NAME, "failed", stats["failed"])
+        return stats
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+def get_backlog(db: Session) -> Dict[str, Any]:
+    """Get the unsent outbox messages: due, dead (out of attempts) and the age of the oldest."""
+    pending, oldest = db.query(func.count(OutboxMessage.id), func.min(OutboxMessage.created_at)).filter(
+        OutboxMessage.sent_at.is_(None),
+        OutboxMessage.attempts < settings.OUTBOX_MAX_ATTEMPTS
+    ).one()
+    dead = db.query(func.count(OutboxMessage.id)).filter(
+        OutboxMessage.sent_at.is_(None),
+        OutboxMessage.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+    ).scalar()
+    return {
+        "pending": pending,
+        "dead": dead,
+        "oldest_pending_seconds": int((datetime.utcnow() - oldest).total_seconds()) if oldest else None
+    }
@@ -0,0 +1,67 @@
+from typing import Optional
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+from core.config import settings
+from core.metrics import incr_metric
+from core.redis_client import get_redis
+from core.logger import logger
+from schemas.user import UserResponse
+
+METRIC_NAME = "profile_cache"
+
+PROFILE_KEY = "user_profile:{user_id}"
+
+def get_cached_profile(user_id: int) -> Optional[UserResponse]:
+    """
+    Get the cached profile read model of a user.
+    A Redis failure or an undecodable entry counts as a miss.
+
+    Args:
+        user_id (int): ID of the user
+
+    Returns:
+        UserResponse: Cached profile, or None on a miss
+    """
+    try:
+        cached = get_redis().get(PROFILE_KEY.format(user_id=user_id))
+    except RedisError as e:
+        logger.warning(f"Profile cache read failed for user {user_id}: {str(e)}")
+        return None
+
+    if cached is not None:
+        try:
+            profile = UserResponse.parse_raw(cached)
+            incr_metric(METRIC_NAME, "hit")
+            return profile
+        except ValidationError:
+            logger.warning(f"Discarding undecodable cached profile of user {user_id}")
+    incr_metric(METRIC_NAME, "miss")
+    return None
+
+def cache_profile(profile: UserResponse) -> None:
+    """
+    Store the profile read model of a user for PROFILE_CACHE_TTL_SECONDS.
+
+    Args:
+        profile (UserResponse): Profile with country and city names filled in
+    """
+    try:
+        get_redis().set(
+            PROFILE_KEY.format(user_id=profile.id),
+            profile.json(),
+            ex=settings.PROFILE_CACHE_TTL_SECONDS
+        )
+    except RedisError as e:
+        logger.warning(f"Profile cache write failed for user {profile.id}: {str(e)}")
+
+def invalidate_profile(user_id: int) -> None:
+    """
+    Drop the cached profile of a user. Call it after committing a change to the user.
+
+    Args:
+        user_id (int): ID of the user
+    """
+    try:
+        get_redis().delete(PROFILE_KEY.format(user_id=user_id))
+    except RedisError as e:
+        logger.error(f"Could not invalidate cached profile of user {user_id}: {str(e)}")
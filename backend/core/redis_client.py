@@ -0,0 +1,16 @@
+import redis
+from functools import lru_cache
+from core.config import settings
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """
+    Get the shared Redis client.
+    The client keeps its own connection pool, so one instance per process is enough.
+    Values are returned as bytes.
+    """
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+    )
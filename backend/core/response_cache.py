@@ -0,0 +1,79 @@
+import hashlib
+from typing import Callable, Dict, Optional, Tuple
+from redis.exceptions import RedisError
+from core.config import settings
+from core.dataset_version import get_dataset_versions
+from core.metrics import incr_metric, get_metrics
+from core.redis_client import get_redis
+from core.logger import logger
+
+METRIC_NAME = "response_cache"
+
+CACHE_KEY = "response_cache:{endpoint}:{versions}:{params}"
+
+def get_or_build(endpoint: str, datasets: Tuple[str, ...], params_key: str, build: Callable[[], bytes]) -> bytes:
+    """
+    Get pre-serialized response bytes from the shared Redis cache, building them on a miss.
+
+    Keys embed the dataset versions, so bumping a version invalidates every cached response
+    of that dataset in O(1); stale entries simply expire after RESPONSE_CACHE_TTL_SECONDS.
+    If Redis is unavailable the response is built without caching.
+
+    Args:
+        endpoint (str): Endpoint name used in the key and the hit/miss counters
+        datasets (tuple): Datasets the response is derived from
+        params_key (str): Normalized request parameters
+        build (Callable): Builds the serialized response on a miss
+
+    Returns:
+        bytes: Serialized response
+    """
+    versions = get_dataset_versions(*datasets)
+    if versions is None:
+        return build()
+
+    key = CACHE_KEY.format(
+        endpoint=endpoint,
+        versions=",".join(versions),
+        params=hashlib.sha256(params_key.encode()).hexdigest()[:32]
+    )
+    try:
+        cached = get_redis().get(key)
+    except RedisError as e:
+        logger.warning(f"Response cache read failed for {endpoint}: {str(e)}")
+        return build()
+
+    if cached is not None:
+        incr_metric(METRIC_NAME, f"{endpoint}:hit")
+        return cached
+
+    incr_metric(METRIC_NAME, f"{endpoint}:miss")
+    content = build()
+    try:
+        get_redis().set(key, content, ex=settings.RESPONSE_CACHE_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Response cache write failed for {endpoint}: {str(e)}")
+    return content
+
+def get_cache_stats(name: str = METRIC_NAME) -> Dict[str, Dict[str, float]]:
+    """
+    Get hit/miss counters and hit ratio per endpoint (or dataset, for the fragment cache).
+
+    Args:
+        name (str): Metric group with '<key>:hit' and '<key>:miss' counters
+
+    Returns:
+        dict: Endpoint name to hits, misses and hit_ratio
+    """
+    stats: Dict[str, Dict[str, float]] = {}
+    for field, value in get_metrics(name).items():
+        endpoint, _, outcome = field.rpartition(":")
+        entry = stats.setdefault(endpoint, {"hits": 0, "misses": 0, "hit_ratio": 0.0})
+        if outcome == "hit":
+            entry["hits"] = value
+        elif outcome == "miss":
+            entry["misses"] = value
+    for entry in stats.values():
+        total = entry["hits"] + entry["misses"]
+        entry["hit_ratio"] = round(entry["hits"] / total, 4) if total else 0.0
+    return stats
@@ -0,0 +1,141 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.redis_client import get_redis
+
+# Purposes of one-time tokens
+PASSWORD_RESET = "password_reset"
+EMAIL_VERIFICATION = "email_verification"
+
+def hash_token(token: str) -> str:
+    """Get the SHA-256 hex digest under which a token is stored."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class DatabaseTokenStore:
+    """
+    One-time tokens in the one_time_tokens table.
+    Writes join the caller's transaction and become effective when it commits.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def issue(self, user_id: int, purpose: str, ttl: timedelta) -> str:
+        """
+        Create a token for a user, invalidating the user's previous tokens for the same purpose.
+
+        Args:
+            user_id (int): ID of the user
+            purpose (str): PASSWORD_RESET or EMAIL_VERIFICATION
+            ttl (timedelta): Validity of the token
+
+        Returns:
+            str: The token, to send to the user (never stored)
+        """
+        token = secrets.token_urlsafe(32)
+        self.invalidate(user_id, purpose)
+        self.db.execute(
+            text(
+                "INSERT INTO one_time_tokens (user_id, purpose, token_hash, expires_at, is_used, created_at) "
+                "VALUES (:user_id, :purpose, :token_hash, :expires_at, 0, :now)"
+            ),
+            {
+                "user_id": user_id,
+                "purpose": purpose,
+                "token_hash": hash_token(token),
+                "expires_at": datetime.utcnow() + ttl,
+                "now": datetime.utcnow()
+            }
+        )
+        return token
+
+    def peek(self, token: str, purpose: str) -> Optional[int]:
+        """Get the user of a valid token without using it up."""
+        return self.db.execute(
+            text(
+                "SELECT user_id FROM one_time_tokens WHERE token_hash = :token_hash "
+                "AND purpose = :purpose AND is_used = 0 AND expires_at > :now"
+            ),
+            {"token_hash": hash_token(token), "purpose": purpose, "now": datetime.utcnow()}
+        ).scalar()
+
+    def consume(self, token: str, purpose: str) -> Optional[int]:
+        """
+        Use up a valid token. The row stays locked until the caller commits,
+        so a token cannot be consumed twice concurrently.
+
+        Returns:
+            int: ID of the user of the token, or None if it is unknown, used, expired or for another purpose
+        """
+        row = self.db.execute(
+            text(
+                "SELECT id, user_id FROM one_time_tokens WHERE token_hash = :token_hash "
+                "AND purpose = :purpose AND is_used = 0 AND expires_at > :now FOR UPDATE"
+            ),
+            {"token_hash": hash_token(token), "purpose": purpose, "now": datetime.utcnow()}
+        ).first()
+        if row is None:
+            return None
+        self.db.execute(text("UPDATE one_time_tokens SET is_used = 1 WHERE id = :id"), {"id": row.id})
+        return row.user_id
+
+    def invalidate(self, user_id: int, purpose: str) -> int:
+        """
+        Invalidate all unused tokens of a user for a purpose with one UPDATE.
+
+        Returns:
+            int: Number of tokens invalidated
+        """
+        return self.db.execute(
+            text("UPDATE one_time_tokens SET is_used = 1 WHERE user_id = :user_id AND purpose = :purpose AND is_used = 0"),
+            {"user_id": user_id, "purpose": purpose}
+        ).rowcount
+
+class RedisTokenStore:
+    """
+    One-time tokens in Redis: token:{purpose}:{sha256} holds the user ID and expires with the
+    token; token_user:{purpose}:{user_id} lists the user's token hashes for bulk invalidation.
+    Writes take effect immediately, independently of the caller's transaction.
+    """
+    TOKEN_KEY = "token:{purpose}:{token_hash}"
+    USER_KEY = "token_user:{purpose}:{user_id}"
+
+    def issue(self, user_id: int, purpose: str, ttl: timedelta) -> str:
+        token = secrets.token_urlsafe(32)
+        self.invalidate(user_id, purpose)
+        token_hash = hash_token(token)
+        user_key = self.USER_KEY.format(purpose=purpose, user_id=user_id)
+        pipeline = get_redis().pipeline()
+        pipeline.set(self.TOKEN_KEY.format(purpose=purpose, token_hash=token_hash), user_id, ex=ttl)
+        pipeline.sadd(user_key, token_hash)
+        pipeline.expire(user_key, ttl)
+        pipeline.execute()
+        return token
+
+    def peek(self, token: str, purpose: str) -> Optional[int]:
+        value = get_redis().get(self.TOKEN_KEY.format(purpose=purpose, token_hash=hash_token(token)))
+        return int(value) if value is not None else None
+
+    def consume(self, token: str, purpose: str) -> Optional[int]:
+        # GETDEL is atomic: only one caller gets the user ID
+        value = get_redis().getdel(self.TOKEN_KEY.format(purpose=purpose, token_hash=hash_token(token)))
+        return int(value) if value is not None else None
+
+    def invalidate(self, user_id: int, purpose: str) -> int:
+        redis = get_redis()
+        user_key = self.USER_KEY.format(purpose=purpose, user_id=user_id)
+        token_hashes = redis.smembers(user_key)
+        if not token_hashes:
+            return 0
+        keys = [self.TOKEN_KEY.format(purpose=purpose, token_hash=token_hash.decode()) for token_hash in token_hashes]
+        return redis.delete(*keys, user_key) - 1
+
+def get_token_store(db: Session):
+    """Get the one-time token store selected by ONE_TIME_TOKEN_BACKEND."""
+    if settings.ONE_TIME_TOKEN_BACKEND == "redis":
+        return RedisTokenStore()
+    return DatabaseTokenStore(db)
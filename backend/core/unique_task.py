@@ -0,0 +1,118 @@
+import hashlib
+import inspect
+from typing import Any, Callable, Optional, Union
+from celery import Task, states
+from celery.signals import task_revoked
+from celery.utils import uuid
+from redis.exceptions import RedisError
+from core.celery_app import celery_app
+from core.logger import logger
+from core.metrics import incr_metric
+from core.redis_client import get_redis
+
+METRIC_NAME = "unique_tasks"
+LOCK_KEY = "unique_task:{name}:{digest}"
+
+# Delete the lock only if it still belongs to the given task
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def claim_once(key: str, ttl: int) -> bool:
+    """
+    Claim a key for ttl seconds with SET NX.
+    Fails open: when Redis is unavailable the caller proceeds as if it had claimed the key.
+
+    Returns:
+        bool: True if the key was free
+    """
+    try:
+        return bool(get_redis().set(key, 1, nx=True, ex=ttl))
+    except RedisError as e:
+        logger.warning(f"Could not claim {key}: {str(e)}")
+        return True
+
+class UniqueTask(Task):
+    """
+    Task with at most one message in flight per uniqueness key.
+
+    Enqueuing takes a Redis lock (SET NX with a TTL) holding the task id. While the lock is
+    held, further enqueues with the same key are dropped and merged into the in-flight task,
+    whose AsyncResult they get. The lock is released when the task completes or is revoked
+    (e.g. expired in the queue); the TTL frees it if the worker dies. A Redis failure lets
+    the task through.
+    """
+    # Format string over the task's arguments, or a callable taking them; '' for one per task
+    unique_key: Optional[Union[str, Callable[..., Any]]] = None
+    unique_ttl: int = 600
+
+    def lock_key(self, args, kwargs) -> str:
+        bound = inspect.signature(self.run).bind(*args, **kwargs)
+        bound.apply_defaults()
+        if callable(self.unique_key):
+            key = str(self.unique_key(**bound.arguments))
+        else:
+            key = self.unique_key.format(**bound.arguments)
+        # Hashed so that arguments such as tokens are never stored in Redis
+        return LOCK_KEY.format(name=self.name, digest=hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, **options):
+        if self.unique_key is None:
+            return super().apply_async(args, kwargs, task_id=task_id, **options)
+
+        args, kwargs = args or (), kwargs or {}
+        task_id = task_id or uuid()
+        key = self.lock_key(args, kwargs)
+        try:
+            redis = get_redis()
+            if not redis.set(key, task_id, nx=True, ex=self.unique_ttl):
+                holder = redis.get(key)
+                # A retry re-enqueues under the id holding the lock
+                if holder is not None and holder.decode() != task_id:
+                    incr_metric(METRIC_NAME, f"{self.name}:suppressed")
+                    return self.AsyncResult(holder.decode())
+        except RedisError as e:
+            logger.warning(f"Could not lock {self.name}, enqueuing without deduplication: {str(e)}")
+
+        try:
+            return super().apply_async(args, kwargs, task_id=task_id, **options)
+        except Exception:
+            self._release(key, task_id)
+            raise
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        # A retry is still in flight under the same id
+        if self.unique_key is not None and status != states.RETRY:
+            self._release(self.lock_key(args or (), kwargs or {}), task_id)
+        super().after_return(status, retval, task_id, args, kwargs, einfo)
+
+    def _release(self, key: str, task_id: str) -> None:
+        try:
+            get_redis().eval(RELEASE_SCRIPT, 1, key, task_id)
+        except RedisError as e:
+            logger.warning(f"Could not release {key}, it expires in {self.unique_ttl}s: {str(e)}")
+
+@task_revoked.connect
+def release_revoked_task(sender=None, request=None, **kwargs):
+    """Release the lock of a revoked unique task; Celery does not call after_return for it."""
+    if isinstance(sender, UniqueTask) and sender.unique_key is not None and request is not None:
+        sender._release(sender.lock_key(request.args or (), request.kwargs or {}), request.id)
+
+def unique_task(key: Union[str, Callable[..., Any]], ttl: int, **options):
+    """
+    Declare a Celery task deduplicated by a key derived from its arguments.
+
+    Args:
+        key: Format string over the task's arguments (e.g. '{user_id}'), a callable
+            taking them, or '' for a single message in flight per task
+        ttl (int): Seconds after which the lock expires if the task never completes
+        **options: Options of celery_app.task (name, ignore_result, ...)
+
+    Example:
+        @unique_task("{user_id}", ttl=300, name="invalidate_user_sessions")
+        def invalidate_user_sessions(user_id: int): ...
+    """
+    return celery_app.task(base=UniqueTask, unique_key=key, unique_ttl=ttl, **options)
@@ -20,4 +20,48 @@ def parse_json_env_var(var_name, default_value):
         return json.loads(value)
     except json.JSONDecodeError:
         logger.warning(f"Could not parse {var_name}, using default value")
-        return default_value 
\ No newline at end of file
+        return default_value 
+
+def csv_has_header(file_path, first_column="id"):
+    """
+    Check whether a reference CSV file starts with a header row.
+    The dump files are not consistent: some ship a header line, others start with data.
+    
+    Args:
+        file_path: Path to the CSV file
+        first_column (str): Name of the first column when a header is present
+        
+    Returns:
+        bool: True if the first line is a header row
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        first_line = f.readline()
+    return first_line.lstrip("﻿").split(",", 1)[0].strip().strip('"').lower() == first_column
+
+def parse_id_list(value, max_ids):
+    """
+    Parse a comma-separated list of integer ids from a query parameter.
+    
+    Args:
+        value (str): Comma-separated ids, e.g. "1,2,3"
+        max_ids (int): Maximum number of distinct ids accepted
+        
+    Returns:
+        list: Distinct ids in the order given
+        
+    Raises:
+        ValueError: If an id is not an integer or there are too many ids
+    """
+    ids = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.lstrip("-").isdigit():
+            raise ValueError(f"Invalid id '{part}'")
+        ids.append(int(part))
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > max_ids:
+        raise ValueError(f"At most {max_ids} ids can be requested at once")
+    return ids
+
@@ -16,7 +16,7 @@ from core.database import Base
 from models.user import User
 from core.roles import UserRole
 from models.session import Session
-from models.password_reset import PasswordReset
+from models.one_time_token import OneTimeToken
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,52 @@
+"""add_import_jobs_table
+
+Revision ID: 3f1a7c2d9e10
+Revises: 8c9b3b1f7202
+Create Date: 2026-10-19 09:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f1a7c2d9e10'
+down_revision = '8c9b3b1f7202'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create import_jobs table
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dataset', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('task_id', sa.String(length=255), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=True),
+        sa.Column('added_rows', sa.Integer(), nullable=True),
+        sa.Column('updated_rows', sa.Integer(), nullable=True),
+        sa.Column('skipped_rows', sa.Integer(), nullable=True),
+        sa.Column('error_rows', sa.Integer(), nullable=True),
+        sa.Column('run_started_at', sa.DateTime(), nullable=True),
+        sa.Column('run_start_row', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Create indexes
+    op.create_index(op.f('ix_import_jobs_id'), 'import_jobs', ['id'], unique=False)
+    op.create_index('ix_import_jobs_dataset_status', 'import_jobs', ['dataset', 'status'], unique=False)
+
+
+def downgrade():
+    # Drop indexes
+    op.drop_index('ix_import_jobs_dataset_status', table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_id'), table_name='import_jobs')
+
+    # Drop table
+    op.drop_table('import_jobs')
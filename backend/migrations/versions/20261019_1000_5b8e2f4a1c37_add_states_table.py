@@ -0,0 +1,54 @@
+"""add_states_table
+
+Revision ID: 5b8e2f4a1c37
+Revises: 3f1a7c2d9e10
+Create Date: 2026-10-19 10:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f4a1c37'
+down_revision = '3f1a7c2d9e10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create states table
+    op.create_table(
+        'states',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('state_id', sa.Integer(), nullable=False),
+        sa.Column('state_name', sa.String(length=100), nullable=False),
+        sa.Column('state_code', sa.String(length=10), nullable=True),
+        sa.Column('country_id', sa.Integer(), nullable=False),
+        sa.Column('country_code', sa.String(length=2), nullable=False),
+        sa.Column('country_name', sa.String(length=100), nullable=False),
+        sa.Column('city_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('country_id', 'state_id', name='uq_states_country_state')
+    )
+
+    # Create indexes
+    op.create_index(op.f('ix_states_id'), 'states', ['id'], unique=False)
+    op.create_index('ix_states_country_id_state_name', 'states', ['country_id', 'state_name'], unique=False)
+
+    # Populate from the existing cities
+    op.execute("""
+        INSERT INTO states (state_id, state_name, state_code, country_id, country_code, country_name, city_count, updated_at)
+        SELECT state_id, MAX(state_name), MAX(state_code), country_id, MAX(country_code), MAX(country_name), COUNT(*), UTC_TIMESTAMP()
+        FROM cities
+        GROUP BY country_id, state_id
+    """)
+
+
+def downgrade():
+    # Drop indexes
+    op.drop_index('ix_states_country_id_state_name', table_name='states')
+    op.drop_index(op.f('ix_states_id'), table_name='states')
+
+    # Drop table
+    op.drop_table('states')
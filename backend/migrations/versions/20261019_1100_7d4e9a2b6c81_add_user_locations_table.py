@@ -0,0 +1,54 @@
+"""add_user_locations_table
+
+Revision ID: 7d4e9a2b6c81
+Revises: 5b8e2f4a1c37
+Create Date: 2026-10-19 11:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7d4e9a2b6c81'
+down_revision = '5b8e2f4a1c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create user_locations table; a SPATIAL index requires a NOT NULL column with a fixed SRID
+    op.execute("""
+        CREATE TABLE user_locations (
+            user_id INTEGER NOT NULL,
+            city_id INTEGER NOT NULL,
+            country_id INTEGER NOT NULL,
+            location POINT NOT NULL SRID 0,
+            updated_at DATETIME NULL,
+            PRIMARY KEY (user_id),
+            CONSTRAINT fk_user_locations_user_id FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    """)
+
+    # Create indexes
+    op.execute("CREATE SPATIAL INDEX ix_user_locations_location ON user_locations (location)")
+    op.create_index('ix_user_locations_city_id', 'user_locations', ['city_id'], unique=False)
+    op.create_index('ix_user_locations_country_id', 'user_locations', ['country_id'], unique=False)
+
+    # Populate from the users whose city has coordinates
+    op.execute("""
+        INSERT INTO user_locations (user_id, city_id, country_id, location, updated_at)
+        SELECT u.id, c.id, c.country_id, POINT(c.longitude, c.latitude), UTC_TIMESTAMP()
+        FROM users u
+        JOIN cities c ON c.id = u.city_id
+        WHERE c.latitude IS NOT NULL AND c.longitude IS NOT NULL
+    """)
+
+
+def downgrade():
+    # Drop indexes
+    op.drop_index('ix_user_locations_country_id', table_name='user_locations')
+    op.drop_index('ix_user_locations_city_id', table_name='user_locations')
+    op.drop_index('ix_user_locations_location', table_name='user_locations')
+
+    # Drop table
+    op.drop_table('user_locations')
@@ -0,0 +1,57 @@
+"""add_user_rollups_table
+
+Revision ID: 9c2f6b1e4d57
+Revises: 7d4e9a2b6c81
+Create Date: 2026-10-19 12:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9c2f6b1e4d57'
+down_revision = '7d4e9a2b6c81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create user_rollups table; the primary key serves every hierarchy read
+    op.create_table(
+        'user_rollups',
+        sa.Column('level', sa.SmallInteger(), nullable=False),
+        sa.Column('country_id', sa.Integer(), nullable=False),
+        sa.Column('state_id', sa.Integer(), nullable=False),
+        sa.Column('city_id', sa.Integer(), nullable=False),
+        sa.Column('user_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('level', 'country_id', 'state_id', 'city_id', name='pk_user_rollups')
+    )
+
+    # Populate from the existing users
+    op.execute("""
+        INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+        SELECT 0, COALESCE(c.country_id, u.country_id), 0, 0, COUNT(*), UTC_TIMESTAMP()
+        FROM users u LEFT JOIN cities c ON c.id = u.city_id
+        WHERE u.is_active = 1 AND COALESCE(c.country_id, u.country_id) IS NOT NULL
+        GROUP BY COALESCE(c.country_id, u.country_id)
+    """)
+    op.execute("""
+        INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+        SELECT 1, c.country_id, c.state_id, 0, COUNT(*), UTC_TIMESTAMP()
+        FROM users u JOIN cities c ON c.id = u.city_id
+        WHERE u.is_active = 1
+        GROUP BY c.country_id, c.state_id
+    """)
+    op.execute("""
+        INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+        SELECT 2, c.country_id, c.state_id, c.id, COUNT(*), UTC_TIMESTAMP()
+        FROM users u JOIN cities c ON c.id = u.city_id
+        WHERE u.is_active = 1
+        GROUP BY c.country_id, c.state_id, c.id
+    """)
+
+
+def downgrade():
+    # Drop table
+    op.drop_table('user_rollups')
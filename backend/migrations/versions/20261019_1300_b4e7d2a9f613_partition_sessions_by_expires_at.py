@@ -0,0 +1,98 @@
+"""partition_sessions_by_expires_at
+
+Revision ID: b4e7d2a9f613
+Revises: 9c2f6b1e4d57
+Create Date: 2026-10-19 13:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = 'b4e7d2a9f613'
+down_revision = '9c2f6b1e4d57'
+branch_labels = None
+depends_on = None
+
+# Months past the current one partitioned up front; the beat task keeps adding more
+MONTHS_AHEAD = 2
+
+
+def month_start(year, month):
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return datetime(year, month, 1)
+
+
+def check_compatibility(conn):
+    """
+    Partitioned InnoDB tables can neither have nor be referenced by foreign keys, and every
+    unique key must include the partitioning column. Fail before changing anything otherwise.
+    """
+    referencing = conn.execute(sa.text("""
+        SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = 'sessions'
+    """)).all()
+    if referencing:
+        names = ", ".join(f"{row.TABLE_NAME}.{row.CONSTRAINT_NAME}" for row in referencing)
+        raise RuntimeError(f"Foreign keys reference sessions and would block partitioning: {names}")
+
+    unique_keys = conn.execute(sa.text("""
+        SELECT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sessions' AND NON_UNIQUE = 0 AND INDEX_NAME <> 'PRIMARY'
+        GROUP BY INDEX_NAME
+        HAVING SUM(COLUMN_NAME = 'expires_at') = 0
+    """)).scalars().all()
+    if unique_keys:
+        raise RuntimeError(f"Unique keys of sessions without expires_at would block partitioning: {', '.join(unique_keys)}")
+
+    null_expiry = conn.execute(sa.text("SELECT COUNT(*) FROM sessions WHERE expires_at IS NULL")).scalar()
+    if null_expiry:
+        raise RuntimeError(f"{null_expiry} sessions have no expires_at")
+
+
+def upgrade():
+    conn = op.get_bind()
+    check_compatibility(conn)
+
+    # Drop the foreign key to users; the relationship is kept at the ORM level
+    foreign_keys = conn.execute(sa.text("""
+        SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sessions' AND CONSTRAINT_TYPE = 'FOREIGN KEY'
+    """)).scalars().all()
+    for name in foreign_keys:
+        op.drop_constraint(name, 'sessions', type_='foreignkey')
+
+    # Keep user_id indexed under the model's index name (the foreign key brought its own index)
+    user_id_indexes = conn.execute(sa.text("""
+        SELECT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sessions' AND COLUMN_NAME = 'user_id' AND SEQ_IN_INDEX = 1
+    """)).scalars().all()
+    if 'ix_sessions_user_id' not in user_id_indexes:
+        op.create_index('ix_sessions_user_id', 'sessions', ['user_id'], unique=False)
+    for name in user_id_indexes:
+        if name in foreign_keys:
+            op.drop_index(name, table_name='sessions')
+
+    # The partitioning column must be part of the primary key
+    op.execute("ALTER TABLE sessions DROP PRIMARY KEY, ADD PRIMARY KEY (id, expires_at)")
+
+    # One partition for everything that expired before this month, then one per month
+    now = datetime.utcnow()
+    current = month_start(now.year, now.month)
+    definitions = [f"PARTITION p{month_start(now.year, now.month - 1):%Y%m} VALUES LESS THAN ('{current:%Y-%m-%d %H:%M:%S}')"]
+    for offset in range(MONTHS_AHEAD + 1):
+        start = month_start(now.year, now.month + offset)
+        end = month_start(now.year, now.month + offset + 1)
+        definitions.append(f"PARTITION p{start:%Y%m} VALUES LESS THAN ('{end:%Y-%m-%d %H:%M:%S}')")
+    definitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    op.execute(f"ALTER TABLE sessions PARTITION BY RANGE COLUMNS(expires_at) ({', '.join(definitions)})")
+
+
+def downgrade():
+    op.execute("ALTER TABLE sessions REMOVE PARTITIONING")
+    op.execute("ALTER TABLE sessions DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+
+    # Sessions of deleted users were not cascaded while the foreign key was gone
+    op.execute("DELETE s FROM sessions s LEFT JOIN users u ON u.id = s.user_id WHERE u.id IS NULL")
+    op.create_foreign_key('sessions_ibfk_1', 'sessions', 'users', ['user_id'], ['id'])
@@ -0,0 +1,26 @@
+"""add_sessions_user_activity_index
+
+Revision ID: d1a8c5e3b920
+Revises: b4e7d2a9f613
+Create Date: 2026-10-19 14:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd1a8c5e3b920'
+down_revision = 'b4e7d2a9f613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (user_id, last_activity) orders a user's sessions for eviction and replaces the user_id index
+    op.create_index('ix_sessions_user_id_last_activity', 'sessions', ['user_id', 'last_activity'], unique=False)
+    op.drop_index('ix_sessions_user_id', table_name='sessions')
+
+
+def downgrade():
+    op.create_index('ix_sessions_user_id', 'sessions', ['user_id'], unique=False)
+    op.drop_index('ix_sessions_user_id_last_activity', table_name='sessions')
@@ -0,0 +1,73 @@
+"""add_one_time_tokens_table
+
+Revision ID: e6b3f8a1c472
+Revises: d1a8c5e3b920
+Create Date: 2026-10-19 15:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e6b3f8a1c472'
+down_revision = 'd1a8c5e3b920'
+branch_labels = None
+depends_on = None
+
+# Tables merged into one_time_tokens, with the purpose of their tokens
+LEGACY_TABLES = {
+    'password_resets': 'password_reset',
+    'email_verifications': 'email_verification',
+}
+
+
+def upgrade():
+    op.create_table(
+        'one_time_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('purpose', sa.String(length=32), nullable=False),
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('is_used', sa.Boolean(), nullable=False, server_default=sa.text('0')),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token_hash')
+    )
+    op.create_index('ix_one_time_tokens_user_id_purpose_is_used', 'one_time_tokens', ['user_id', 'purpose', 'is_used'], unique=False)
+
+    # Carry over the tokens still valid, stored as their SHA-256 like new ones
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, purpose in LEGACY_TABLES.items():
+        if table not in existing:
+            continue
+        op.execute(sa.text(f"""
+            INSERT IGNORE INTO one_time_tokens (user_id, purpose, token_hash, expires_at, is_used, created_at)
+            SELECT user_id, :purpose, SHA2(token, 256), expires_at, 0, created_at
+            FROM {table}
+            WHERE is_used = 0 AND expires_at > UTC_TIMESTAMP()
+        """).bindparams(purpose=purpose))
+        op.drop_table(table)
+
+
+def downgrade():
+    # Tokens cannot be recovered from their hashes: the old tables come back empty
+    for table in LEGACY_TABLES:
+        op.create_table(
+            table,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('token', sa.String(length=255), nullable=False),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('is_used', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+    op.create_index('ix_email_verifications_token', 'email_verifications', ['token'], unique=True)
+
+    op.drop_index('ix_one_time_tokens_user_id_purpose_is_used', table_name='one_time_tokens')
+    op.drop_table('one_time_tokens')
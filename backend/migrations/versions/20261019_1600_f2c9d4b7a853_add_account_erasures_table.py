@@ -0,0 +1,43 @@
+"""add_account_erasures_table
+
+Revision ID: f2c9d4b7a853
+Revises: e6b3f8a1c472
+Create Date: 2026-10-19 16:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2c9d4b7a853'
+down_revision = 'e6b3f8a1c472'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'account_erasures',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('task_id', sa.String(length=255), nullable=True),
+        sa.Column('step', sa.String(length=50), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=True),
+        sa.Column('run_started_at', sa.DateTime(), nullable=True),
+        sa.Column('run_start_row', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_account_erasures_id'), 'account_erasures', ['id'], unique=False)
+    op.create_index('ix_account_erasures_user_id_status', 'account_erasures', ['user_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_account_erasures_user_id_status', table_name='account_erasures')
+    op.drop_index(op.f('ix_account_erasures_id'), table_name='account_erasures')
+    op.drop_table('account_erasures')
@@ -0,0 +1,37 @@
+"""add_outbox_messages_table
+
+Revision ID: a7d3e9c1f064
+Revises: f2c9d4b7a853
+Create Date: 2026-10-19 17:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9c1f064'
+down_revision = 'f2c9d4b7a853'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_name', sa.String(length=255), nullable=False),
+        sa.Column('args', sa.JSON(), nullable=True),
+        sa.Column('kwargs', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_messages_sent_at_available_at', 'outbox_messages', ['sent_at', 'available_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_outbox_messages_sent_at_available_at', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -1,6 +1,6 @@
 from core.init_db import Base
 from .user import User
-from .password_reset import PasswordReset
+from .one_time_token import OneTimeToken
 from .session import Session
 
-__all__ = ["Base", "User", "PasswordReset", "Session"] 
\ No newline at end of file
+__all__ = ["Base", "User", "OneTimeToken", "Session"] 
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from core.init_db import Base
+from datetime import datetime
+
+class AccountErasure(Base):
+    __tablename__ = "account_erasures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key: the record outlives the data it erased
+    user_id = Column(Integer, nullable=False)
+    requested_by = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+    task_id = Column(String(255), nullable=True)
+    # Step being processed; the steps before it are done, so it doubles as the resume checkpoint
+    step = Column(String(50), nullable=True)
+    processed_rows = Column(Integer, default=0)
+    # Start of the current (possibly resumed) run, used for throughput
+    run_started_at = Column(DateTime, nullable=True)
+    run_start_row = Column(Integer, default=0)
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_account_erasures_user_id_status', 'user_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f"<AccountErasure {self.id} - User {self.user_id} ({self.status})>"
@@ -0,0 +1,25 @@
+"""
+Import every model, registering it with Base.metadata so that relationships declared
+by name resolve. Import this module before using the ORM outside the API.
+"""
+from .country import Country
+from .city import City
+from .user import User
+from .session import Session
+from .notification import Notification
+from .payment import Payment
+from .subscription import Subscription
+from .subscription_user import SubscriptionUser
+from .one_time_token import OneTimeToken
+from .account_erasure import AccountErasure
+from .outbox_message import OutboxMessage
+from .import_job import ImportJob
+from .state import State
+from .user_location import UserLocation
+from .user_rollup import UserRollup
+
+__all__ = [
+    "Country", "City", "User", "Session", "Notification", "Payment", "Subscription",
+    "SubscriptionUser", "OneTimeToken", "AccountErasure", "OutboxMessage", "ImportJob",
+    "State", "UserLocation", "UserRollup"
+]
@@ -83,13 +83,14 @@ class Country(Base):
         return value
 
     @validates('timezones')
-    def validate_timezones(self, key: str, value: Optional[List[str]]) -> Optional[List[str]]:
-        """Validate timezone format."""
+    def validate_timezones(self, key: str, value: Optional[List[Union[str, dict]]]) -> Optional[List[Union[str, dict]]]:
+        """Validate timezone format (zone names or objects with a zoneName)."""
         if value:
             if not isinstance(value, list):
                 raise ValueError('Timezones must be a list')
             for tz in value:
-                if not re.match(r'^[A-Za-z]+/[A-Za-z_]+$', tz):
+                zone_name = tz.get('zoneName') if isinstance(tz, dict) else tz
+                if not isinstance(zone_name, str) or not re.match(r'^[A-Za-z]+(/[A-Za-z0-9_+\-]+)*$', zone_name):
                     raise ValueError(f'Invalid timezone format: {tz}')
         return value
 
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from core.init_db import Base
+from datetime import datetime
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    dataset = Column(String(50), nullable=False)  # e.g., 'countries', 'cities'
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+    task_id = Column(String(255), nullable=True)
+    total_rows = Column(Integer, default=0)
+    # Number of source rows committed so far; doubles as the resume checkpoint
+    processed_rows = Column(Integer, default=0)
+    added_rows = Column(Integer, default=0)
+    updated_rows = Column(Integer, default=0)
+    skipped_rows = Column(Integer, default=0)
+    error_rows = Column(Integer, default=0)
+    # Start of the current (possibly resumed) run, used for throughput and ETA
+    run_started_at = Column(DateTime, nullable=True)
+    run_start_row = Column(Integer, default=0)
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_import_jobs_dataset_status', 'dataset', 'status'),
+    )
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} - {self.dataset} ({self.status})>"
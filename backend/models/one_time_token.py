@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
+from core.init_db import Base
+from datetime import datetime
+
+class OneTimeToken(Base):
+    """
+    Single-use tokens sent by email (password reset, email verification).
+    Only the SHA-256 of each token is stored; managed through core.token_store.
+    """
+    __tablename__ = "one_time_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    purpose = Column(String(32), nullable=False)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False)
+    is_used = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Bulk invalidation of a user's tokens for one purpose
+        Index('ix_one_time_tokens_user_id_purpose_is_used', 'user_id', 'purpose', 'is_used'),
+    )
+
+    def __repr__(self):
+        return f"<OneTimeToken {self.id} - {self.purpose} for User {self.user_id}>"
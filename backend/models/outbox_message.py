@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from core.init_db import Base
+from datetime import datetime
+
+class OutboxMessage(Base):
+    """
+    Celery task written in the same transaction as the change that triggers it,
+    and published to the broker later by the outbox relay (core.outbox).
+    """
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True)
+    task_name = Column(String(255), nullable=False)
+    args = Column(JSON, nullable=True)
+    kwargs = Column(JSON, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    # Not published before this time; pushed back after a failed attempt
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Relay scan of the unsent messages that are due
+        Index('ix_outbox_messages_sent_at_available_at', 'sent_at', 'available_at'),
+    )
+
+    def __repr__(self):
+        return f"<OutboxMessage {self.id} - {self.task_name}>"
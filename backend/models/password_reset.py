@@ -1,22 +0,0 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
-from datetime import datetime
-from core.init_db import Base
-import sqlalchemy as sa
-
-class PasswordReset(Base):
-    __tablename__ = "password_resets"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(255), nullable=False)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
-    is_used = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'))
-    updated_at = Column(DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), onupdate=sa.text('CURRENT_TIMESTAMP'))
-
-    # Use string reference for relationship to avoid circular imports
-    user = relationship("User", back_populates="password_resets", lazy="joined")
-
-    def __repr__(self):
-        return f"<PasswordReset {self.token}>" 
\ No newline at end of file
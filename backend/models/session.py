@@ -1,25 +1,35 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.init_db import Base
 
 class Session(Base):
+    """
+    Login sessions, range-partitioned by month of expires_at (see SessionPartitionService).
+    MySQL requires the partitioning column in the primary key and forbids foreign keys on
+    partitioned tables, hence the (id, expires_at) key and the plain user_id column.
+    """
     __tablename__ = "sessions"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    user_id = Column(Integer, nullable=False)
     access_token = Column(String(500), nullable=False)
     refresh_token = Column(String(500), nullable=False)
     token_type = Column(String(50), default="bearer")
     ip_address = Column(String(50), nullable=True)
     user_agent = Column(String(500), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, primary_key=True)
     last_activity = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
 
     # Relationships
-    user = relationship("User", back_populates="sessions")
+    user = relationship("User", back_populates="sessions", primaryjoin="foreign(Session.user_id) == User.id")
+
+    __table_args__ = (
+        # Serves user-scoped lookups and the least-recently-active eviction order
+        Index('ix_sessions_user_id_last_activity', 'user_id', 'last_activity'),
+    )
 
     def __repr__(self):
         return f"<Session {self.id} for User {self.user_id}>" 
\ No newline at end of file
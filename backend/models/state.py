@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, UniqueConstraint
+from core.init_db import Base
+from datetime import datetime
+
+class State(Base):
+    """
+    States per country, materialized from the cities table.
+    Rebuilt by the city import pipelines and on city writes; never edited directly.
+    """
+    __tablename__ = "states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    state_id = Column(Integer, nullable=False)
+    state_name = Column(String(100), nullable=False)
+    state_code = Column(String(10), nullable=True)
+    country_id = Column(Integer, nullable=False)
+    country_code = Column(String(2), nullable=False)
+    country_name = Column(String(100), nullable=False)
+    city_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('country_id', 'state_id', name='uq_states_country_state'),
+        Index('ix_states_country_id_state_name', 'country_id', 'state_name'),
+    )
+
+    def __repr__(self):
+        return f"<State {self.state_name} ({self.country_code})>"
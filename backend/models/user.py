@@ -36,9 +36,14 @@ class User(Base):
     subscription = Column(String(50), nullable=True)
 
     # Relationships
-    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan", lazy="joined")
-    password_resets = relationship("PasswordReset", back_populates="user", cascade="all, delete-orphan", lazy="joined")
-    email_verifications = relationship("EmailVerification", back_populates="user", cascade="all, delete-orphan", lazy="joined")
+    # No foreign key on the partitioned sessions table: the join is declared here
+    sessions = relationship(
+        "Session",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        lazy="joined",
+        primaryjoin="User.id == foreign(Session.user_id)"
+    )
     country = relationship("Country", back_populates="users")
     city = relationship("City", back_populates="users")
     subscription_users = relationship("SubscriptionUser", back_populates="user", cascade="all, delete-orphan", lazy="joined")
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.types import UserDefinedType
+from core.init_db import Base
+from datetime import datetime
+
+class Point(UserDefinedType):
+    """
+    MySQL POINT in planar lon/lat coordinates (x = longitude, y = latitude, SRID 0).
+    The SRID attribute lets the optimizer use the SPATIAL index.
+    """
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "POINT SRID 0"
+
+class UserLocation(Base):
+    """
+    Location of each user whose city has coordinates, denormalized from users and cities
+    for spatial queries. Maintained by UserLocationService; never edited directly.
+    """
+    __tablename__ = "user_locations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    city_id = Column(Integer, nullable=False)
+    country_id = Column(Integer, nullable=False)
+    location = Column(Point(), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_user_locations_location', 'location', mysql_prefix='SPATIAL'),
+        Index('ix_user_locations_city_id', 'city_id'),
+        Index('ix_user_locations_country_id', 'country_id'),
+    )
+
+    def __repr__(self):
+        return f"<UserLocation user={self.user_id} city={self.city_id}>"
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, SmallInteger, DateTime, Index, PrimaryKeyConstraint
+from core.init_db import Base
+from datetime import datetime
+
+# Levels of the rollup rows; lower levels use 0 for the finer IDs
+LEVEL_COUNTRY = 0
+LEVEL_STATE = 1
+LEVEL_CITY = 2
+
+class UserRollup(Base):
+    """
+    Active user counts per country, state and city. Users are placed by their city
+    (or only their country when they have no city). Kept up to date with deltas by
+    UserRollupService and rebuilt nightly; never edited directly.
+    """
+    __tablename__ = "user_rollups"
+
+    level = Column(SmallInteger, nullable=False)
+    country_id = Column(Integer, nullable=False)
+    state_id = Column(Integer, nullable=False, default=0)
+    city_id = Column(Integer, nullable=False, default=0)
+    user_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('level', 'country_id', 'state_id', 'city_id', name='pk_user_rollups'),
+    )
+
+    def __repr__(self):
+        return f"<UserRollup level={self.level} {self.country_id}/{self.state_id}/{self.city_id}: {self.user_count}>"
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class AccountErasureProgress(BaseModel):
+    erasure_id: int
+    user_id: int
+    status: str
+    task_id: Optional[str] = None
+    step: Optional[str] = Field(None, description="Step being processed; the erasure resumes from here")
+    processed_rows: int = Field(0, description="Rows deleted or anonymized so far")
+    rows_per_second: Optional[float] = Field(None, description="Throughput of the current run")
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+class AccountErasureResponse(BaseModel):
+    message: str
+    status: str
+    data: AccountErasureProgress
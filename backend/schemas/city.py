@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
+from schemas.country import CountryResponse
 
 class CityBase(BaseModel):
     name: str
@@ -54,6 +55,20 @@ class CitySearchParams(BaseModel):
     def limit(self) -> int:
         return self.per_page
 
+    def cache_key(self) -> str:
+        """Normalized representation of the search, matching how the filters are applied."""
+        return "|".join([
+            (self.name or "").lower(),
+            str(self.country_id or ""),
+            str(self.state_id or ""),
+            (self.state_code or "").upper(),
+            (self.state_name or "").lower(),
+            (self.country_code or "").upper(),
+            self.wikiDataId or "",
+            str(self.page),
+            str(self.per_page)
+        ])
+
 class CitySearchResponse(BaseModel):
     message: str
     status: str
@@ -75,4 +90,59 @@ class StateSearchResponse(BaseModel):
     message: str
     status: str
     data: List[StateResponse]
-    total: int 
\ No newline at end of file
+    total: int
+
+class CityResolveCandidate(BaseModel):
+    type: str = Field(..., description="'city' or 'state'")
+    score: float = Field(..., description="Similarity to the requested name, from 0 to 1")
+    id: Optional[int] = Field(None, description="City ID (city candidates only)")
+    name: str
+    state_id: int
+    state_name: str
+    state_code: Optional[str] = None
+    country_id: int
+    country_code: str
+    country_name: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    wikiDataId: Optional[str] = None
+
+class CityResolveResponse(BaseModel):
+    message: str
+    status: str
+    data: List[CityResolveCandidate]
+    total: int
+
+class CityBatchResponse(BaseModel):
+    message: str
+    status: str
+    data: Dict[int, CityResponse]
+    missing: List[int]
+
+
+class GeoPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude in degrees")
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude in degrees")
+
+class ReverseGeocodeBatchRequest(BaseModel):
+    points: List[GeoPoint]
+    max_distance_km: Optional[float] = Field(None, gt=0, description="Ignore cities farther than this distance")
+
+class ReverseGeocodeResult(BaseModel):
+    latitude: float
+    longitude: float
+    distance_km: Optional[float] = Field(None, description="Great-circle distance to the city in km")
+    city: Optional[CityResponse] = None
+    state: Optional[StateResponse] = None
+    country: Optional[CountryResponse] = None
+
+class ReverseGeocodeResponse(BaseModel):
+    message: str
+    status: str
+    data: ReverseGeocodeResult
+
+class ReverseGeocodeBatchResponse(BaseModel):
+    message: str
+    status: str
+    data: List[ReverseGeocodeResult]
+    total: int
@@ -49,8 +49,41 @@ class CountrySearchParams(BaseModel):
     def limit(self) -> int:
         return self.per_page
 
+    def cache_key(self) -> str:
+        """Normalized representation of the search, matching how the filters are applied."""
+        return "|".join([
+            (self.name or "").lower(),
+            (self.iso2 or "").upper(),
+            (self.iso3 or "").upper(),
+            (self.region or "").lower(),
+            (self.subregion or "").lower(),
+            (self.currency or "").lower(),
+            str(self.page),
+            str(self.per_page)
+        ])
+
 class CountrySearchResponse(BaseModel):
     message: str = "Countries found successfully"
     status: str = "success"
     data: List[CountryResponse]
-    total: int 
\ No newline at end of file
+    total: int
+
+class CountryBatchResponse(BaseModel):
+    message: str
+    status: str
+    data: Dict[int, CountryResponse]
+    missing: List[int]
+
+class CountryTimezoneMatch(BaseModel):
+    id: int
+    name: str
+    iso2: Optional[str] = None
+    iso3: str
+    timezones: Optional[List[Dict[str, Any]]] = Field(None, description="All timezones of the country")
+
+class CountryTimezoneResponse(BaseModel):
+    message: str
+    status: str
+    data: List[CountryTimezoneMatch]
+    total: int
+
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class ImportJobProgress(BaseModel):
+    job_id: int
+    dataset: str
+    status: str
+    task_id: Optional[str] = None
+    total_rows: int = 0
+    processed_rows: int = Field(0, description="Rows committed so far; the job resumes from here")
+    added_rows: int = 0
+    updated_rows: int = 0
+    skipped_rows: int = 0
+    error_rows: int = 0
+    percent: float = 0.0
+    rows_per_second: Optional[float] = Field(None, description="Throughput of the current run")
+    eta_seconds: Optional[int] = Field(None, description="Estimated seconds until the job finishes")
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+class ImportJobResponse(BaseModel):
+    message: str
+    status: str
+    data: ImportJobProgress
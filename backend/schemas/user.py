@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, constr
 from typing import Optional, List
 from datetime import datetime
+from enum import Enum
 from core.roles import UserRole
 
 class LoginRequest(BaseModel):
@@ -96,6 +97,8 @@ class UserUpdate(BaseModel):
     country_id: Optional[int] = None
     city_id: Optional[int] = None
     language: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="GPS latitude; sets city and country to the nearest city unless city_id is given")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="GPS longitude; sets city and country to the nearest city unless city_id is given")
     
 class UserResponse(UserBase):
     id: int
@@ -115,6 +118,63 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class NearbyUser(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    city_id: int
+    city_name: Optional[str] = None
+    country_id: int
+    distance_km: Optional[float] = Field(None, description="Great-circle distance between the cities, in km (radius searches only)")
+
+class NearbyUsersResponse(BaseModel):
+    message: str
+    status: str
+    data: List[NearbyUser]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; absent on the last page")
+    total: Optional[int] = Field(None, description="Number of matching users (admin searches only)")
+
+class DistributionDepth(str, Enum):
+    COUNTRY = "country"
+    STATE = "state"
+    CITY = "city"
+
+class UserDistributionCity(BaseModel):
+    id: int
+    name: Optional[str] = None
+    user_count: int
+
+class UserDistributionState(BaseModel):
+    id: int
+    name: Optional[str] = None
+    user_count: int
+    cities: Optional[List[UserDistributionCity]] = None
+
+class UserDistributionCountry(BaseModel):
+    id: int
+    name: Optional[str] = None
+    user_count: int = Field(..., description="Active users in the country, including those without a city")
+    states: Optional[List[UserDistributionState]] = None
+
+class UserDistributionResponse(BaseModel):
+    message: str
+    status: str
+    data: List[UserDistributionCountry]
+    total: int
+
+class UserImportError(BaseModel):
+    row: int = Field(..., description="1-based record number in the file, header excluded")
+    email: Optional[str] = None
+    error: str
+
+class UserImportResponse(BaseModel):
+    message: str
+    status: str
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[UserImportError]
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
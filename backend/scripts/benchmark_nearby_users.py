@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+import os
+import sys
+import random
+import time
+import click
+import numpy as np
+from sqlalchemy import text
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal
+from core.security import get_password_hash
+# Register every model so relationships resolve
+import models.all
+from services.city.city_store import EARTH_RADIUS_KM
+from services.user.nearby_user_service import NearbyUserService
+from services.user.user_service import UserService
+from schemas.user import UserUpdate
+from services.user.user_location_service import INSERT_USER_LOCATIONS_SQL
+
+# Synthetic users are recognized by their email domain
+BENCH_DOMAIN = "bench.invalid"
+
+INSERT_USERS_SQL = """
+INSERT INTO users (email, first_name, last_name, role, is_active, is_blocked, is_verified, retry_count, password, language, country_id, city_id)
+VALUES (:email, 'Bench', :last_name, 'user', 1, 0, 1, 0, :password, 'en', :country_id, :city_id)
+"""
+
+def located_cities(db):
+    """Get (id, country_id, latitude, longitude) of every city with coordinates."""
+    return db.execute(text(
+        "SELECT id, country_id, latitude, longitude FROM cities "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    )).all()
+
+def time_call(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+def summary(timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return f"median {timings[len(timings) // 2] * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms"
+
+@click.group()
+def cli():
+    """Benchmark the nearby users search on synthetic users."""
+
+@cli.command()
+@click.option('--users', '-u', default=1000000, show_default=True, help='Synthetic users to add')
+@click.option('--batch-size', '-b', default=10000, show_default=True, help='Users per INSERT')
+@click.option('--seed', default=42, show_default=True, help='Random seed')
+def seed(users, batch_size, seed):
+    """Add synthetic users spread over random cities, with their locations."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        cities = located_cities(db)
+        if not cities:
+            raise click.ClickException("No city with coordinates; load the cities first")
+        start = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM users")).scalar()
+        # One hash for everyone: hashing millions of passwords would dominate the run
+        password = get_password_hash("bench-password")
+
+        started = time.perf_counter()
+        for offset in range(0, users, batch_size):
+            rows = []
+            for number in range(start + offset, start + min(offset + batch_size, users)):
+                city = rng.choice(cities)
+                rows.append({
+                    "email": f"user{number}@{BENCH_DOMAIN}",
+                    "last_name": str(number),
+                    "password": password,
+                    "country_id": city.country_id,
+                    "city_id": city.id
+                })
+            db.execute(text(INSERT_USERS_SQL), rows)
+            db.commit()
+            click.echo(f"Inserted {offset + len(rows)} users")
+
+        db.execute(text(INSERT_USER_LOCATIONS_SQL + " AND u.email LIKE :pattern"), {"pattern": f"%@{BENCH_DOMAIN}"})
+        db.commit()
+        click.echo(f"Seeded {users} users in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+@cli.command()
+@click.option('--queries', '-q', default=50, show_default=True, help='Searches per mode')
+@click.option('--radius', '-r', default=25.0, show_default=True, help='Radius in km')
+@click.option('--limit', '-l', default=20, show_default=True, help='Page size')
+@click.option('--baseline-queries', default=3, show_default=True, help='Searches with the Python baseline (0 to skip)')
+@click.option('--seed', default=7, show_default=True, help='Random seed')
+def run(queries, radius, limit, baseline_queries, seed):
+    """Time radius pages, counts and pagination against the join-and-compute-in-Python baseline."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        users = db.execute(text("SELECT COUNT(*) FROM user_locations")).scalar()
+        click.echo(f"{users} located users")
+        centers = [(city.latitude, city.longitude) for city in rng.sample(located_cities(db), queries)]
+        service = NearbyUserService(db)
+
+        plan = db.execute(text(
+            "EXPLAIN SELECT COUNT(*) FROM user_locations ul "
+            "WHERE MBRCovers(ST_GeomFromText('POLYGON((0 0, 1 0, 1 1, 0 1, 0 0))'), ul.location)"
+        )).mappings().first()
+        click.echo(f"Index used by the bounding box filter: {plan['key']}")
+
+        first_pages, counts, next_pages = [], [], []
+        for latitude, longitude in centers:
+            elapsed, page = time_call(lambda: service.search_radius(latitude, longitude, radius, limit=limit))
+            first_pages.append(elapsed)
+            elapsed, _ = time_call(lambda: service.count_radius(latitude, longitude, radius))
+            counts.append(elapsed)
+            if page["next_cursor"]:
+                elapsed, _ = time_call(lambda: service.search_radius(latitude, longitude, radius, limit=limit, cursor=page["next_cursor"]))
+                next_pages.append(elapsed)
+
+        click.echo(f"{'first page':>12}: {summary(first_pages)}")
+        click.echo(f"{'count':>12}: {summary(counts)}")
+        if next_pages:
+            click.echo(f"{'next page':>12}: {summary(next_pages)}")
+
+        baseline = []
+        for latitude, longitude in centers[:baseline_queries]:
+            def compute_in_python():
+                rows = np.array(db.execute(text(
+                    "SELECT u.id, c.latitude, c.longitude FROM users u JOIN cities c ON c.id = u.city_id "
+                    "WHERE u.is_active = 1 AND c.latitude IS NOT NULL AND c.longitude IS NOT NULL"
+                )).all(), dtype=np.float64).reshape(-1, 3)
+                lat, lon = np.radians(rows[:, 1]), np.radians(rows[:, 2])
+                point_lat, point_lon = np.radians(latitude), np.radians(longitude)
+                a = np.sin((lat - point_lat) / 2) ** 2 + np.cos(point_lat) * np.cos(lat) * np.sin((lon - point_lon) / 2) ** 2
+                distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+                inside = np.flatnonzero(distances <= radius)
+                return inside[np.argsort(distances[inside], kind="stable")][:limit]
+            elapsed, _ = time_call(compute_in_python)
+            baseline.append(elapsed)
+        if baseline:
+            click.echo(f"{'baseline':>12}: {summary(baseline)}")
+            click.echo(f"First page speedup: {min(baseline) / min(first_pages):.0f}x")
+    finally:
+        db.close()
+
+@cli.command('check-move')
+@click.option('--seed', default=7, show_default=True, help='Random seed')
+def check_move(seed):
+    """Move a synthetic user to another city through the profile update and check that its location follows."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        user = db.execute(
+            text("SELECT id, country_id, city_id FROM users WHERE email LIKE :pattern LIMIT 1"),
+            {"pattern": f"%@{BENCH_DOMAIN}"}
+        ).first()
+        if not user:
+            raise click.ClickException("No synthetic user; run seed first")
+        city = rng.choice([city for city in located_cities(db) if city.id != user.city_id])
+
+        service = UserService(db)
+        try:
+            service.update_user_profile(user.id, UserUpdate(country_id=city.country_id, city_id=city.id))
+            location = db.execute(
+                text("SELECT city_id, ST_X(location) AS longitude, ST_Y(location) AS latitude FROM user_locations WHERE user_id = :user_id"),
+                {"user_id": user.id}
+            ).first()
+        finally:
+            service.update_user_profile(user.id, UserUpdate(country_id=user.country_id, city_id=user.city_id))
+
+        moved = location is not None and location.city_id == city.id and all(
+            abs(float(actual) - float(expected)) < 1e-9
+            for actual, expected in ((location.longitude, city.longitude), (location.latitude, city.latitude))
+        )
+        if not moved:
+            raise click.ClickException(f"Location of user {user.id} did not follow its move to city {city.id}: {location}")
+        click.echo(f"Location of user {user.id} followed its move to city {city.id}")
+    finally:
+        db.close()
+
+@cli.command()
+@click.option('--batch-size', '-b', default=10000, show_default=True, help='Users deleted per statement')
+def cleanup(batch_size):
+    """Delete the synthetic users (their locations cascade)."""
+    db = SessionLocal()
+    try:
+        deleted = 0
+        while True:
+            result = db.execute(
+                text("DELETE FROM users WHERE email LIKE :pattern LIMIT :limit"),
+                {"pattern": f"%@{BENCH_DOMAIN}", "limit": batch_size}
+            )
+            db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        click.echo(f"Deleted {deleted} synthetic users")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import click
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal
+from core.fragment_cache import get_fragment_cache
+# Register every model so relationships resolve
+import models.all
+from schemas.city import CitySearchParams
+from schemas.country import CountrySearchParams
+from services.city.city_service import CityService
+from services.country.country_service import CountryService
+
+DATASETS = ("cities", "countries")
+
+def search_paths(db, dataset, rows, page):
+    """Get the current (Pydantic per row) and fragment cache search functions of a dataset."""
+    if dataset == "cities":
+        service, params = CityService(db), CitySearchParams(page=page, per_page=rows)
+        return (
+            lambda: service.search_cities(params).json().encode(),
+            lambda: service.search_cities_json(params)
+        )
+    service, params = CountryService(db), CountrySearchParams(page=page, per_page=rows)
+    return (
+        lambda: service.search_countries(params).json().encode(),
+        lambda: service.search_countries_json(params)
+    )
+
+def time_runs(function, runs, before=None):
+    """Time a function over several runs, calling before() untimed ahead of each run."""
+    timings = []
+    for _ in range(runs):
+        if before:
+            before()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+@click.command()
+@click.option('--dataset', '-d', type=click.Choice(DATASETS), default='cities', help='Dataset to search')
+@click.option('--rows', '-r', default=1000, show_default=True, help='Rows per page')
+@click.option('--page', '-p', default=1, show_default=True, help='Page to fetch')
+@click.option('--runs', '-n', default=20, show_default=True, help='Runs per path')
+def benchmark(dataset, rows, page, runs):
+    """Time search responses built with Pydantic per row against the fragment cache."""
+    db = SessionLocal()
+    try:
+        current, fragments = search_paths(db, dataset, rows, page)
+        if current() != fragments():
+            raise click.ClickException("Fragment cache output differs from the Pydantic response")
+
+        cache = get_fragment_cache(dataset)
+        results = {
+            "pydantic": time_runs(current, runs),
+            "fragments (cold)": time_runs(fragments, runs, before=cache.entries.clear),
+            "fragments (warm)": time_runs(fragments, runs),
+        }
+        for path, timings in results.items():
+            click.echo(f"{path:>17}: best {min(timings) * 1000:.1f}ms, mean {sum(timings) / len(timings) * 1000:.1f}ms over {runs} runs")
+
+        warm_best = min(results["fragments (warm)"])
+        if warm_best > 0:
+            click.echo(f"Warm fragment cache speedup: {min(results['pydantic']) / warm_best:.1f}x")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    benchmark()
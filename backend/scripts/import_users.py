@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import click
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal
+# Register every model so relationships resolve
+import models.all
+from services.user.user_import_service import UserImportService, IMPORT_FORMATS
+
+@click.command()
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', '-f', 'file_format', type=click.Choice(IMPORT_FORMATS), default=None, help='File format (default: from the extension)')
+@click.option('--batch-size', '-b', default=None, type=int, help='Users per INSERT (default: USER_IMPORT_BATCH_SIZE)')
+@click.option('--workers', '-w', default=None, type=int, help='Password hashing processes (default: all cores)')
+@click.option('--errors', '-e', 'errors_file', type=click.Path(dir_okay=False), default=None, help='Write the failed rows to this NDJSON file')
+def import_users(file, file_format, batch_size, workers, errors_file):
+    """Create user accounts from a CSV (with a header row) or NDJSON FILE."""
+    if file_format is None:
+        file_format = "ndjson" if file.endswith((".ndjson", ".jsonl")) else "csv"
+    with open(file, "rb") as f:
+        content = f.read()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = UserImportService(db).import_users(content, file_format, batch_size=batch_size, workers=workers)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    click.echo(f"Imported {result['imported']} of {result['total_rows']} users in {elapsed:.1f}s ({result['failed']} failed)")
+    if errors_file:
+        with open(errors_file, "w") as f:
+            for error in result["errors"]:
+                f.write(json.dumps(error) + "\n")
+        click.echo(f"Wrote the failed rows to {errors_file}")
+    else:
+        for error in result["errors"][:20]:
+            click.echo(f"Row {error['row']} ({error['email']}): {error['error']}")
+        if len(result["errors"]) > 20:
+            click.echo(f"... and {len(result['errors']) - 20} more; use --errors to get them all")
+
+if __name__ == '__main__':
+    import_users()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import click
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal
+# Register every model so relationships resolve
+import models.all
+from services.city.city_service import CityService
+from services.city.city_store import CityStoreBuilder
+from services.country.country_service import CountryService
+from services.import_job.bulk_load_service import BulkLoadService
+
+DATASETS = ("countries", "cities")
+
+def load_with_orm(dataset):
+    """Load a dataset through the ORM services, row by row."""
+    db = SessionLocal()
+    try:
+        if dataset == "countries":
+            return CountryService(db).initialize_countries()
+        return CityService(db).initialize_cities()
+    finally:
+        db.close()
+
+def build_city_store():
+    """Publish a new memory-mapped city store from the cities table."""
+    db = SessionLocal()
+    try:
+        return CityStoreBuilder(db).build()
+    finally:
+        db.close()
+
+def load_with_load_data(dataset):
+    """Load a dataset with LOAD DATA LOCAL INFILE and a set-based merge."""
+    loader = BulkLoadService()
+    if dataset == "countries":
+        return loader.load_countries()
+    return loader.load_cities()
+
+LOADERS = {
+    "orm": load_with_orm,
+    "load-data": load_with_load_data,
+}
+
+@click.group()
+def cli():
+    """Reference data (dump/) loading script."""
+    pass
+
+@cli.command()
+@click.option('--dataset', '-d', type=click.Choice(DATASETS), default='countries', help='Dataset to load')
+@click.option('--mode', '-m', type=click.Choice(tuple(LOADERS)), default='load-data', help='Loading strategy')
+def load(dataset, mode):
+    """Load a reference dataset from dump/."""
+    started = time.perf_counter()
+    stats = LOADERS[mode](dataset)
+    elapsed = time.perf_counter() - started
+    for key, value in stats.items():
+        click.echo(f"{key}: {value}")
+    click.echo(f"Loaded {dataset} ({mode}) in {elapsed:.3f}s")
+    if dataset == "cities":
+        click.echo(f"Published city store {build_city_store().name}")
+
+@cli.command(name="build-city-store")
+def build_city_store_command():
+    """Rebuild the memory-mapped city store from the cities table."""
+    started = time.perf_counter()
+    path = build_city_store()
+    click.echo(f"Published city store {path.name} in {time.perf_counter() - started:.3f}s")
+
+@cli.command()
+@click.option('--dataset', '-d', type=click.Choice(DATASETS), default='countries', help='Dataset to load')
+@click.option('--runs', '-n', default=3, show_default=True, help='Runs per mode')
+def benchmark(dataset, runs):
+    """Time the ORM path against the LOAD DATA path."""
+    results = {}
+    for mode, loader in LOADERS.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            loader(dataset)
+            timings.append(time.perf_counter() - started)
+        results[mode] = timings
+        click.echo(f"{mode:>10}: best {min(timings):.3f}s, mean {sum(timings) / len(timings):.3f}s over {runs} runs")
+
+    orm_best = min(results["orm"])
+    load_data_best = min(results["load-data"])
+    if load_data_best > 0:
+        click.echo(f"LOAD DATA speedup: {orm_best / load_data_best:.1f}x")
+
+if __name__ == '__main__':
+    cli()
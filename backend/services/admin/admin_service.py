@@ -10,6 +10,7 @@ from core.roles import UserRole
 from core.logger import logger
 from schemas.user import UserResponse
 from services.user.user_service import UserService
+from services.catalog.geo_resolver import GeoResolver
 from datetime import datetime, timedelta
 
 class AdminService:
@@ -41,6 +42,7 @@ class AdminService:
             
             # Convert to response models
             user_responses = [UserResponse.from_orm(user) for user in users]
+            GeoResolver(self.db).enrich_users(user_responses)
             
             return {
                 "total": total,
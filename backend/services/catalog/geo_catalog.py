@@ -0,0 +1,228 @@
+from sqlalchemy.orm import Session
+from models.country import Country
+from models.state import State
+from schemas.country import CountryResponse
+from core.config import settings
+from core.dataset_version import get_dataset_versions
+from core.fuzzy import FuzzyIndex
+from core.logger import logger
+from typing import Any, Dict, List, Optional, Tuple
+import re
+import threading
+import time
+import numpy as np
+
+def parse_utc_offset(value: str) -> int:
+    """
+    Parse a UTC offset into seconds.
+    Accepts "UTC+05:30", "+05:30", "+0530", "-3", "5.5" and plain seconds ("19800").
+    Four digits are always read as HHMM, so plain seconds need at least five digits
+    ("3600" is 36:00 and is rejected; one hour is "1", "+01:00" or "03600").
+    At most one sign is accepted, and minutes must be two digits below 60.
+
+    Raises:
+        ValueError: If the value is not a valid offset
+    """
+    text = value.strip().upper()
+    for prefix in ("UTC", "GMT"):
+        if text.startswith(prefix):
+            text = text[len(prefix):].strip()
+    if not text:
+        return 0
+
+    sign = 1
+    if text[:1] in ("+", "-"):
+        sign = -1 if text[0] == "-" else 1
+        text = text[1:].strip()
+
+    hhmm = re.fullmatch(r"([0-9]{1,2}):([0-9]{2})|([0-9]{2})([0-9]{2})", text)
+    if hhmm:
+        hours, minutes = (int(part) for part in (hhmm.group(1, 2) if hhmm.group(1) else hhmm.group(3, 4)))
+        if minutes >= 60:
+            raise ValueError(f"Invalid UTC offset '{value}'")
+        seconds = hours * 3600 + minutes * 60
+    elif re.fullmatch(r"[0-9]{5,}", text):
+        seconds = int(text)
+    elif re.fullmatch(r"[0-9]{1,2}(\.[0-9]+)?", text):
+        seconds = int(round(float(text) * 3600))
+    else:
+        raise ValueError(f"Invalid UTC offset '{value}'")
+    if seconds > 14 * 3600:
+        raise ValueError(f"Invalid UTC offset '{value}'")
+    return sign * seconds
+
+class CountryCatalog:
+    """
+    Countries with their fuzzy name index and timezone inverted indexes.
+    Built once per countries dataset version.
+    """
+
+    def __init__(self, countries: List[Dict[str, Any]]):
+        self.countries = countries
+        self.countries_by_id = {country["id"]: country for country in countries}
+        self.country_index = FuzzyIndex.build([country["name"] for country in countries])
+
+        # Inverted indexes: zone name / abbreviation / offset in seconds -> country ids
+        self.by_zone: Dict[str, List[int]] = {}
+        self.by_abbreviation: Dict[str, List[int]] = {}
+        self.by_offset: Dict[int, List[int]] = {}
+        for country in countries:
+            for timezone in country.get("timezones") or []:
+                if isinstance(timezone, str):
+                    timezone = {"zoneName": timezone}
+                zone_name = timezone.get("zoneName")
+                if zone_name:
+                    self._add(self.by_zone, zone_name.casefold(), country["id"])
+                abbreviation = timezone.get("abbreviation")
+                if abbreviation:
+                    self._add(self.by_abbreviation, abbreviation.upper(), country["id"])
+                if isinstance(timezone.get("gmtOffset"), int):
+                    self._add(self.by_offset, timezone["gmtOffset"], country["id"])
+
+    @staticmethod
+    def _add(index: Dict[Any, List[int]], key: Any, country_id: int) -> None:
+        ids = index.setdefault(key, [])
+        if not ids or ids[-1] != country_id:
+            ids.append(country_id)
+
+    @classmethod
+    def load(cls, db: Session) -> "CountryCatalog":
+        """Load all countries from the database."""
+        return cls([
+            {**CountryResponse.from_orm(country).dict(), "country_id": country.country_id}
+            for country in db.query(Country).order_by(Country.id).all()
+        ])
+
+class GeoCatalog:
+    """
+    In-process snapshot of the small reference tables (countries and states) with
+    fuzzy name indexes. A snapshot is immutable; a new one is loaded when a dataset
+    version changes, reusing the country part when only the cities changed.
+    """
+
+    def __init__(self, versions: Tuple[str, str], country_catalog: CountryCatalog, states: List[Dict[str, Any]]):
+        self.versions = versions
+        self.country_catalog = country_catalog
+        self.countries = country_catalog.countries
+        self.countries_by_id = country_catalog.countries_by_id
+        self.states = states
+        self.state_index = FuzzyIndex.build([state["state_name"] for state in states])
+        self.state_country_ids = np.array([state["country_id"] for state in states], dtype=np.int64)
+
+    @classmethod
+    def load(cls, db: Session, versions: Tuple[str, str], previous: Optional["GeoCatalog"] = None) -> "GeoCatalog":
+        """
+        Load a snapshot of countries and states from the database.
+
+        Args:
+            db (Session): Database session
+            versions (tuple): Countries and cities dataset versions of the snapshot
+            previous (GeoCatalog, optional): Previous snapshot, whose countries are reused
+                when the countries version did not change
+        """
+        if previous is not None and versions[0] is not None and previous.versions[0] == versions[0]:
+            country_catalog = previous.country_catalog
+        else:
+            country_catalog = CountryCatalog.load(db)
+        states = [
+            {
+                "state_id": state.state_id,
+                "state_name": state.state_name,
+                "state_code": state.state_code,
+                "country_id": state.country_id,
+                "country_code": state.country_code,
+                "country_name": state.country_name,
+            }
+            for state in db.query(State).order_by(State.id).all()
+        ]
+        return cls(versions, country_catalog, states)
+
+    def resolve_country(self, name: str, limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Get the countries whose name is closest to the given one.
+
+        Returns:
+            list: (country, score) pairs, best first
+        """
+        index = self.country_catalog.country_index
+        return [(self.countries[position], score) for position, score in index.search(name, limit=limit)]
+
+    def resolve_state(self, name: str, country_id: Optional[int] = None, limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Get the states whose name is closest to the given one.
+
+        Returns:
+            list: (state, score) pairs, best first
+        """
+        allowed = None
+        if country_id is not None:
+            allowed = lambda candidates: self.state_country_ids[candidates] == country_id
+        return [(self.states[index], score) for index, score in self.state_index.search(name, limit=limit, allowed=allowed)]
+
+    def countries_by_timezone(
+        self,
+        zone: Optional[str] = None,
+        abbreviation: Optional[str] = None,
+        offset_seconds: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the countries using a timezone, by zone name, abbreviation and/or UTC offset.
+        Each criterion is a dictionary lookup; several criteria are intersected.
+
+        Args:
+            zone (str, optional): IANA zone name, e.g. 'Europe/Berlin' (case insensitive)
+            abbreviation (str, optional): Abbreviation, e.g. 'CET'
+            offset_seconds (int, optional): UTC offset in seconds, e.g. 19800 for UTC+05:30
+
+        Returns:
+            list: Matching countries, ordered by ID
+        """
+        catalog = self.country_catalog
+        selections = []
+        if zone is not None:
+            selections.append(catalog.by_zone.get(zone.strip().casefold(), []))
+        if abbreviation is not None:
+            selections.append(catalog.by_abbreviation.get(abbreviation.strip().upper(), []))
+        if offset_seconds is not None:
+            selections.append(catalog.by_offset.get(offset_seconds, []))
+        if not selections:
+            return []
+
+        ids = set(selections[0]).intersection(*selections[1:])
+        return [self.countries_by_id[country_id] for country_id in sorted(ids)]
+
+_catalog: Optional[GeoCatalog] = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+def get_geo_catalog(db: Session) -> GeoCatalog:
+    """
+    Get the geo catalog of this process, reloading it when the countries or cities
+    dataset version changed. Versions are checked at most every GEO_CATALOG_CHECK_SECONDS.
+
+    Args:
+        db (Session): Session used if the catalog has to be (re)loaded
+
+    Returns:
+        GeoCatalog: Current catalog
+    """
+    global _catalog, _last_check
+    now = time.monotonic()
+    if _catalog is not None and now - _last_check < settings.GEO_CATALOG_CHECK_SECONDS:
+        return _catalog
+
+    with _lock:
+        if _catalog is not None and now - _last_check < settings.GEO_CATALOG_CHECK_SECONDS:
+            return _catalog
+        _last_check = now
+        versions = get_dataset_versions("countries", "cities")
+        # Without Redis the catalog cannot be validated; reload it on every check instead
+        versions = tuple(versions) if versions else (None, None)
+        if _catalog is None or _catalog.versions != versions or versions == (None, None):
+            started = time.perf_counter()
+            _catalog = GeoCatalog.load(db, versions, previous=_catalog)
+            logger.info(
+                f"Loaded geo catalog ({len(_catalog.countries)} countries, {len(_catalog.states)} states) "
+                f"in {time.perf_counter() - started:.3f}s"
+            )
+        return _catalog
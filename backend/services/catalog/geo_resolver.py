@@ -0,0 +1,82 @@
+from sqlalchemy.orm import Session
+from models.city import City
+from schemas.city import CityResponse
+from core.dataset_version import get_dataset_versions
+from services.catalog.geo_catalog import get_geo_catalog
+from services.city.city_store import get_city_store
+from typing import Any, Dict, Iterable, List
+
+class GeoResolver:
+    """
+    Resolve many city and country ids at once.
+    Countries come from the in-process geo catalog; cities from the memory-mapped
+    city store when it is up to date, with a single IN query for the remaining ids.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def countries_by_ids(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get countries by primary key.
+
+        Args:
+            ids (Iterable[int]): Country IDs; duplicates and None are ignored
+
+        Returns:
+            dict: Country ID to country data, for the ids that exist
+        """
+        catalog = get_geo_catalog(self.db)
+        return {
+            country_id: catalog.countries_by_id[country_id]
+            for country_id in {cid for cid in ids if cid is not None}
+            if country_id in catalog.countries_by_id
+        }
+
+    def cities_by_ids(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get cities by primary key.
+
+        Args:
+            ids (Iterable[int]): City IDs; duplicates and None are ignored
+
+        Returns:
+            dict: City ID to city data, for the ids that exist
+        """
+        wanted = {cid for cid in ids if cid is not None}
+        cities: Dict[int, Dict[str, Any]] = {}
+
+        store = get_city_store()
+        versions = get_dataset_versions("cities")
+        # A store older than the cities dataset may hold stale rows; use the database instead
+        if store and versions and store.version == versions[0]:
+            for city_id in wanted:
+                index = store.index_of(city_id)
+                if index is not None:
+                    cities[city_id] = store.row(index)
+
+        missing = wanted - cities.keys()
+        if missing:
+            for city in self.db.query(City).filter(City.id.in_(missing)).all():
+                cities[city.id] = CityResponse.from_orm(city).dict()
+        return cities
+
+    def enrich_users(self, users: List[Any]) -> List[Any]:
+        """
+        Fill country_name, country_code and city_name of user responses in one pass.
+
+        Args:
+            users (list): UserResponse objects with country_id and city_id
+
+        Returns:
+            list: The same objects, enriched
+        """
+        countries = self.countries_by_ids(user.country_id for user in users)
+        cities = self.cities_by_ids(user.city_id for user in users)
+        for user in users:
+            country = countries.get(user.country_id)
+            city = cities.get(user.city_id)
+            user.country_name = country["name"] if country else None
+            user.country_code = country["iso2"] if country else None
+            user.city_name = city["name"] if city else None
+        return users
@@ -3,13 +3,22 @@ from fastapi import HTTPException, status
 from models.city import City
 from models.country import Country
 from sqlalchemy import or_, and_, func
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 import json
 import os
 from pathlib import Path
 import pandas as pd
 import logging
-from schemas.city import CityCreate, CityUpdate, CityResponse, CitySearchParams, CitySearchResponse, StateSearchResponse, StateResponse
+from core.utils import csv_has_header
+from core.dataset_version import bump_dataset_version
+from core.logger import logger
+from core.config import settings
+from core.fuzzy import best_match
+from core.fragment_cache import render_rows, list_response
+from services.catalog.geo_catalog import get_geo_catalog
+from services.city.city_store import get_city_store
+from services.city.state_service import StateService
+from schemas.city import CityCreate, CityUpdate, CityResponse, CitySearchParams, CitySearchResponse, StateSearchResponse, CityResolveCandidate, CityResolveResponse
 
 class CityService:
     def __init__(self, db: Session):
@@ -24,7 +33,7 @@ class CityService:
             country_id (int, optional): ID of the country to filter by
             
         Returns:
-            City: The found city
+            City: The found city, by exact name or an unambiguous fuzzy match
             
         Raises:
             HTTPException: If city is not found
@@ -34,11 +43,24 @@ class CityService:
             query = query.filter(City.country_id == country_id)
             
         city = query.first()
+        if city:
+            return city
+
+        # Fall back to a typo-tolerant match ("Sao Paulo")
+        suggestions = []
+        store = get_city_store()
+        if store:
+            matches = store.search_fuzzy(name, country_id=country_id, limit=3)
+            match = best_match(matches, settings.FUZZY_MATCH_MIN_SCORE)
+            if match is not None:
+                city = self.db.query(City).filter(City.id == int(store.columns["id"][match])).first()
+            suggestions = [store.string("name", index) for index, _ in matches]
         if not city:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"City '{name}' not found"
+                detail=f"City '{name}' not found" + (f". Did you mean: {', '.join(suggestions)}?" if suggestions else "")
             )
+        logger.info(f"Resolved city '{name}' to '{city.name}'")
         return city
 
     def validate_city(self, city_name: str, country_id: int) -> City:
@@ -70,6 +92,43 @@ class CityService:
         return self.find_by_name(city_name, country_id)
 
 
+    def resolve(self, name: str, country_id: Optional[int] = None, limit: int = 10) -> CityResolveResponse:
+        """
+        Resolve a possibly misspelled place name to ranked city and state candidates.
+        
+        Args:
+            name (str): Name to resolve
+            country_id (int, optional): Country ID to restrict candidates to
+            limit (int): Maximum number of candidates
+            
+        Returns:
+            CityResolveResponse: Candidates with similarity scores, best first
+        """
+        candidates = []
+        store = get_city_store()
+        if store:
+            for index, score in store.search_fuzzy(name, country_id=country_id, limit=limit):
+                candidates.append(CityResolveCandidate(type="city", score=score, **store.row(index)))
+        else:
+            logger.warning("City store not built yet; resolving states only")
+
+        catalog = get_geo_catalog(self.db)
+        for state, score in catalog.resolve_state(name, country_id=country_id, limit=limit):
+            candidates.append(CityResolveCandidate(
+                type="state",
+                score=score,
+                name=state["state_name"],
+                **state
+            ))
+
+        candidates.sort(key=lambda candidate: -candidate.score)
+        return CityResolveResponse(
+            message="Candidates found successfully",
+            status="success",
+            data=candidates[:limit],
+            total=min(len(candidates), limit)
+        )
+
     def _parse_coordinates(self, value: str) -> Optional[float]:
         """Parse coordinate string to float."""
         if not value or value == '':
@@ -79,10 +138,17 @@ class CityService:
         except (ValueError, TypeError):
             return None
 
-    async def initialize_cities(self) -> dict:
+    def initialize_cities(self, start_row: int = 0, on_batch: Optional[Callable[[int, int, dict], None]] = None) -> dict:
         """
         Initialize cities in the database from a CSV file using pandas.
         id,name,state_id,state_code,state_name,country_id,country_code,country_name,latitude,longitude,wikiDataId 
+
+        Args:
+            start_row (int): Row offset to resume from (rows before it were already committed)
+            on_batch (Callable, optional): Called as on_batch(processed_rows, total_rows, stats) right
+                before each batch commit, so a checkpoint written through this session is committed
+                atomically with the batch
+
         Returns:
             dict: Statistics about the initialization process
         """
@@ -104,7 +170,7 @@ class CityService:
         # Read CSV file using pandas
         try:
             logger.info("Reading cities data from CSV file...")
-            df = pd.read_csv(cities_file)
+            df = pd.read_csv(cities_file, header=0 if csv_has_header(cities_file) else None)
             logger.info(f"Successfully loaded CSV file with {len(df)} rows")
         except Exception as e:
             logger.error(f"Failed to read cities file: {str(e)}", exc_info=True)
@@ -121,9 +187,11 @@ class CityService:
         batch_size = 100
         
         logger.info(f"Found {total_cities} cities in the CSV file")
+        if start_row:
+            logger.info(f"Resuming city initialization from row {start_row}")
         
         # Process cities in batches
-        for batch_start in range(0, total_cities, batch_size):
+        for batch_start in range(start_row, total_cities, batch_size):
             batch_end = min(batch_start + batch_size, total_cities)
             logger.info(f"Processing batch {batch_start//batch_size + 1} (cities {batch_start+1} to {batch_end})")
             
@@ -195,7 +263,14 @@ class CityService:
                         logger.error(f"Error processing city {row[1]}: {str(e)}", exc_info=True)
                         continue
                 
-                # Commit changes for this batch
+                # Record the checkpoint and commit changes for this batch
+                if on_batch:
+                    on_batch(batch_end, total_cities, {
+                        "added_cities": added_cities,
+                        "updated_cities": updated_cities,
+                        "skipped_cities": skipped_cities,
+                        "error_cities": error_cities
+                    })
                 logger.info(f"Committing changes for batch {batch_start//batch_size + 1}...")
                 self.db.commit()
                 logger.info(f"Successfully committed batch {batch_start//batch_size + 1}")
@@ -204,8 +279,25 @@ class CityService:
                 logger.error(f"Failed to process batch {batch_start//batch_size + 1}", exc_info=True)
                 self.db.rollback()
                 error_cities += (batch_end - batch_start)
+                # Move the checkpoint past the failed batch so a resume does not retry it forever
+                if on_batch:
+                    on_batch(batch_end, total_cities, {
+                        "added_cities": added_cities,
+                        "updated_cities": updated_cities,
+                        "skipped_cities": skipped_cities,
+                        "error_cities": error_cities
+                    })
+                    self.db.commit()
                 continue
         
+        # Refresh the materialized states and the user locations from the imported cities
+        StateService(self.db).rebuild()
+        self._sync_user_locations()
+        self.db.commit()
+        # Bumped once for the whole import: every bump invalidates the ETags, the response
+        # and fragment caches and the geo catalog of all processes
+        bump_dataset_version("cities")
+        
         # Prepare and log final statistics
         stats = {
             "total_cities": total_cities,
@@ -226,6 +318,21 @@ class CityService:
         
         return stats
 
+    def _sync_user_locations(self, city_ids: Optional[List[int]] = None) -> None:
+        """Update the locations of the users of changed cities (all cities by default)."""
+        # Imported here: the user services import this module
+        from services.user.user_location_service import UserLocationService
+        UserLocationService(self.db).sync(city_ids=city_ids)
+
+    def _schedule_store_rebuild(self) -> None:
+        """Enqueue a rebuild of the memory-mapped city store after a city write."""
+        try:
+            # Imported here to avoid a circular import with the task module
+            from tasks.reference_data_tasks import build_city_store
+            build_city_store.delay()
+        except Exception as e:
+            logger.error(f"Could not enqueue city store rebuild: {str(e)}")
+
     def get_city(self, city_id: int) -> Optional[City]:
         """Get a city by ID."""
         return self.db.query(City).filter(City.id == city_id).first()
@@ -248,7 +355,11 @@ class CityService:
         """Create a new city."""
         db_city = City(**city.dict())
         self.db.add(db_city)
+        self.db.flush()
+        StateService(self.db).rebuild([db_city.country_id])
         self.db.commit()
+        bump_dataset_version("cities")
+        self._schedule_store_rebuild()
         self.db.refresh(db_city)
         return db_city
 
@@ -256,23 +367,21 @@ class CityService:
         """Update a city."""
         db_city = self.get_city(city_id)
         if db_city:
+            previous_country_id = db_city.country_id
             for key, value in city.dict(exclude_unset=True).items():
                 setattr(db_city, key, value)
+            self.db.flush()
+            StateService(self.db).rebuild([previous_country_id, db_city.country_id])
+            self._sync_user_locations(city_ids=[db_city.id])
             self.db.commit()
+            bump_dataset_version("cities")
+            self._schedule_store_rebuild()
             self.db.refresh(db_city)
         return db_city
 
 
-    def search_cities(self, params: CitySearchParams) -> CitySearchResponse:
-        """
-        Search for cities with various filters and pagination.
-        
-        Args:
-            params (CitySearchParams): Search parameters including name, country_id, state_id, etc.
-            
-        Returns:
-            CitySearchResponse: Search results with pagination info
-        """
+    def _search_query(self, params: CitySearchParams):
+        """Build the filtered (unpaginated) city search query."""
         query = self.db.query(City)
         
         # Apply filters
@@ -285,11 +394,24 @@ class CityService:
         if params.state_code:
             query = query.filter(City.state_code == params.state_code.upper())
         if params.state_name:
-            query = query.filter(func.lower(City.state_name).like(f"%{params.state_name}%"))
+            query = query.filter(func.lower(City.state_name).like(f"%{params.state_name.lower()}%"))
         if params.country_code:
             query = query.filter(City.country_code == params.country_code.upper())
         if params.wikiDataId:
             query = query.filter(City.wikiDataId == params.wikiDataId)
+        return query
+
+    def search_cities(self, params: CitySearchParams) -> CitySearchResponse:
+        """
+        Search for cities with various filters and pagination.
+        
+        Args:
+            params (CitySearchParams): Search parameters including name, country_id, state_id, etc.
+            
+        Returns:
+            CitySearchResponse: Search results with pagination info
+        """
+        query = self._search_query(params)
         
         # Get total count before pagination
         total = query.count()
@@ -304,9 +426,36 @@ class CityService:
             total=total
         )
 
+    def search_cities_json(self, params: CitySearchParams) -> bytes:
+        """
+        Search for cities and return the serialized CitySearchResponse.
+        Only the matching IDs are queried; rows are taken from the fragment cache and
+        only the ones missing from it are loaded and serialized.
+        
+        Args:
+            params (CitySearchParams): Search parameters including name, country_id, state_id, etc.
+            
+        Returns:
+            bytes: JSON of the search results
+        """
+        query = self._search_query(params)
+        total = query.count()
+        ids = [
+            row.id for row in
+            query.with_entities(City.id).order_by(City.name).offset(params.offset).limit(params.limit)
+        ]
+        fragments = render_rows("cities", ids, self._serialize_cities)
+        return list_response("Cities found successfully", fragments, total)
+
+    def _serialize_cities(self, ids: List[int]) -> Dict[int, bytes]:
+        """Load cities by ID and serialize each one as CityResponse JSON."""
+        cities = self.db.query(City).filter(City.id.in_(ids)).all()
+        return {city.id: CityResponse.from_orm(city).json().encode() for city in cities}
+
     def search_states_by_country(self, country_id: int) -> StateSearchResponse:
         """
-        Search for states in a country, grouped by state_name.
+        Search for states in a country.
+        Reads the materialized states table maintained by the city import pipeline.
         
         Args:
             country_id (int): Country ID to filter by
@@ -314,35 +463,4 @@ class CityService:
         Returns:
             StateSearchResponse: List of unique states in the country
         """
-        # Query to get unique states for the country
-        query = self.db.query(
-            City.state_id,
-            City.state_name,
-            City.state_code,
-            City.country_id,
-            City.country_code,
-            City.country_name
-        ).filter(
-            City.country_id == country_id
-        ).distinct(
-            City.state_id
-        ).order_by(
-            City.state_name
-        )
-        
-        # Execute query
-        states = query.all()
-        
-        return StateSearchResponse(
-            message="States found successfully",
-            status="success",
-            data=[StateResponse(
-                state_id=state.state_id,
-                state_name=state.state_name,
-                state_code=state.state_code,
-                country_id=state.country_id,
-                country_code=state.country_code,
-                country_name=state.country_name
-            ) for state in states],
-            total=len(states)
-        ) 
\ No newline at end of file
+        return StateService(self.db).search_states_by_country(country_id)
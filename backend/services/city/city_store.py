@@ -0,0 +1,280 @@
+from sqlalchemy.orm import Session
+from models.city import City
+from core.config import settings
+from core.dataset_version import get_dataset_versions
+from core.logger import logger
+from core.fuzzy import FuzzyIndex, fold
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import numpy as np
+import json
+import math
+import os
+import shutil
+import threading
+import time
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Fixed-width columns, stored as one .npy array each
+NUMERIC_COLUMNS = {
+    "id": np.int32,
+    "city_id": np.int32,
+    "country_id": np.int32,
+    "state_id": np.int32,
+    "latitude": np.float64,
+    "longitude": np.float64,
+}
+
+# Variable-width columns, stored as <column>.offsets.npy (int64, n + 1) and <column>.blob.npy (UTF-8 bytes)
+STRING_COLUMNS = ("name", "state_code", "state_name", "country_code", "country_name", "wikiDataId")
+
+# Number of store versions kept on disk, so workers still mapping the previous one are not disturbed
+KEEP_VERSIONS = 2
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Spatial grid of 1 degree cells over the city coordinates: row = latitude band, column = longitude band
+GRID_ROWS = 180
+GRID_COLS = 360
+
+def grid_cells(latitude: np.ndarray, longitude: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the grid row and column of coordinates in degrees.
+    Latitude 90 falls in the last row and longitude 180 wraps to -180.
+    """
+    rows = np.clip(np.floor(latitude).astype(np.int64) + 90, 0, GRID_ROWS - 1)
+    cols = (np.floor(longitude).astype(np.int64) + 180) % GRID_COLS
+    return rows, cols
+
+def store_root() -> Path:
+    """Directory holding the city store versions and the 'current' symlink."""
+    cache_dir = Path(settings.GEO_CACHE_DIR)
+    if not cache_dir.is_absolute():
+        cache_dir = BACKEND_DIR / cache_dir
+    return cache_dir / "cities"
+
+class CityStoreBuilder:
+    """Export the cities table into a versioned, memory-mappable columnar store."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build(self, version: Optional[str] = None) -> Path:
+        """
+        Build a new store version and atomically point 'current' at it.
+
+        Args:
+            version (str, optional): Version name; defaults to the cities dataset version
+
+        Returns:
+            Path: Directory of the new version
+        """
+        started = time.perf_counter()
+        if version is None:
+            versions = get_dataset_versions("cities")
+            version = versions[0] if versions else format(time.time_ns(), "x")
+
+        numeric = {column: [] for column in NUMERIC_COLUMNS}
+        strings = {column: [] for column in STRING_COLUMNS}
+        query = self.db.query(
+            *(getattr(City, column) for column in NUMERIC_COLUMNS),
+            *(getattr(City, column) for column in STRING_COLUMNS)
+        ).order_by(City.id).yield_per(10000)
+        for row in query:
+            values = row._mapping
+            for column in NUMERIC_COLUMNS:
+                value = values[column]
+                numeric[column].append(np.nan if value is None and column in ("latitude", "longitude") else (value or 0))
+            for column in STRING_COLUMNS:
+                strings[column].append(values[column] or "")
+
+        root = store_root()
+        root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = root / f".{version}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        for column, dtype in NUMERIC_COLUMNS.items():
+            np.save(tmp_dir / f"{column}.npy", np.asarray(numeric[column], dtype=dtype))
+
+        for column in STRING_COLUMNS:
+            encoded = [value.encode("utf-8") for value in strings[column]]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(value) for value in encoded])
+            np.save(tmp_dir / f"{column}.offsets.npy", offsets)
+            np.save(tmp_dir / f"{column}.blob.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+        # Trigram index over names for typo-tolerant lookups
+        for name, array in FuzzyIndex.build(strings["name"]).arrays().items():
+            np.save(tmp_dir / f"name_fuzzy_{name}.npy", array)
+
+        # Spatial grid for nearest-city lookups: row indices grouped by cell (CSR layout);
+        # cities without coordinates are left out
+        latitude = np.asarray(numeric["latitude"], dtype=np.float64)
+        longitude = np.asarray(numeric["longitude"], dtype=np.float64)
+        located = np.flatnonzero(~(np.isnan(latitude) | np.isnan(longitude)))
+        rows, cols = grid_cells(latitude[located], longitude[located])
+        cells = rows * GRID_COLS + cols
+        order = np.argsort(cells, kind="stable")
+        grid_offsets = np.zeros(GRID_ROWS * GRID_COLS + 1, dtype=np.int64)
+        grid_offsets[1:] = np.cumsum(np.bincount(cells, minlength=GRID_ROWS * GRID_COLS))
+        np.save(tmp_dir / "grid_offsets.npy", grid_offsets)
+        np.save(tmp_dir / "grid_order.npy", located[order].astype(np.int32))
+
+        (tmp_dir / "meta.json").write_text(json.dumps({
+            "version": version,
+            "rows": len(numeric["id"]),
+            "built_at": datetime.utcnow().isoformat()
+        }))
+
+        version_dir = root / version
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.rename(tmp_dir, version_dir)
+
+        # Swap the 'current' symlink atomically; readers see either the old or the new version
+        tmp_link = root / f".current.{os.getpid()}"
+        if tmp_link.is_symlink():
+            tmp_link.unlink()
+        os.symlink(version, tmp_link)
+        os.replace(tmp_link, root / "current")
+
+        self._prune(root, version)
+        logger.info(f"Built city store {version} with {len(numeric['id'])} rows in {time.perf_counter() - started:.2f}s")
+        return version_dir
+
+    def _prune(self, root: Path, current: str) -> None:
+        """Remove old store versions, keeping the most recent ones."""
+        versions = sorted(
+            (path for path in root.iterdir() if path.is_dir() and not path.name.startswith(".") and not path.is_symlink()),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        keep = {current}
+        keep.update(path.name for path in versions[:KEEP_VERSIONS])
+        for path in versions:
+            if path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+class CityStore:
+    """
+    Read-only view of a city store version.
+    All arrays are memory-mapped, so every worker process shares the same pages.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.version = self.meta["version"]
+        self.columns = {
+            column: np.load(path / f"{column}.npy", mmap_mode="r")
+            for column in NUMERIC_COLUMNS
+        }
+        self.strings = {
+            column: (
+                np.load(path / f"{column}.offsets.npy", mmap_mode="r"),
+                np.load(path / f"{column}.blob.npy", mmap_mode="r")
+            )
+            for column in STRING_COLUMNS
+        }
+        self.name_index = FuzzyIndex.from_arrays(
+            {name: np.load(path / f"name_fuzzy_{name}.npy", mmap_mode="r") for name in FuzzyIndex.ARRAYS},
+            self.folded_name
+        )
+        self.grid_offsets = np.load(path / "grid_offsets.npy", mmap_mode="r")
+        self.grid_order = np.load(path / "grid_order.npy", mmap_mode="r")
+
+    def __len__(self) -> int:
+        return int(self.meta["rows"])
+
+    def string(self, column: str, index: int) -> Optional[str]:
+        """Get a string value of a row; empty values are returned as None."""
+        offsets, blob = self.strings[column]
+        start, end = int(offsets[index]), int(offsets[index + 1])
+        if start == end:
+            return None
+        return blob[start:end].tobytes().decode("utf-8")
+
+    def folded_name(self, index: int) -> str:
+        """Get the case- and accent-folded name of a row."""
+        return fold(self.string("name", index) or "")
+
+    def row(self, index: int) -> Dict:
+        """Get a row as a dict with the CityResponse fields."""
+        latitude = float(self.columns["latitude"][index])
+        longitude = float(self.columns["longitude"][index])
+        return {
+            "id": int(self.columns["id"][index]),
+            "name": self.string("name", index),
+            "state_id": int(self.columns["state_id"][index]),
+            "state_code": self.string("state_code", index),
+            "state_name": self.string("state_name", index),
+            "country_id": int(self.columns["country_id"][index]),
+            "country_code": self.string("country_code", index),
+            "country_name": self.string("country_name", index),
+            "latitude": None if math.isnan(latitude) else latitude,
+            "longitude": None if math.isnan(longitude) else longitude,
+            "wikiDataId": self.string("wikiDataId", index),
+        }
+
+    def index_of(self, city_id: int) -> Optional[int]:
+        """Get the row index of a city by its primary key."""
+        ids = self.columns["id"]
+        index = int(np.searchsorted(ids, city_id))
+        if index < len(ids) and int(ids[index]) == city_id:
+            return index
+        return None
+
+    def search_fuzzy(self, name: str, country_id: Optional[int] = None, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Get row indices of cities whose name is close to the given one, tolerating typos.
+
+        Args:
+            name (str): Name to resolve
+            country_id (int, optional): Restrict to one country
+            limit (int): Maximum number of results
+
+        Returns:
+            list: (row index, score) pairs, best first
+        """
+        allowed = None
+        if country_id is not None:
+            country_ids = self.columns["country_id"]
+            allowed = lambda candidates: country_ids[candidates] == country_id
+        return self.name_index.search(name, limit=limit, allowed=allowed)
+
+_store: Optional[CityStore] = None
+_store_target: Optional[str] = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+def get_city_store() -> Optional[CityStore]:
+    """
+    Get the city store mapped by this process.
+    The 'current' symlink is re-checked at most every CITY_STORE_CHECK_SECONDS and the
+    new version is mapped when it changed.
+
+    Returns:
+        CityStore: Current store, or None if no store has been built yet
+    """
+    global _store, _store_target, _last_check
+    now = time.monotonic()
+    if _store is not None and now - _last_check < settings.CITY_STORE_CHECK_SECONDS:
+        return _store
+
+    with _lock:
+        _last_check = now
+        current = store_root() / "current"
+        try:
+            target = os.readlink(current)
+        except OSError:
+            return _store
+        if target != _store_target:
+            try:
+                _store = CityStore(current.parent / target)
+                _store_target = target
+                logger.info(f"Mapped city store {target} ({len(_store)} rows)")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Could not map city store {target}: {str(e)}")
+        return _store
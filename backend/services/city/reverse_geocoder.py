@@ -0,0 +1,225 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from services.catalog.geo_catalog import get_geo_catalog
+from services.city.city_store import CityStore, get_city_store, grid_cells, EARTH_RADIUS_KM, GRID_ROWS, GRID_COLS
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+import numpy as np
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Grid radius (in cells) after which the remaining points are compared with every city
+MAX_GRID_RADIUS = 8
+
+# Maximum size of one point x candidate distance matrix
+MAX_PAIRS = 1_000_000
+
+def _unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Get the 3D unit vectors of coordinates in radians, one row per point."""
+    cos_lat = np.cos(latitude)
+    return np.column_stack((cos_lat * np.cos(longitude), cos_lat * np.sin(longitude), np.sin(latitude)))
+
+def _haversine(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km between coordinates in radians."""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def _nearest_among(
+    store: CityStore,
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    candidates: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the nearest candidate city of each point.
+    The nearest city on the sphere is the one whose unit vector has the largest dot product
+    with the point's, so candidates are ranked with one matrix product per chunk of points
+    and the haversine distance is only computed for the winners.
+
+    Args:
+        store (CityStore): City store
+        latitude (np.ndarray): Point latitudes in radians
+        longitude (np.ndarray): Point longitudes in radians
+        candidates (np.ndarray): Row indices of the candidate cities
+
+    Returns:
+        tuple: Row index (-1 if there is no candidate) and distance in km of the nearest city of each point
+    """
+    indices = np.full(len(latitude), -1, dtype=np.int64)
+    distances = np.full(len(latitude), np.inf)
+    if len(candidates) == 0:
+        return indices, distances
+
+    city_lat = np.radians(store.columns["latitude"][candidates])
+    city_lon = np.radians(store.columns["longitude"][candidates])
+    city_vectors = _unit_vectors(city_lat, city_lon).T
+    point_vectors = _unit_vectors(latitude, longitude)
+    chunk = max(1, MAX_PAIRS // len(candidates))
+    for start in range(0, len(latitude), chunk):
+        best = np.argmax(point_vectors[start:start + chunk] @ city_vectors, axis=1)
+        indices[start:start + chunk] = candidates[best]
+        distances[start:start + chunk] = _haversine(
+            latitude[start:start + chunk], longitude[start:start + chunk], city_lat[best], city_lon[best]
+        )
+    return indices, distances
+
+def _block_candidates(store: CityStore, row: int, col: int, radius: int) -> np.ndarray:
+    """Get the row indices of the cities in the (2 * radius + 1)^2 cells around a grid cell."""
+    offsets, order = store.grid_offsets, store.grid_order
+    slices = []
+    if 2 * radius + 1 >= GRID_COLS:
+        col_ranges = [(0, GRID_COLS - 1)]
+    elif col - radius < 0:
+        col_ranges = [(0, col + radius), (col - radius + GRID_COLS, GRID_COLS - 1)]
+    elif col + radius >= GRID_COLS:
+        col_ranges = [(col - radius, GRID_COLS - 1), (0, col + radius - GRID_COLS)]
+    else:
+        col_ranges = [(col - radius, col + radius)]
+
+    for grid_row in range(max(0, row - radius), min(GRID_ROWS - 1, row + radius) + 1):
+        base = grid_row * GRID_COLS
+        for first, last in col_ranges:
+            start, end = int(offsets[base + first]), int(offsets[base + last + 1])
+            if start < end:
+                slices.append(order[start:end])
+    if not slices:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(slices).astype(np.int64)
+
+def _outside_block_bound(latitude: np.ndarray, longitude: np.ndarray, row: int, col: int, radius: int) -> np.ndarray:
+    """
+    Lower bound, in km, of the distance from points of a cell to any city outside the
+    block of cells searched around it. A nearest candidate within this bound is the global nearest.
+    """
+    lat_bound = np.full(len(latitude), np.inf)
+    if row - radius > 0:
+        lat_bound = np.minimum(lat_bound, (latitude - (row - radius - 90)) * KM_PER_DEGREE)
+    if row + radius < GRID_ROWS - 1:
+        lat_bound = np.minimum(lat_bound, ((row + radius + 1 - 90) - latitude) * KM_PER_DEGREE)
+
+    if 2 * radius + 1 >= GRID_COLS:
+        return lat_bound
+    lon = (longitude + 180) % 360 - 180
+    delta = np.minimum(lon - (col - radius - 180), (col + radius + 1 - 180) - lon)
+    # Closest point of a meridian delta degrees away; past 90 degrees it is the nearer pole
+    delta = np.radians(np.clip(delta, 0, 90))
+    lon_bound = EARTH_RADIUS_KM * np.arcsin(np.clip(np.cos(np.radians(latitude)) * np.sin(delta), 0, 1))
+    return np.minimum(lat_bound, lon_bound)
+
+def nearest_cities(store: CityStore, latitude: np.ndarray, longitude: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the nearest city of many points at once.
+
+    Points are grouped by grid cell and compared with the cities of the surrounding cells;
+    a point is settled once its best distance is within the bound to the unsearched cells,
+    otherwise the block is grown. Points still unsettled (open sea, poles) are compared
+    with every city.
+
+    Args:
+        store (CityStore): City store with a spatial grid
+        latitude (np.ndarray): Latitudes in degrees
+        longitude (np.ndarray): Longitudes in degrees
+
+    Returns:
+        tuple: Row index (-1 if the store has no located city) and distance in km for each point
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    indices = np.full(len(latitude), -1, dtype=np.int64)
+    distances = np.full(len(latitude), np.inf)
+    if len(latitude) == 0 or len(store.grid_order) == 0:
+        return indices, distances
+
+    lat_rad, lon_rad = np.radians(latitude), np.radians(longitude)
+    rows, cols = grid_cells(latitude, longitude)
+    cells = rows * GRID_COLS + cols
+    pending = np.arange(len(latitude))
+    radius = 1
+    while len(pending) and radius <= MAX_GRID_RADIUS:
+        pending = pending[np.argsort(cells[pending], kind="stable")]
+        pending_cells = cells[pending]
+        starts = np.flatnonzero(np.r_[True, pending_cells[1:] != pending_cells[:-1]])
+        ends = np.r_[starts[1:], len(pending)]
+        settled = np.zeros(len(pending), dtype=bool)
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            members = pending[start:end]
+            row, col = divmod(int(pending_cells[start]), GRID_COLS)
+            candidates = _block_candidates(store, row, col, radius)
+            best, best_distance = _nearest_among(store, lat_rad[members], lon_rad[members], candidates)
+            indices[members], distances[members] = best, best_distance
+            bound = _outside_block_bound(latitude[members], longitude[members], row, col, radius)
+            settled[start:end] = best_distance <= bound
+        pending = pending[~settled]
+        radius *= 2
+
+    if len(pending):
+        indices[pending], distances[pending] = _nearest_among(
+            store, lat_rad[pending], lon_rad[pending], np.asarray(store.grid_order, dtype=np.int64)
+        )
+    return indices, distances
+
+class ReverseGeocoder:
+    """
+    Map coordinates to the nearest city, with its state and country.
+    Cities come from the memory-mapped city store and countries from the geo catalog.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reverse(
+        self,
+        points: Sequence[Tuple[float, float]],
+        max_distance_km: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Reverse geocode a batch of points.
+
+        Args:
+            points (Sequence[Tuple[float, float]]): (latitude, longitude) pairs in degrees
+            max_distance_km (float, optional): Cities farther than this are not returned
+
+        Returns:
+            list: One result per point, in order; city, state and country are None when
+                no city is close enough
+
+        Raises:
+            HTTPException: If the city store has not been built yet
+        """
+        store = get_city_store()
+        if store is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="City store is not built yet"
+            )
+
+        latitude = np.array([point[0] for point in points], dtype=np.float64)
+        longitude = np.array([point[1] for point in points], dtype=np.float64)
+        indices, distances = nearest_cities(store, latitude, longitude)
+
+        catalog = get_geo_catalog(self.db)
+        results = []
+        for point, index, distance in zip(points, indices.tolist(), distances.tolist()):
+            result = {
+                "latitude": point[0],
+                "longitude": point[1],
+                "distance_km": None,
+                "city": None,
+                "state": None,
+                "country": None
+            }
+            if index >= 0 and (max_distance_km is None or distance <= max_distance_km):
+                city = store.row(index)
+                result["distance_km"] = round(distance, 3)
+                result["city"] = city
+                result["state"] = {
+                    "state_id": city["state_id"],
+                    "state_name": city["state_name"],
+                    "state_code": city["state_code"],
+                    "country_id": city["country_id"],
+                    "country_code": city["country_code"],
+                    "country_name": city["country_name"]
+                }
+                result["country"] = catalog.countries_by_id.get(city["country_id"])
+            results.append(result)
+        return results
@@ -0,0 +1,148 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, func
+from models.state import State
+from core.config import settings
+from core.logger import logger
+from schemas.city import StateSearchResponse, StateResponse
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import os
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Set-based rebuild of the states table from cities; shared with the LOAD DATA loader
+DELETE_STATES_SQL = "DELETE FROM states"
+INSERT_STATES_SQL = """
+INSERT INTO states (state_id, state_name, state_code, country_id, country_code, country_name, city_count, updated_at)
+SELECT state_id, MAX(state_name), MAX(state_code), country_id, MAX(country_code), MAX(country_name), COUNT(*), UTC_TIMESTAMP()
+FROM cities
+"""
+GROUP_STATES_SQL = " GROUP BY country_id, state_id"
+
+class StateService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def rebuild(self, country_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Rebuild the states table from cities, for all countries or only the given ones.
+        Readers keep seeing the previous rows until the caller's transaction commits.
+
+        Args:
+            country_ids (Iterable[int], optional): Countries whose states changed
+        """
+        if country_ids is None:
+            self.db.execute(text(DELETE_STATES_SQL))
+            self.db.execute(text(INSERT_STATES_SQL + GROUP_STATES_SQL))
+            logger.info("Rebuilt states for all countries")
+            return
+
+        for country_id in {cid for cid in country_ids if cid is not None}:
+            params = {"country_id": country_id}
+            self.db.execute(text(DELETE_STATES_SQL + " WHERE country_id = :country_id"), params)
+            self.db.execute(text(INSERT_STATES_SQL + " WHERE country_id = :country_id" + GROUP_STATES_SQL), params)
+            logger.info(f"Rebuilt states for country {country_id}")
+
+    def search_states_by_country(self, country_id: int) -> StateSearchResponse:
+        """
+        Get the states of a country from the materialized states table.
+
+        Args:
+            country_id (int): Country ID to filter by
+
+        Returns:
+            StateSearchResponse: States of the country ordered by name
+        """
+        states = self.db.query(State).filter(
+            State.country_id == country_id
+        ).order_by(
+            State.state_name
+        ).all()
+
+        return StateSearchResponse(
+            message="States found successfully",
+            status="success",
+            data=[StateResponse.from_orm(state) for state in states],
+            total=len(states)
+        )
+
+    def get_fingerprint(self) -> str:
+        """
+        Get a short fingerprint of the states table, changing whenever the bundled content does.
+        Derived from a checksum of the rows rather than from updated_at, whose one-second
+        precision would miss two rebuilds within the same second.
+        """
+        row_checksum = func.crc32(func.concat_ws(
+            "|", State.country_id, State.state_id, State.state_name, State.state_code,
+            State.country_code, State.country_name, State.city_count
+        ))
+        count, checksum = self.db.query(func.count(State.id), func.bit_xor(row_checksum)).one()
+        raw = f"{count}:{checksum or 0}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def _cache_dir(self) -> Path:
+        cache_dir = Path(settings.GEO_CACHE_DIR)
+        if not cache_dir.is_absolute():
+            cache_dir = BACKEND_DIR / cache_dir
+        return cache_dir
+
+    def _build_bundle(self, fingerprint: str) -> bytes:
+        """Build the gzip-compressed JSON hierarchy country -> states -> city count."""
+        countries = {}
+        states = self.db.query(State).order_by(State.country_id, State.state_name).all()
+        for state in states:
+            country = countries.setdefault(str(state.country_id), {
+                "country_code": state.country_code,
+                "country_name": state.country_name,
+                "states": []
+            })
+            country["states"].append({
+                "state_id": state.state_id,
+                "state_name": state.state_name,
+                "state_code": state.state_code,
+                "city_count": state.city_count
+            })
+
+        payload = json.dumps({
+            "version": fingerprint,
+            "generated_at": datetime.utcnow().isoformat(),
+            "countries": countries
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return gzip.compress(payload, compresslevel=9, mtime=0)
+
+    def get_bundle(self, version: Optional[str] = None) -> Tuple[bytes, str]:
+        """
+        Get the precompressed state hierarchy bundle.
+        The bundle is built once per version and stored in GEO_CACHE_DIR, so every
+        API process serves the same bytes until the states table is rebuilt.
+
+        Args:
+            version (str, optional): Version to key the bundle on, derived from the cities
+                dataset version (bumped after every states rebuild); the content fingerprint
+                of the states table by default
+
+        Returns:
+            tuple: Gzip-compressed JSON bytes and the bundle version
+        """
+        fingerprint = version or self.get_fingerprint()
+        bundle_file = self._cache_dir() / f"states-{fingerprint}.json.gz"
+        if bundle_file.exists():
+            return bundle_file.read_bytes(), fingerprint
+
+        data = self._build_bundle(fingerprint)
+        try:
+            bundle_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial bundle
+            tmp_file = bundle_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_bytes(data)
+            os.replace(tmp_file, bundle_file)
+            for old_file in bundle_file.parent.glob("states-*.json.gz"):
+                if old_file != bundle_file:
+                    old_file.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not write state bundle to {bundle_file}: {str(e)}")
+        return data, fingerprint
@@ -2,13 +2,27 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from models.country import Country
 from sqlalchemy import or_, func
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 import json
 import os,re
 from pathlib import Path
 import pandas as pd
 import ast
 from schemas.country import CountrySearchParams, CountrySearchResponse, CountryResponse
+from core.utils import csv_has_header
+from core.dataset_version import bump_dataset_version
+from core.config import settings
+from core.fuzzy import best_match
+from core.fragment_cache import render_rows, list_response
+from core.logger import logger
+from services.catalog.geo_catalog import get_geo_catalog
+
+# Normalization of the JavaScript object literals used for timezones in dump/countries.csv.
+# Shared with the LOAD DATA loader so both import paths produce the same JSON.
+TIMEZONE_KEY_PATTERN = r"([{,])\s*([A-Za-z_][A-Za-z0-9_]*)\s*:"
+TIMEZONE_KEY_REPLACEMENT = r'\1"\2":'
+TIMEZONE_VALUE_PATTERN = r":'(.*?)'(?=\s*[,}])"
+TIMEZONE_VALUE_REPLACEMENT = r':"\1"'
 
 class CountryService:
     def __init__(self, db: Session):
@@ -22,17 +36,27 @@ class CountryService:
             name (str): Name of the country to find
             
         Returns:
-            Country: The found country
+            Country: The found country, by exact name or an unambiguous fuzzy match
             
         Raises:
             HTTPException: If country is not found
         """
         country = self.db.query(Country).filter(Country.name == name).first()
+        if country:
+            return country
+
+        # Fall back to a typo-tolerant match ("Untied States")
+        matches = get_geo_catalog(self.db).resolve_country(name, limit=3)
+        match = best_match(matches, settings.FUZZY_MATCH_MIN_SCORE)
+        if match:
+            country = self.db.query(Country).filter(Country.id == match["id"]).first()
         if not country:
+            suggestions = ", ".join(candidate["name"] for candidate, _ in matches)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Country '{name}' not found"
+                detail=f"Country '{name}' not found" + (f". Did you mean: {suggestions}?" if suggestions else "")
             )
+        logger.info(f"Resolved country '{name}' to '{country.name}'")
         return country
 
     def find_by_code(self, code: str) -> Country:
@@ -92,16 +116,8 @@ class CountryService:
             return self.find_by_code(country_code)
         return self.find_by_name(country_name)
 
-    def search_countries(self, params: CountrySearchParams) -> CountrySearchResponse:
-        """
-        Search for countries with various filters and pagination.
-        
-        Args:
-            params (CountrySearchParams): Search parameters including name, iso2, iso3, region, etc.
-            
-        Returns:
-            CountrySearchResponse: Search results with pagination info
-        """
+    def _search_query(self, params: CountrySearchParams):
+        """Build the filtered (unpaginated) country search query."""
         query = self.db.query(Country)
         
         # Apply filters
@@ -117,6 +133,19 @@ class CountryService:
             query = query.filter(func.lower(Country.subregion).like(f"%{params.subregion.lower()}%"))
         if params.currency:
             query = query.filter(func.lower(Country.currency).like(f"%{params.currency.lower()}%"))
+        return query
+
+    def search_countries(self, params: CountrySearchParams) -> CountrySearchResponse:
+        """
+        Search for countries with various filters and pagination.
+        
+        Args:
+            params (CountrySearchParams): Search parameters including name, iso2, iso3, region, etc.
+            
+        Returns:
+            CountrySearchResponse: Search results with pagination info
+        """
+        query = self._search_query(params)
         
         # Get total count before pagination
         total = query.count()
@@ -131,10 +160,47 @@ class CountryService:
             total=total
         )
 
+    def search_countries_json(self, params: CountrySearchParams) -> bytes:
+        """
+        Search for countries and return the serialized CountrySearchResponse.
+        Only the matching IDs are queried; rows are taken from the fragment cache and
+        only the ones missing from it are loaded and serialized.
+        
+        Args:
+            params (CountrySearchParams): Search parameters including name, iso2, iso3, region, etc.
+            
+        Returns:
+            bytes: JSON of the search results
+        """
+        query = self._search_query(params)
+        total = query.count()
+        ids = [
+            row.id for row in
+            query.with_entities(Country.id).order_by(Country.name).offset(params.offset).limit(params.limit)
+        ]
+        fragments = render_rows("countries", ids, self._serialize_countries)
+        return list_response("Countries found successfully", fragments, total)
+
+    def _serialize_countries(self, ids: List[int]) -> Dict[int, bytes]:
+        """Load countries by ID and serialize each one as CountryResponse JSON."""
+        countries = self.db.query(Country).filter(Country.id.in_(ids)).all()
+        return {country.id: CountryResponse.from_orm(country).json().encode() for country in countries}
+
     def _parse_timezones(self, timezones_str: str) -> Optional[List[dict]]:
-        """Parse timezones string to JSON list."""
-        if not timezones_str or timezones_str == '[]':
+        """
+        Parse timezones string to JSON list.
+        The dump stores JavaScript object literals ({zoneName:'Asia\/Kabul',...}), which are
+        normalized to JSON first; plain Python/JSON literals are still accepted.
+        """
+        if not isinstance(timezones_str, str) or not timezones_str or timezones_str == '[]':
             return None
+        normalized = re.sub(TIMEZONE_KEY_PATTERN, TIMEZONE_KEY_REPLACEMENT, timezones_str)
+        normalized = re.sub(TIMEZONE_VALUE_PATTERN, TIMEZONE_VALUE_REPLACEMENT, normalized)
+        normalized = normalized.replace('\\/', '/')
+        try:
+            return json.loads(normalized)
+        except ValueError:
+            pass
         try:
             # Convert string representation of list to actual list
             timezones_list = ast.literal_eval(timezones_str)
@@ -151,11 +217,17 @@ class CountryService:
         except (ValueError, TypeError):
             return None
 
-    async def initialize_countries(self) -> dict:
+    def initialize_countries(self, start_row: int = 0, on_batch: Optional[Callable[[int, int, dict], None]] = None) -> dict:
         """
         Initialize countries in the database from a CSV file using pandas.
         id,name,iso3,iso2,numeric_code,phonecode,capital,currency,currency_name,currency_symbol,tld,native,region,region_id,subregion,subregion_id,nationality,timezones,latitude,longitude,emoji,emojiU
         
+        Args:
+            start_row (int): Row offset to resume from (rows before it were already committed)
+            on_batch (Callable, optional): Called as on_batch(processed_rows, total_rows, stats) right
+                before each batch commit, so a checkpoint written through this session is committed
+                atomically with the batch
+
         Returns:
             dict: Statistics about the initialization process
         """
@@ -171,7 +243,7 @@ class CountryService:
         
         # Read CSV file using pandas
         try:
-            df = pd.read_csv(countries_file)
+            df = pd.read_csv(countries_file, header=0 if csv_has_header(countries_file) else None)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -182,102 +254,113 @@ class CountryService:
         added_countries = 0
         updated_countries = 0
         error_countries = 0
+        batch_size = 100
         
-        # Process each country
-        for _, row in df.iterrows():
-            try:
-                # Check if country already exists
-                existing_country = self.db.query(Country).filter(
-                    Country.country_id == int(row[0])
-                ).first()
+        # Process countries in batches, committing after each one
+        for batch_start in range(start_row, total_countries, batch_size):
+            batch_end = min(batch_start + batch_size, total_countries)
+            for _, row in df.iloc[batch_start:batch_end].iterrows():
+                try:
+                    # Check if country already exists
+                    existing_country = self.db.query(Country).filter(
+                        Country.country_id == int(row[0])
+                    ).first()
                 
-                # Parse timezones
-                timezones = self._parse_timezones(row[17])
+                    # Parse timezones
+                    timezones = self._parse_timezones(row[17])
                 
-                # Parse coordinates
-                latitude = self._parse_coordinates(row[18])
-                longitude = self._parse_coordinates(row[19])
+                    # Parse coordinates
+                    latitude = self._parse_coordinates(row[18])
+                    longitude = self._parse_coordinates(row[19])
                 
-                # Format phonecode: prepend '+' if not empty and doesn't start with it
-                phonecode = str(row[5]) if pd.notna(row[5]) else None
-                if phonecode and not phonecode.startswith('+'):
-                    phonecode = f'+{phonecode}'
+                    # Format phonecode: prepend '+' if not empty and doesn't start with it
+                    phonecode = str(row[5]) if pd.notna(row[5]) else None
+                    if phonecode and not phonecode.startswith('+'):
+                        phonecode = f'+{phonecode}'
                 
-                # Format numeric_code: always 3 digits, zero-padded
-                raw_numeric_code = row[4]
-                numeric_code = None
-                if pd.notna(raw_numeric_code):
-                    try:
-                        numeric_code = f"{int(raw_numeric_code):03d}"
-                    except Exception:
-                        numeric_code = str(raw_numeric_code)
+                    # Format numeric_code: always 3 digits, zero-padded
+                    raw_numeric_code = row[4]
+                    numeric_code = None
+                    if pd.notna(raw_numeric_code):
+                        try:
+                            numeric_code = f"{int(raw_numeric_code):03d}"
+                        except Exception:
+                            numeric_code = str(raw_numeric_code)
                 
-                # Format iso2: strip whitespace and uppercase
-                iso2 = str(row[3]).strip().upper() if pd.notna(row[3]) else None
-                if iso2:
-                    # Remove any non-alphabetic characters
-                    iso2 = ''.join(c for c in iso2 if c.isalpha())
-                    # Validate the ISO2 code
-                    if not re.match(r'^[A-Z]{2}$', iso2):
-                        print(f"WARNING: Country {row[1]} has invalid ISO2 code: '{iso2}'")
-                        iso2 = None
+                    # Format iso2: strip whitespace and uppercase
+                    iso2 = str(row[3]).strip().upper() if pd.notna(row[3]) else None
+                    if iso2:
+                        # Remove any non-alphabetic characters
+                        iso2 = ''.join(c for c in iso2 if c.isalpha())
+                        # Validate the ISO2 code
+                        if not re.match(r'^[A-Z]{2}$', iso2):
+                            print(f"WARNING: Country {row[1]} has invalid ISO2 code: '{iso2}'")
+                            iso2 = None
                 
-                if existing_country:
-                    # Update existing country with type validation
-                    existing_country.country_id = int(row[0])
-                    existing_country.name = str(row[1])
-                    existing_country.iso3 = str(row[2])
-                    existing_country.iso2 = iso2
-                    existing_country.numeric_code = numeric_code
-                    existing_country.phonecode = phonecode
-                    existing_country.capital = str(row[6]) if pd.notna(row[6]) else None
-                    existing_country.currency = str(row[7]) if pd.notna(row[7]) else None
-                    existing_country.currency_name = str(row[8]) if pd.notna(row[8]) else None
-                    existing_country.currency_symbol = str(row[9]) if pd.notna(row[9]) else None
-                    existing_country.tld = str(row[10]) if pd.notna(row[10]) else None
-                    existing_country.native = str(row[11]) if pd.notna(row[11]) else None
-                    existing_country.region = str(row[12]) if pd.notna(row[12]) else None
-                    existing_country.subregion = str(row[14]) if pd.notna(row[14]) else None
-                    existing_country.nationality = str(row[16]) if pd.notna(row[16]) else None
-                    existing_country.timezones = timezones
-                    existing_country.latitude = latitude
-                    existing_country.longitude = longitude
-                    existing_country.emoji = str(row[20]) if pd.notna(row[20]) else None
-                    existing_country.emojiU = str(row[21]) if pd.notna(row[21]) else None
-                    updated_countries += 1
-                else:
-                    # Create new country with type validation
-                    new_country = Country(
-                        country_id=int(row[0]),
-                        name=str(row[1]),
-                        iso3=str(row[2]),
-                        iso2=iso2,
-                        numeric_code=numeric_code,
-                        phonecode=phonecode,
-                        capital=str(row[6]) if pd.notna(row[6]) else None,
-                        currency=str(row[7]) if pd.notna(row[7]) else None,
-                        currency_name=str(row[8]) if pd.notna(row[8]) else None,
-                        currency_symbol=str(row[9]) if pd.notna(row[9]) else None,
-                        tld=str(row[10]) if pd.notna(row[10]) else None,
-                        native=str(row[11]) if pd.notna(row[11]) else None,
-                        region=str(row[12]) if pd.notna(row[12]) else None,
-                        subregion=str(row[14]) if pd.notna(row[14]) else None,
-                        nationality=str(row[16]) if pd.notna(row[16]) else None,
-                        timezones=timezones,
-                        latitude=latitude,
-                        longitude=longitude,
-                        emoji=str(row[20]) if pd.notna(row[20]) else None,
-                        emojiU=str(row[21]) if pd.notna(row[21]) else None
-                    )
-                    self.db.add(new_country)
-                    added_countries += 1
-            except Exception as e:
-                error_countries += 1
-                print(f"Error processing country {row[1]}: {str(e)}")
-                continue
-        
-        # Commit changes
-        self.db.commit()
+                    if existing_country:
+                        # Update existing country with type validation
+                        existing_country.country_id = int(row[0])
+                        existing_country.name = str(row[1])
+                        existing_country.iso3 = str(row[2])
+                        existing_country.iso2 = iso2
+                        existing_country.numeric_code = numeric_code
+                        existing_country.phonecode = phonecode
+                        existing_country.capital = str(row[6]) if pd.notna(row[6]) else None
+                        existing_country.currency = str(row[7]) if pd.notna(row[7]) else None
+                        existing_country.currency_name = str(row[8]) if pd.notna(row[8]) else None
+                        existing_country.currency_symbol = str(row[9]) if pd.notna(row[9]) else None
+                        existing_country.tld = str(row[10]) if pd.notna(row[10]) else None
+                        existing_country.native = str(row[11]) if pd.notna(row[11]) else None
+                        existing_country.region = str(row[12]) if pd.notna(row[12]) else None
+                        existing_country.subregion = str(row[14]) if pd.notna(row[14]) else None
+                        existing_country.nationality = str(row[16]) if pd.notna(row[16]) else None
+                        existing_country.timezones = timezones
+                        existing_country.latitude = latitude
+                        existing_country.longitude = longitude
+                        existing_country.emoji = str(row[20]) if pd.notna(row[20]) else None
+                        existing_country.emojiU = str(row[21]) if pd.notna(row[21]) else None
+                        updated_countries += 1
+                    else:
+                        # Create new country with type validation
+                        new_country = Country(
+                            country_id=int(row[0]),
+                            name=str(row[1]),
+                            iso3=str(row[2]),
+                            iso2=iso2,
+                            numeric_code=numeric_code,
+                            phonecode=phonecode,
+                            capital=str(row[6]) if pd.notna(row[6]) else None,
+                            currency=str(row[7]) if pd.notna(row[7]) else None,
+                            currency_name=str(row[8]) if pd.notna(row[8]) else None,
+                            currency_symbol=str(row[9]) if pd.notna(row[9]) else None,
+                            tld=str(row[10]) if pd.notna(row[10]) else None,
+                            native=str(row[11]) if pd.notna(row[11]) else None,
+                            region=str(row[12]) if pd.notna(row[12]) else None,
+                            subregion=str(row[14]) if pd.notna(row[14]) else None,
+                            nationality=str(row[16]) if pd.notna(row[16]) else None,
+                            timezones=timezones,
+                            latitude=latitude,
+                            longitude=longitude,
+                            emoji=str(row[20]) if pd.notna(row[20]) else None,
+                            emojiU=str(row[21]) if pd.notna(row[21]) else None
+                        )
+                        self.db.add(new_country)
+                        added_countries += 1
+                except Exception as e:
+                    error_countries += 1
+                    print(f"Error processing country {row[1]}: {str(e)}")
+                    continue
+
+            # Record the checkpoint and commit changes for this batch
+            if on_batch:
+                on_batch(batch_end, total_countries, {
+                    "added_countries": added_countries,
+                    "updated_countries": updated_countries,
+                    "error_countries": error_countries
+                })
+            self.db.commit()
+            # Invalidate cached country responses as soon as the batch is visible
+            bump_dataset_version("countries")
         
         return {
             "total_countries": total_countries,
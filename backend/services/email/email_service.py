@@ -1,11 +1,11 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from models.user import User
-from models.email_verification import EmailVerification
-from sqlalchemy import and_
 from datetime import datetime, timedelta
+from core.config import settings
 from core.logger import logger
-import secrets
+from core.profile_cache import invalidate_profile
+from core.token_store import get_token_store, EMAIL_VERIFICATION
 
 class EmailService:
     def __init__(self, db: Session):
@@ -32,24 +32,12 @@ class EmailService:
                     detail="User not found"
                 )
 
-            # Generate a secure random token
-            token = secrets.token_urlsafe(32)
-            
-            # Create new verification record
-            verification = EmailVerification(
-                user_id=user_id,
-                token=token,
-                expires_at=datetime.utcnow() + timedelta(hours=24)
+            # Issue a new token; the user's previous verification tokens are invalidated
+            token = get_token_store(self.db).issue(
+                user_id,
+                EMAIL_VERIFICATION,
+                timedelta(hours=settings.ONE_TIME_TOKEN_EXPIRY_HOURS)
             )
-            
-            # Invalidate any existing verification tokens
-            existing_tokens = self.db.query(EmailVerification).filter(
-                EmailVerification.user_id == user_id
-            ).all()
-            for existing_token in existing_tokens:
-                existing_token.is_used = True
-            
-            self.db.add(verification)
             self.db.commit()
             
             logger.info(f"Generated verification token for user: {user.email}")
@@ -79,23 +67,16 @@ class EmailService:
             HTTPException: If token is invalid or expired
         """
         try:
-            # Find valid verification record
-            verification = self.db.query(EmailVerification).filter(
-                and_(
-                    EmailVerification.token == token,
-                    EmailVerification.expires_at > datetime.utcnow(),
-                    EmailVerification.is_used == False
-                )
-            ).first()
-
-            if not verification:
+            # Use up the token
+            user_id = get_token_store(self.db).consume(token, EMAIL_VERIFICATION)
+            if not user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid or expired verification token"
                 )
 
             # Get user
-            user = self.db.query(User).filter(User.id == verification.user_id).first()
+            user = self.db.query(User).filter(User.id == user_id).first()
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -104,10 +85,10 @@ class EmailService:
 
             # Update user's verification status
             user.is_verified = True
-            verification.is_used = True
             user.updated_at = datetime.utcnow()
             
             self.db.commit()
+            invalidate_profile(user.id)
             logger.info(f"Email verified for user: {user.email}")
             
             return user
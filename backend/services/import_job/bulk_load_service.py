@@ -0,0 +1,281 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+from pathlib import Path
+from typing import Dict, Any, Optional
+import time
+from core.database import DATABASE_URL
+from core.dataset_version import bump_dataset_version
+from core.logger import logger
+from core.utils import csv_has_header
+from services.city.state_service import DELETE_STATES_SQL, INSERT_STATES_SQL, GROUP_STATES_SQL
+from services.user.user_location_service import SYNC_USER_LOCATIONS_SQL
+from services.country.country_service import (
+    TIMEZONE_KEY_PATTERN,
+    TIMEZONE_VALUE_PATTERN,
+)
+
+DUMP_DIR = Path(__file__).parent.parent.parent / "dump"
+
+# Column layout of the dump files, in file order
+COUNTRY_CSV_COLUMNS = (
+    "id", "name", "iso3", "iso2", "numeric_code", "phonecode", "capital", "currency",
+    "currency_name", "currency_symbol", "tld", "native", "region", "region_id", "subregion",
+    "subregion_id", "nationality", "timezones", "latitude", "longitude", "emoji", "emojiU"
+)
+CITY_CSV_COLUMNS = (
+    "id", "name", "state_id", "state_code", "state_name", "country_id", "country_code",
+    "country_name", "latitude", "longitude", "wikiDataId"
+)
+
+# MySQL REGEXP_REPLACE uses $n backreferences instead of Python's \n
+TIMEZONE_KEY_SQL_REPLACEMENT = '$1"$2":'
+TIMEZONE_VALUE_SQL_REPLACEMENT = ':"$1"'
+
+# Same transformations initialize_countries applies row by row, expressed as set-based SQL
+NORMALIZE_COUNTRIES_SQL = """
+UPDATE stage_countries SET
+    phonecode = CASE
+        WHEN phonecode = '' THEN NULL
+        WHEN LEFT(phonecode, 1) = '+' THEN phonecode
+        ELSE CONCAT('+', phonecode)
+    END,
+    numeric_code = CASE
+        WHEN numeric_code = '' THEN NULL
+        WHEN numeric_code REGEXP '^[0-9]+$' THEN LPAD(CAST(numeric_code AS UNSIGNED), 3, '0')
+        ELSE numeric_code
+    END,
+    iso2 = CASE
+        WHEN REGEXP_LIKE(REGEXP_REPLACE(UPPER(TRIM(iso2)), '[^A-Z]', ''), '^[A-Z]{2}$', 'c')
+            THEN REGEXP_REPLACE(UPPER(TRIM(iso2)), '[^A-Z]', '')
+        ELSE NULL
+    END,
+    timezones = CASE
+        WHEN timezones IN ('', '[]') THEN NULL
+        ELSE REPLACE(
+            REGEXP_REPLACE(
+                REGEXP_REPLACE(timezones, :key_pattern, :key_replacement),
+                :value_pattern, :value_replacement
+            ),
+            '\\\\/', '/'
+        )
+    END
+"""
+
+MERGE_COUNTRIES_SQL = (
+    """
+    UPDATE countries c
+    JOIN stage_countries s ON s.id = c.country_id
+    SET c.name = s.name,
+        c.iso3 = s.iso3,
+        c.iso2 = s.iso2,
+        c.numeric_code = s.numeric_code,
+        c.phonecode = s.phonecode,
+        c.capital = NULLIF(s.capital, ''),
+        c.currency = NULLIF(s.currency, ''),
+        c.currency_name = NULLIF(s.currency_name, ''),
+        c.currency_symbol = NULLIF(s.currency_symbol, ''),
+        c.tld = NULLIF(s.tld, ''),
+        c.native = NULLIF(s.native, ''),
+        c.region = NULLIF(s.region, ''),
+        c.subregion = NULLIF(s.subregion, ''),
+        c.nationality = NULLIF(s.nationality, ''),
+        c.timezones = IF(JSON_VALID(s.timezones), CAST(s.timezones AS JSON), NULL),
+        c.latitude = NULLIF(s.latitude, ''),
+        c.longitude = NULLIF(s.longitude, ''),
+        c.emoji = NULLIF(s.emoji, ''),
+        c.emojiU = NULLIF(s.emojiU, '')
+    """,
+    """
+    INSERT INTO countries (
+        country_id, name, iso3, iso2, numeric_code, phonecode, capital, currency,
+        currency_name, currency_symbol, tld, native, region, subregion, nationality,
+        timezones, latitude, longitude, emoji, emojiU
+    )
+    SELECT
+        s.id, s.name, s.iso3, s.iso2, s.numeric_code, s.phonecode, NULLIF(s.capital, ''),
+        NULLIF(s.currency, ''), NULLIF(s.currency_name, ''), NULLIF(s.currency_symbol, ''),
+        NULLIF(s.tld, ''), NULLIF(s.native, ''), NULLIF(s.region, ''), NULLIF(s.subregion, ''),
+        NULLIF(s.nationality, ''),
+        IF(JSON_VALID(s.timezones), CAST(s.timezones AS JSON), NULL),
+        NULLIF(s.latitude, ''), NULLIF(s.longitude, ''), NULLIF(s.emoji, ''), NULLIF(s.emojiU, '')
+    FROM stage_countries s
+    WHERE NOT EXISTS (SELECT 1 FROM countries c WHERE c.country_id = s.id)
+    """
+)
+
+MERGE_CITIES_SQL = (
+    """
+    UPDATE cities ci
+    JOIN stage_cities s ON s.id = ci.city_id
+    JOIN countries c ON c.country_id = s.country_id AND c.id = ci.country_id
+    SET ci.name = s.name,
+        ci.state_id = s.state_id,
+        ci.state_code = NULLIF(s.state_code, ''),
+        ci.state_name = s.state_name,
+        ci.country_code = s.country_code,
+        ci.country_name = s.country_name,
+        ci.latitude = NULLIF(s.latitude, ''),
+        ci.longitude = NULLIF(s.longitude, ''),
+        ci.wikiDataId = NULLIF(s.wikiDataId, '')
+    """,
+    """
+    INSERT INTO cities (
+        city_id, name, state_id, state_code, state_name, country_id, country_code,
+        country_name, latitude, longitude, wikiDataId
+    )
+    SELECT
+        s.id, s.name, s.state_id, NULLIF(s.state_code, ''), s.state_name, c.id, s.country_code,
+        s.country_name, NULLIF(s.latitude, ''), NULLIF(s.longitude, ''), NULLIF(s.wikiDataId, '')
+    FROM stage_cities s
+    JOIN countries c ON c.country_id = s.country_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM cities ci WHERE ci.city_id = s.id AND ci.country_id = c.id
+    )
+    """
+)
+
+class BulkLoadService:
+    """
+    Load the dump/ reference datasets with LOAD DATA LOCAL INFILE.
+
+    The CSV is staged into a temporary table, normalized with set-based SQL and merged
+    into the live table in a single transaction. Live tables are merged rather than
+    swapped by rename, because users.country_id / users.city_id foreign keys would
+    follow a renamed table.
+    """
+
+    def __init__(self, database_url: str = DATABASE_URL):
+        # local_infile must be enabled on the client connection; NullPool keeps these
+        # connections out of the application pool
+        self.engine = create_engine(
+            database_url,
+            poolclass=NullPool,
+            connect_args={"local_infile": True}
+        )
+
+    def _stage_csv(self, conn: Connection, table: str, columns: tuple, csv_file: Path) -> int:
+        """
+        Create a temporary staging table and load the CSV file into it.
+
+        Returns:
+            int: Number of rows loaded
+        """
+        column_defs = ", ".join(f"`{column}` TEXT" for column in columns)
+        conn.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {table}"))
+        conn.execute(text(f"CREATE TEMPORARY TABLE {table} ({column_defs}) DEFAULT CHARSET=utf8mb4"))
+
+        ignore_lines = "IGNORE 1 LINES" if csv_has_header(csv_file) else ""
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        # ESCAPED BY '' keeps the backslashes of the dump (e.g. 'Asia\/Kabul') untouched;
+        # they are normalized together with the rest of the timezone literal.
+        result = conn.execute(
+            text(
+                f"LOAD DATA LOCAL INFILE :path INTO TABLE {table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                "LINES TERMINATED BY '\\n' "
+                f"{ignore_lines} ({column_list})"
+            ),
+            {"path": str(csv_file)}
+        )
+        return result.rowcount
+
+    def _merge(self, conn: Connection, statements: tuple) -> Dict[str, int]:
+        """Run the UPDATE and INSERT of a merge, returning affected row counts."""
+        updated = conn.execute(text(statements[0])).rowcount
+        added = conn.execute(text(statements[1])).rowcount
+        return {"updated": updated, "added": added}
+
+    def load_countries(self, csv_file: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Load countries from dump/countries.csv.
+
+        Args:
+            csv_file (Path, optional): Alternative CSV file with the same layout
+
+        Returns:
+            dict: Row counts and timings of the stage, normalize and merge steps
+        """
+        csv_file = Path(csv_file) if csv_file else DUMP_DIR / "countries.csv"
+        if not csv_file.exists():
+            raise FileNotFoundError(f"Countries data file not found at {csv_file}")
+
+        timings = {}
+        started = time.perf_counter()
+        with self.engine.connect() as conn:
+            with conn.begin():
+                staged = self._stage_csv(conn, "stage_countries", COUNTRY_CSV_COLUMNS, csv_file)
+                timings["stage_seconds"] = round(time.perf_counter() - started, 3)
+
+                step = time.perf_counter()
+                conn.execute(text(NORMALIZE_COUNTRIES_SQL), {
+                    "key_pattern": TIMEZONE_KEY_PATTERN,
+                    "key_replacement": TIMEZONE_KEY_SQL_REPLACEMENT,
+                    "value_pattern": TIMEZONE_VALUE_PATTERN,
+                    "value_replacement": TIMEZONE_VALUE_SQL_REPLACEMENT
+                })
+                timings["normalize_seconds"] = round(time.perf_counter() - step, 3)
+
+                step = time.perf_counter()
+                merged = self._merge(conn, MERGE_COUNTRIES_SQL)
+                timings["merge_seconds"] = round(time.perf_counter() - step, 3)
+            conn.execute(text("DROP TEMPORARY TABLE IF EXISTS stage_countries"))
+        bump_dataset_version("countries")
+
+        timings["total_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Loaded {staged} countries with LOAD DATA in {timings['total_seconds']}s")
+        return {
+            "total_countries": staged,
+            "added_countries": merged["added"],
+            "updated_countries": merged["updated"],
+            **timings
+        }
+
+    def load_cities(self, csv_file: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Load cities from dump/cities.csv. Cities whose country is not loaded are skipped.
+
+        Args:
+            csv_file (Path, optional): Alternative CSV file with the same layout
+
+        Returns:
+            dict: Row counts and timings of the stage and merge steps (including the states rebuild)
+        """
+        csv_file = Path(csv_file) if csv_file else DUMP_DIR / "cities.csv"
+        if not csv_file.exists():
+            raise FileNotFoundError(f"Cities data file not found at {csv_file}")
+
+        timings = {}
+        started = time.perf_counter()
+        with self.engine.connect() as conn:
+            with conn.begin():
+                staged = self._stage_csv(conn, "stage_cities", CITY_CSV_COLUMNS, csv_file)
+                timings["stage_seconds"] = round(time.perf_counter() - started, 3)
+
+                step = time.perf_counter()
+                merged = self._merge(conn, MERGE_CITIES_SQL)
+                timings["merge_seconds"] = round(time.perf_counter() - step, 3)
+
+                # Refresh the materialized states and user locations in the same transaction as the cities
+                conn.execute(text(DELETE_STATES_SQL))
+                conn.execute(text(INSERT_STATES_SQL + GROUP_STATES_SQL))
+                for statement in SYNC_USER_LOCATIONS_SQL:
+                    conn.execute(text(statement))
+
+                skipped = conn.execute(text(
+                    "SELECT COUNT(*) FROM stage_cities s "
+                    "WHERE NOT EXISTS (SELECT 1 FROM countries c WHERE c.country_id = s.country_id)"
+                )).scalar()
+            conn.execute(text("DROP TEMPORARY TABLE IF EXISTS stage_cities"))
+        bump_dataset_version("cities")
+
+        timings["total_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Loaded {staged} cities with LOAD DATA in {timings['total_seconds']}s")
+        return {
+            "total_cities": staged,
+            "added_cities": merged["added"],
+            "updated_cities": merged["updated"],
+            "skipped_cities": skipped,
+            **timings
+        }
@@ -0,0 +1,226 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from models.import_job import ImportJob
+from datetime import datetime, timedelta
+from celery import states
+from typing import Dict, Any, Optional
+from core.config import settings
+from core.logger import logger
+
+# Reference datasets that can be imported in the background
+SUPPORTED_DATASETS = ("countries", "cities")
+
+# Statuses of a job that has not finished and can therefore be resumed
+UNFINISHED_STATUSES = ("pending", "running", "failed")
+
+class ImportJobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _get_unfinished_job(self, dataset: str) -> Optional[ImportJob]:
+        """Get the most recent import job for a dataset that has not completed."""
+        return self.db.query(ImportJob).filter(
+            ImportJob.dataset == dataset,
+            ImportJob.status.in_(UNFINISHED_STATUSES)
+        ).order_by(ImportJob.id.desc()).first()
+
+    def _is_stale(self, job: ImportJob) -> bool:
+        """
+        Check whether a pending or running job is dead.
+        A running job is dead once it stops reporting checkpoints. A pending job may just be
+        queued behind other work: it is dead if its task finished without starting it, or
+        after the much longer IMPORT_JOB_PENDING_STALE_SECONDS.
+        """
+        last_seen = job.updated_at or job.created_at
+        if not last_seen:
+            return True
+        age = datetime.utcnow() - last_seen
+        if job.status != "pending":
+            return age > timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+
+        if not job.task_id:
+            # Committed but never enqueued (the process died before delay returned)
+            return age > timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+        # Imported here to avoid a circular import with the task module
+        from tasks.reference_data_tasks import import_reference_data
+        try:
+            if import_reference_data.AsyncResult(job.task_id).state in states.READY_STATES:
+                return True
+        except Exception as e:
+            logger.warning(f"Could not get the task state of import job {job.id}: {str(e)}")
+        return age > timedelta(seconds=settings.IMPORT_JOB_PENDING_STALE_SECONDS)
+
+    def enqueue_import(self, dataset: str) -> Dict[str, Any]:
+        """
+        Enqueue a background import for a reference dataset.
+        An unfinished job for the same dataset is resumed from its last checkpoint
+        instead of starting over; a job that is still alive is returned as is.
+
+        Args:
+            dataset (str): Dataset to import ('countries' or 'cities')
+
+        Returns:
+            dict: Job id, Celery task id, status and whether the job was resumed
+        """
+        if dataset not in SUPPORTED_DATASETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported dataset '{dataset}'"
+            )
+
+        job = self._get_unfinished_job(dataset)
+        if job and job.status in ("pending", "running") and not self._is_stale(job):
+            logger.info(f"Import job {job.id} for {dataset} is already in progress")
+            return {
+                "job_id": job.id,
+                "task_id": job.task_id,
+                "status": job.status,
+                "resumed": False
+            }
+
+        resumed = job is not None
+        if job:
+            logger.info(f"Resuming import job {job.id} for {dataset} from row {job.processed_rows}")
+            job.status = "pending"
+            job.error_message = None
+        else:
+            job = ImportJob(dataset=dataset, status="pending")
+            self.db.add(job)
+        self.db.commit()
+
+        # Imported here to avoid a circular import with the task module
+        from tasks.reference_data_tasks import import_reference_data
+        result = import_reference_data.delay(job.id)
+
+        job.task_id = result.id
+        self.db.commit()
+
+        return {
+            "job_id": job.id,
+            "task_id": job.task_id,
+            "status": job.status,
+            "resumed": resumed
+        }
+
+    def start_run(self, job_id: int) -> ImportJob:
+        """
+        Mark a job as running and remember where this run starts, so throughput
+        and ETA only account for rows processed by the current run.
+        """
+        job = self.db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            raise ValueError(f"Import job {job_id} not found")
+
+        job.status = "running"
+        job.run_started_at = datetime.utcnow()
+        job.run_start_row = job.processed_rows or 0
+        job.finished_at = None
+        self.db.commit()
+        return job
+
+    def record_checkpoint(self, job: ImportJob, base: Dict[str, int], processed_rows: int, total_rows: int, stats: dict) -> None:
+        """
+        Update the job checkpoint and counters without committing.
+        The caller commits it together with the batch it describes.
+
+        Args:
+            job (ImportJob): Job being executed
+            base (dict): Counter values at the start of the current run
+            processed_rows (int): Rows processed so far, including previous runs
+            total_rows (int): Total rows in the source file
+            stats (dict): Counters of the current run as reported by the service
+        """
+        dataset = job.dataset
+        job.total_rows = total_rows
+        job.processed_rows = processed_rows
+        job.added_rows = base["added_rows"] + stats.get(f"added_{dataset}", 0)
+        job.updated_rows = base["updated_rows"] + stats.get(f"updated_{dataset}", 0)
+        job.skipped_rows = base["skipped_rows"] + stats.get(f"skipped_{dataset}", 0)
+        job.error_rows = base["error_rows"] + stats.get(f"error_{dataset}", 0)
+        job.updated_at = datetime.utcnow()
+
+    def get_counters(self, job: ImportJob) -> Dict[str, int]:
+        """Get the current counters of a job, used as the base for a resumed run."""
+        return {
+            "added_rows": job.added_rows or 0,
+            "updated_rows": job.updated_rows or 0,
+            "skipped_rows": job.skipped_rows or 0,
+            "error_rows": job.error_rows or 0
+        }
+
+    def complete(self, job: ImportJob) -> None:
+        """Mark a job as completed."""
+        job.status = "completed"
+        job.processed_rows = job.total_rows
+        job.finished_at = datetime.utcnow()
+        self.db.commit()
+        logger.info(f"Import job {job.id} for {job.dataset} completed")
+
+    def fail(self, job_id: int, error: str) -> None:
+        """Mark a job as failed, keeping its checkpoint so it can be resumed."""
+        self.db.rollback()
+        job = self.db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            return
+        job.status = "failed"
+        job.error_message = error
+        self.db.commit()
+        logger.error(f"Import job {job_id} failed at row {job.processed_rows}: {error}")
+
+    def get_progress(self, job_id: int, dataset: str = None) -> Dict[str, Any]:
+        """
+        Get progress information for an import job.
+
+        Args:
+            job_id (int): ID of the import job
+            dataset (str, optional): Expected dataset of the job
+
+        Returns:
+            dict: Rows processed, throughput in rows per second and ETA in seconds
+
+        Raises:
+            HTTPException: If the job is not found
+        """
+        query = self.db.query(ImportJob).filter(ImportJob.id == job_id)
+        if dataset:
+            query = query.filter(ImportJob.dataset == dataset)
+        job = query.first()
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Import job not found"
+            )
+
+        total_rows = job.total_rows or 0
+        processed_rows = job.processed_rows or 0
+
+        rows_per_second = None
+        eta_seconds = None
+        if job.run_started_at:
+            end = job.finished_at or datetime.utcnow()
+            elapsed = (end - job.run_started_at).total_seconds()
+            run_rows = processed_rows - (job.run_start_row or 0)
+            if elapsed > 0 and run_rows > 0:
+                rows_per_second = round(run_rows / elapsed, 2)
+                if job.status == "running":
+                    eta_seconds = int((total_rows - processed_rows) / rows_per_second)
+
+        return {
+            "job_id": job.id,
+            "dataset": job.dataset,
+            "status": job.status,
+            "task_id": job.task_id,
+            "total_rows": total_rows,
+            "processed_rows": processed_rows,
+            "added_rows": job.added_rows or 0,
+            "updated_rows": job.updated_rows or 0,
+            "skipped_rows": job.skipped_rows or 0,
+            "error_rows": job.error_rows or 0,
+            "percent": round(processed_rows * 100 / total_rows, 2) if total_rows else 0.0,
+            "rows_per_second": rows_per_second,
+            "eta_seconds": eta_seconds,
+            "started_at": job.run_started_at,
+            "updated_at": job.updated_at,
+            "finished_at": job.finished_at,
+            "error_message": job.error_message
+        }
@@ -3,9 +3,11 @@ from sqlalchemy import and_
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from models.session import Session as SessionModel
+from models.user import User
 from core.jwt import JWTManager
 from core.roles import UserRole
 from core.logger import logger
+from services.user.session_service import SessionService
 import os
 from dotenv import load_dotenv
 
@@ -46,6 +48,11 @@ class RefreshTokenService:
                 logger.warning(f"Could not parse role '{payload.get('role')}', using default value: {str(e)}")
                 role = UserRole.USER  # Default to USER role if parsing fails
 
+            # A valid refresh token must not outlive the account (deactivation, block, erasure)
+            user = self.db.query(User.is_active, User.is_blocked).filter(User.id == user_id).first()
+            if not user or not user.is_active or user.is_blocked:
+                raise ValueError("User account is inactive or blocked")
+
             # Check for existing valid session
             existing_session = self.db.query(SessionModel).filter(
                 and_(
@@ -80,6 +87,7 @@ class RefreshTokenService:
                     role=role
                 )
                 
+                SessionService(self.db).make_room_for_session(user_id)
                 new_session = SessionModel(
                     user_id=user_id,
                     access_token=tokens["access_token"],
@@ -0,0 +1,357 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from fastapi import HTTPException, status
+from models.account_erasure import AccountErasure
+from datetime import datetime, timedelta
+from celery import states
+from typing import Dict, Any, Optional
+import secrets
+import time
+from core.config import settings
+from core.logger import logger
+from core.metrics import incr_metric
+from core.profile_cache import invalidate_profile
+from core.security import get_password_hash
+from core.token_store import get_token_store, PASSWORD_RESET, EMAIL_VERIFICATION
+from services.user.user_rollup_service import UserRollupService, placement
+
+METRIC_NAME = "account_erasure"
+
+# Statuses of an erasure that has not finished and can therefore be resumed
+UNFINISHED_STATUSES = ("pending", "running", "failed")
+
+# First step: the account is deactivated and blocked, and committed, before anything is
+# deleted, so that no login or token refresh can open a session during the erasure.
+BLOCK_USER_STEP = "block"
+BLOCK_USER_SQL = "UPDATE users SET is_active = 0, is_blocked = 1 WHERE id = :user_id"
+
+# Erasure steps in order. Each statement handles at most :batch_size rows of the user and
+# selects them by its own condition, so it is repeated until a batch comes back short and
+# re-running a step after a crash is harmless. Payments and subscriptions are kept for
+# accounting with their personal and Stripe data cleared; the user row itself is anonymized
+# last (ERASE_USER_STEP) rather than deleted, which would cascade to them.
+ERASURE_STEPS = (
+    ("sessions", "DELETE FROM sessions WHERE user_id = :user_id LIMIT :batch_size"),
+    ("one_time_tokens", "DELETE FROM one_time_tokens WHERE user_id = :user_id LIMIT :batch_size"),
+    ("notifications", "DELETE FROM notifications WHERE user_id = :user_id LIMIT :batch_size"),
+    ("payments", """
+        UPDATE payments SET stripe_customer_id = NULL, payment_data = NULL, data_json = NULL
+        WHERE user_id = :user_id
+        AND (stripe_customer_id IS NOT NULL OR payment_data IS NOT NULL OR data_json IS NOT NULL)
+        LIMIT :batch_size
+    """),
+    ("subscription_users", """
+        UPDATE subscription_users
+        SET stripe_customer_id = NULL, client_secret = NULL, subscription_data = NULL, data_json = NULL
+        WHERE user_id = :user_id
+        AND (stripe_customer_id IS NOT NULL OR client_secret IS NOT NULL
+             OR subscription_data IS NOT NULL OR data_json IS NOT NULL)
+        LIMIT :batch_size
+    """),
+    ("user_locations", "DELETE FROM user_locations WHERE user_id = :user_id LIMIT :batch_size"),
+)
+ERASE_USER_STEP = "users"
+
+ANONYMIZE_USER_SQL = """
+UPDATE users SET
+    email = :email, first_name = '', last_name = '', password = :password,
+    is_active = 0, is_blocked = 1, phone_number = NULL, address = NULL, postal_code = NULL,
+    profile_picture = NULL, country_id = NULL, city_id = NULL, last_login = NULL
+WHERE id = :user_id
+"""
+
+def erased_email(user_id: int) -> str:
+    """Get the placeholder email of an erased user (unique, and never deliverable)."""
+    return f"erased-{user_id}@erased.invalid"
+
+class AccountErasureService:
+    """
+    Erase user accounts table by table in short transactions, instead of deleting the
+    User and letting the ORM load and cascade its whole object graph at once.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _get_unfinished_erasure(self, user_id: int) -> Optional[AccountErasure]:
+        """Get the most recent erasure of a user that has not completed."""
+        return self.db.query(AccountErasure).filter(
+            AccountErasure.user_id == user_id,
+            AccountErasure.status.in_(UNFINISHED_STATUSES)
+        ).order_by(AccountErasure.id.desc()).first()
+
+    def _is_stale(self, erasure: AccountErasure) -> bool:
+        """
+        Check whether a pending or running erasure is dead.
+        A running erasure is dead once it stops reporting checkpoints. A pending one may just be
+        queued behind other work: it is dead if its task finished without starting it, or after
+        the much longer ACCOUNT_ERASURE_PENDING_STALE_SECONDS.
+        """
+        last_seen = erasure.updated_at or erasure.created_at
+        if not last_seen:
+            return True
+        age = datetime.utcnow() - last_seen
+        if erasure.status != "pending" or not erasure.task_id:
+            return age > timedelta(seconds=settings.ACCOUNT_ERASURE_STALE_SECONDS)
+
+        # Imported here to avoid a circular import with the task module
+        from tasks.user_tasks import erase_user_account
+        try:
+            if erase_user_account.AsyncResult(erasure.task_id).state in states.READY_STATES:
+                return True
+        except Exception as e:
+            logger.warning(f"Could not get the task state of erasure {erasure.id}: {str(e)}")
+        return age > timedelta(seconds=settings.ACCOUNT_ERASURE_PENDING_STALE_SECONDS)
+
+    def enqueue_erasure(self, user_id: int, requested_by: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Enqueue the background erasure of a user account.
+        An unfinished erasure of the same user is resumed from its last checkpoint;
+        one that is still alive is returned as is.
+
+        Args:
+            user_id (int): ID of the user to erase
+            requested_by (int, optional): ID of the admin requesting the erasure
+
+        Returns:
+            dict: Erasure id, Celery task id, status and whether the erasure was resumed
+
+        Raises:
+            HTTPException: If the user does not exist, is already erased or has an active subscription
+        """
+        user = self.db.execute(
+            text("SELECT id, email FROM users WHERE id = :user_id"),
+            {"user_id": user_id}
+        ).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        erasure = self._get_unfinished_erasure(user_id)
+        if not erasure and user.email == erased_email(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User account is already erased"
+            )
+        if erasure and erasure.status in ("pending", "running") and not self._is_stale(erasure):
+            logger.info(f"Erasure {erasure.id} of user {user_id} is already in progress")
+            return {
+                "erasure_id": erasure.id,
+                "task_id": erasure.task_id,
+                "status": erasure.status,
+                "resumed": False
+            }
+
+        active_subscriptions = self.db.execute(
+            text("SELECT COUNT(*) FROM subscription_users WHERE user_id = :user_id AND status = 'active'"),
+            {"user_id": user_id}
+        ).scalar()
+        if active_subscriptions:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Cancel the user's active subscriptions before erasing the account"
+            )
+
+        resumed = erasure is not None
+        if erasure:
+            logger.info(f"Resuming erasure {erasure.id} of user {user_id} at step {erasure.step}")
+            erasure.status = "pending"
+            erasure.error_message = None
+        else:
+            erasure = AccountErasure(user_id=user_id, requested_by=requested_by, status="pending", step=BLOCK_USER_STEP)
+            self.db.add(erasure)
+        self.db.commit()
+
+        # Imported here to avoid a circular import with the task module
+        from tasks.user_tasks import erase_user_account
+        result = erase_user_account.delay(erasure.id)
+
+        erasure.task_id = result.id
+        self.db.commit()
+
+        return {
+            "erasure_id": erasure.id,
+            "task_id": erasure.task_id,
+            "status": erasure.status,
+            "resumed": resumed
+        }
+
+    def start_run(self, erasure_id: int) -> AccountErasure:
+        """Mark an erasure as running and remember where this run starts, for throughput."""
+        erasure = self.db.query(AccountErasure).filter(AccountErasure.id == erasure_id).first()
+        if not erasure:
+            raise ValueError(f"Account erasure {erasure_id} not found")
+
+        erasure.status = "running"
+        erasure.run_started_at = datetime.utcnow()
+        erasure.run_start_row = erasure.processed_rows or 0
+        erasure.finished_at = None
+        self.db.commit()
+        return erasure
+
+    def run(self, erasure: AccountErasure) -> None:
+        """
+        Run the remaining steps of an erasure. Each batch commits together with the
+        erasure checkpoint, so an interrupted erasure resumes from its current step.
+        """
+        if erasure.step == BLOCK_USER_STEP:
+            self._block_user(erasure)
+
+        step_names = [name for name, _ in ERASURE_STEPS]
+        start = step_names.index(erasure.step) if erasure.step in step_names else len(step_names)
+        batch_size = settings.ACCOUNT_ERASURE_BATCH_SIZE
+
+        for name, statement in ERASURE_STEPS[start:]:
+            erasure.step = name
+            while True:
+                started = time.perf_counter()
+                rows = self.db.execute(
+                    text(statement),
+                    {"user_id": erasure.user_id, "batch_size": batch_size}
+                ).rowcount
+                erasure.processed_rows = (erasure.processed_rows or 0) + rows
+                erasure.updated_at = datetime.utcnow()
+                self.db.commit()
+                self._record_batch(name, rows, time.perf_counter() - started)
+                if rows < batch_size:
+                    break
+                if settings.MAINTENANCE_CHUNK_PAUSE_SECONDS:
+                    time.sleep(settings.MAINTENANCE_CHUNK_PAUSE_SECONDS)
+
+        erasure.step = ERASE_USER_STEP
+        self._erase_user(erasure)
+
+    def _block_user(self, erasure: AccountErasure) -> None:
+        """Deactivate and block the user and take them out of the rollups, before any data is erased."""
+        started = time.perf_counter()
+        user = self.db.execute(
+            text("SELECT id, is_active, country_id, city_id FROM users WHERE id = :user_id FOR UPDATE"),
+            {"user_id": erasure.user_id}
+        ).first()
+        rows = 0
+        if user:
+            rows = self.db.execute(text(BLOCK_USER_SQL), {"user_id": user.id}).rowcount
+            UserRollupService(self.db).apply([(placement(user), None)])
+
+        erasure.step = ERASURE_STEPS[0][0]
+        erasure.updated_at = datetime.utcnow()
+        self.db.commit()
+        invalidate_profile(erasure.user_id)
+        self._record_batch(BLOCK_USER_STEP, rows, time.perf_counter() - started)
+
+    def _erase_user(self, erasure: AccountErasure) -> None:
+        """Anonymize the user row and take the user out of the rollups, completing the erasure."""
+        started = time.perf_counter()
+        user = self.db.execute(
+            text("SELECT id, is_active, country_id, city_id FROM users WHERE id = :user_id FOR UPDATE"),
+            {"user_id": erasure.user_id}
+        ).first()
+        rows = 0
+        if user:
+            self.db.execute(
+                text(ANONYMIZE_USER_SQL),
+                {
+                    "user_id": user.id,
+                    "email": erased_email(user.id),
+                    "password": get_password_hash(secrets.token_urlsafe(32))
+                }
+            )
+            # No-op unless the erasure started before the account was blocked first
+            UserRollupService(self.db).apply([(placement(user), None)])
+            rows = 1
+        # Sessions opened before the block committed (e.g. by a login in flight)
+        self.db.execute(text("DELETE FROM sessions WHERE user_id = :user_id"), {"user_id": erasure.user_id})
+
+        # The Redis token store is outside the one_time_tokens step
+        token_store = get_token_store(self.db)
+        token_store.invalidate(erasure.user_id, PASSWORD_RESET)
+        token_store.invalidate(erasure.user_id, EMAIL_VERIFICATION)
+
+        erasure.processed_rows = (erasure.processed_rows or 0) + rows
+        erasure.status = "completed"
+        erasure.finished_at = datetime.utcnow()
+        self.db.commit()
+        invalidate_profile(erasure.user_id)
+        self._record_batch(ERASE_USER_STEP, rows, time.perf_counter() - started)
+        incr_metric(METRIC_NAME, "completed")
+        logger.info(f"Erasure {erasure.id} of user {erasure.user_id} completed ({erasure.processed_rows} rows)")
+
+    def _record_batch(self, step: str, rows: int, seconds: float) -> None:
+        incr_metric(METRIC_NAME, f"{step}:rows", rows)
+        incr_metric(METRIC_NAME, "rows", rows)
+        incr_metric(METRIC_NAME, "batches")
+        incr_metric(METRIC_NAME, "milliseconds", int(seconds * 1000))
+
+    def fail(self, erasure_id: int, error: str) -> None:
+        """Mark an erasure as failed, keeping its checkpoint so it can be resumed."""
+        self.db.rollback()
+        erasure = self.db.query(AccountErasure).filter(AccountErasure.id == erasure_id).first()
+        if not erasure:
+            return
+        erasure.status = "failed"
+        erasure.error_message = error
+        self.db.commit()
+        incr_metric(METRIC_NAME, "failed")
+        logger.error(f"Erasure {erasure_id} failed at step {erasure.step}: {error}")
+
+    def resume_stale(self) -> int:
+        """
+        Re-enqueue the pending or running erasures that stopped reporting checkpoints.
+
+        Returns:
+            int: Number of erasures resumed
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.ACCOUNT_ERASURE_STALE_SECONDS)
+        candidates = self.db.query(AccountErasure).filter(
+            AccountErasure.status.in_(("pending", "running")),
+            AccountErasure.updated_at < stale_before
+        ).all()
+        user_ids = {erasure.user_id for erasure in candidates if self._is_stale(erasure)}
+        for user_id in sorted(user_ids):
+            self.enqueue_erasure(user_id)
+        return len(user_ids)
+
+    def get_progress(self, erasure_id: int) -> Dict[str, Any]:
+        """
+        Get progress information for an erasure.
+
+        Args:
+            erasure_id (int): ID of the erasure
+
+        Returns:
+            dict: Current step, rows processed and throughput in rows per second
+
+        Raises:
+            HTTPException: If the erasure is not found
+        """
+        erasure = self.db.query(AccountErasure).filter(AccountErasure.id == erasure_id).first()
+        if not erasure:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Account erasure not found"
+            )
+
+        processed_rows = erasure.processed_rows or 0
+        rows_per_second = None
+        if erasure.run_started_at:
+            end = erasure.finished_at or datetime.utcnow()
+            elapsed = (end - erasure.run_started_at).total_seconds()
+            run_rows = processed_rows - (erasure.run_start_row or 0)
+            if elapsed > 0 and run_rows > 0:
+                rows_per_second = round(run_rows / elapsed, 2)
+
+        return {
+            "erasure_id": erasure.id,
+            "user_id": erasure.user_id,
+            "status": erasure.status,
+            "task_id": erasure.task_id,
+            "step": erasure.step,
+            "processed_rows": processed_rows,
+            "rows_per_second": rows_per_second,
+            "started_at": erasure.run_started_at,
+            "updated_at": erasure.updated_at,
+            "finished_at": erasure.finished_at,
+            "error_message": erasure.error_message
+        }
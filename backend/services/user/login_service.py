@@ -16,7 +16,8 @@ from core.config import settings
 from core.logger import logger
 import secrets
 from core.security import get_password_hash, verify_password
-from tasks.email_tasks import send_password_change_notification
+from tasks.email_tasks import send_password_change_notification, send_login_notification
+from core.outbox import enqueue_task
 from models.country import Country
 from models.city import City
 
@@ -99,7 +100,8 @@ class LoginService:
             # Calculate session expiry
             expires_at = datetime.utcnow() + timedelta(days=settings.SESSION_EXPIRY_DAYS)
             
-            # Create new session
+            # Create new session, evicting the oldest ones beyond the per-user cap
+            SessionService(self.db).make_room_for_session(user.id)
             new_session = SessionModel(
                 user_id=user.id,
                 access_token=tokens["access_token"],
@@ -113,23 +115,20 @@ class LoginService:
                 is_active=True
             )
             self.db.add(new_session)
+
+            # Send login notification email once the login commits
+            enqueue_task(
+                self.db,
+                send_login_notification,
+                to_email=user.email,
+                username=f"{user.first_name} {user.last_name}",
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
             
             # Commit all changes
             self.db.commit()
             
-            # Send login notification email
-            try:
-                from tasks.email_tasks import send_login_notification
-                send_login_notification.delay(
-                    to_email=user.email,
-                    username=f"{user.first_name} {user.last_name}",
-                    ip_address=ip_address,
-                    user_agent=user_agent
-                )
-            except Exception as e:
-                logger.error(f"Failed to send login notification email: {str(e)}")
-                # Don't raise the exception as the login was successful
-            
             logger.info(f"User {user.email} logged in successfully")
             return tokens
             
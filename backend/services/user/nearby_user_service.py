@@ -0,0 +1,202 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from fastapi import HTTPException, status
+from services.city.city_store import EARTH_RADIUS_KM
+from typing import Any, Dict, List, Optional, Tuple
+import math
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+NEARBY_COLUMNS = """
+SELECT ul.user_id, u.first_name, u.last_name, ul.city_id, c.name AS city_name, ul.country_id{distance}
+FROM user_locations ul
+JOIN users u ON u.id = ul.user_id
+JOIN cities c ON c.id = ul.city_id
+WHERE u.is_active = 1 AND ({area})
+"""
+COUNT_COLUMNS = """
+SELECT COUNT(*)
+FROM user_locations ul
+JOIN users u ON u.id = ul.user_id
+WHERE u.is_active = 1 AND ({area})
+"""
+
+# Distance in whole meters, so keyset comparisons are exact
+DISTANCE_SQL = f"ROUND(ST_Distance_Sphere(ul.location, POINT(:longitude, :latitude), {EARTH_RADIUS_KM * 1000}))"
+
+def _box_wkt(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> str:
+    return (
+        f"POLYGON(({min_lon} {min_lat}, {max_lon} {min_lat}, {max_lon} {max_lat}, "
+        f"{min_lon} {max_lat}, {min_lon} {min_lat}))"
+    )
+
+def bounding_boxes(min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[str]:
+    """
+    Get WKT rectangles covering a latitude/longitude range.
+    A range crossing the antimeridian (min_lon > max_lon) is split in two rectangles.
+    """
+    if min_lon <= max_lon:
+        return [_box_wkt(min_lon, min_lat, max_lon, max_lat)]
+    return [_box_wkt(min_lon, min_lat, 180, max_lat), _box_wkt(-180, min_lat, max_lon, max_lat)]
+
+def radius_range(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Get the latitude/longitude range enclosing a circle on the sphere.
+
+    Returns:
+        tuple: min_lat, max_lat, min_lon, max_lon (min_lon > max_lon across the antimeridian)
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+    angle = radius_km / EARTH_RADIUS_KM
+    if min_lat <= -90 or max_lat >= 90 or math.sin(angle) >= math.cos(math.radians(latitude)):
+        # The circle contains a pole: every longitude is in range
+        return max(min_lat, -90), min(max_lat, 90), -180, 180
+
+    # Widest longitude of a spherical cap
+    delta_lon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    if delta_lon >= 180:
+        return min_lat, max_lat, -180, 180
+    min_lon = (longitude - delta_lon + 180) % 360 - 180
+    max_lon = (longitude + delta_lon + 180) % 360 - 180
+    return min_lat, max_lat, min_lon, max_lon
+
+def _parse_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        first, second = cursor.split(":", 1)
+        return int(first), int(second)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+class NearbyUserService:
+    """
+    List and count users by location, with the SPATIAL index of user_locations.
+    The index narrows rows to bounding rectangles; radius searches then filter by
+    great-circle distance. Pages are keyset-paginated with an opaque cursor.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _area_filter(self, boxes: List[str]) -> Tuple[str, Dict[str, Any]]:
+        conditions = [f"MBRCovers(ST_GeomFromText(:box{i}), ul.location)" for i in range(len(boxes))]
+        return " OR ".join(conditions), {f"box{i}": box for i, box in enumerate(boxes)}
+
+    def get_user_location(self, user_id: int) -> Optional[Tuple[float, float]]:
+        """Get the (latitude, longitude) of a user's city, if known."""
+        row = self.db.execute(
+            text("SELECT ST_Y(location), ST_X(location) FROM user_locations WHERE user_id = :user_id"),
+            {"user_id": user_id}
+        ).first()
+        return (row[0], row[1]) if row else None
+
+    def search_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        exclude_user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        List active users within a radius, nearest first.
+
+        Args:
+            latitude (float): Latitude of the center
+            longitude (float): Longitude of the center
+            radius_km (float): Radius in km
+            limit (int): Page size
+            cursor (str, optional): next_cursor of the previous page
+            exclude_user_id (int, optional): User left out of the results (the caller)
+
+        Returns:
+            dict: Users of the page (with distance_km) and the cursor of the next page, if any
+        """
+        area, params = self._area_filter(bounding_boxes(*radius_range(latitude, longitude, radius_km)))
+        params.update(latitude=latitude, longitude=longitude, radius_m=radius_km * 1000, limit=limit + 1)
+        sql = NEARBY_COLUMNS.format(distance=f", {DISTANCE_SQL} AS distance_m", area=area)
+        sql += f" AND {DISTANCE_SQL} <= :radius_m"
+        if exclude_user_id is not None:
+            sql += " AND ul.user_id <> :exclude_user_id"
+            params["exclude_user_id"] = exclude_user_id
+        if cursor:
+            params["cursor_distance"], params["cursor_user_id"] = _parse_cursor(cursor)
+            sql += (
+                f" AND ({DISTANCE_SQL} > :cursor_distance"
+                f" OR ({DISTANCE_SQL} = :cursor_distance AND ul.user_id > :cursor_user_id))"
+            )
+        sql += " ORDER BY distance_m, ul.user_id LIMIT :limit"
+
+        rows = self.db.execute(text(sql), params).mappings().all()
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = f"{int(page[-1]['distance_m'])}:{page[-1]['user_id']}"
+        return {
+            "data": [self._user(row, distance_m=row["distance_m"]) for row in page],
+            "next_cursor": next_cursor
+        }
+
+    def search_box(
+        self,
+        min_lat: float,
+        max_lat: float,
+        min_lon: float,
+        max_lon: float,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List active users within a latitude/longitude range, by user ID.
+
+        Args:
+            min_lat (float): South edge
+            max_lat (float): North edge
+            min_lon (float): West edge (greater than max_lon across the antimeridian)
+            max_lon (float): East edge
+            limit (int): Page size
+            cursor (str, optional): next_cursor of the previous page
+
+        Returns:
+            dict: Users of the page and the cursor of the next page, if any
+        """
+        area, params = self._area_filter(bounding_boxes(min_lat, max_lat, min_lon, max_lon))
+        params["limit"] = limit + 1
+        sql = NEARBY_COLUMNS.format(distance="", area=area)
+        if cursor:
+            _, params["cursor_user_id"] = _parse_cursor(cursor)
+            sql += " AND ul.user_id > :cursor_user_id"
+        sql += " ORDER BY ul.user_id LIMIT :limit"
+
+        rows = self.db.execute(text(sql), params).mappings().all()
+        page = rows[:limit]
+        next_cursor = f"0:{page[-1]['user_id']}" if len(rows) > limit else None
+        return {"data": [self._user(row) for row in page], "next_cursor": next_cursor}
+
+    def count_radius(self, latitude: float, longitude: float, radius_km: float) -> int:
+        """Count active users within a radius."""
+        area, params = self._area_filter(bounding_boxes(*radius_range(latitude, longitude, radius_km)))
+        params.update(latitude=latitude, longitude=longitude, radius_m=radius_km * 1000)
+        sql = COUNT_COLUMNS.format(area=area) + f" AND {DISTANCE_SQL} <= :radius_m"
+        return int(self.db.execute(text(sql), params).scalar())
+
+    def count_box(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> int:
+        """Count active users within a latitude/longitude range."""
+        area, params = self._area_filter(bounding_boxes(min_lat, max_lat, min_lon, max_lon))
+        return int(self.db.execute(text(COUNT_COLUMNS.format(area=area)), params).scalar())
+
+    @staticmethod
+    def _user(row, distance_m: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "id": row["user_id"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "city_id": row["city_id"],
+            "city_name": row["city_name"],
+            "country_id": row["country_id"],
+            "distance_km": round(distance_m / 1000, 3) if distance_m is not None else None
+        }
@@ -1,10 +1,11 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from models.user import User
-from models.password_reset import PasswordReset
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
-import secrets
+from datetime import timedelta
+from core.token_store import get_token_store, PASSWORD_RESET
+from core.outbox import enqueue_task
+from core.metrics import incr_metric
+from core.unique_task import claim_once, METRIC_NAME as UNIQUE_TASK_METRIC_NAME
 from tasks.password_reset_tasks import send_password_reset_notification
 from core.config import settings
 from passlib.context import CryptContext
@@ -17,33 +18,6 @@ class PasswordResetService:
     def __init__(self, db: Session):
         self.db = db
 
-    def cleanup_expired_tokens(self) -> int:
-        """
-        Clean up expired password reset tokens.
-        
-        Returns:
-            int: Number of tokens cleaned up
-        """
-        try:
-            # Find expired tokens that are still marked as valid
-            expired_tokens = self.db.query(PasswordReset).filter(
-                and_(
-                    PasswordReset.expires_at <= datetime.utcnow(),
-                    PasswordReset.is_used == False
-                )
-            ).all()
-            
-            # Mark tokens as used
-            for token in expired_tokens:
-                token.is_used = True
-            
-            self.db.commit()
-            return len(expired_tokens)
-            
-        except Exception as e:
-            self.db.rollback()
-            raise e
-
     def create_password_reset(self, email: str) -> dict:
         """
         Create a password reset token for a user.
@@ -65,28 +39,25 @@ class PasswordResetService:
                     detail="User not found"
                 )
 
-            # Invalidate any existing reset tokens
-            existing_tokens = self.db.query(PasswordReset).filter(
-                PasswordReset.user_id == user.id
-            ).all()
-            for token in existing_tokens:
-                token.is_used = True
-
-            # Generate a secure token
-            token = secrets.token_urlsafe(32)
-
-            # Create new reset token
-            reset_token = PasswordReset(
-                user_id=user.id,
-                token=token,
-                expires_at=datetime.utcnow() + timedelta(hours=24),
-                is_used=False
+            # A repeated request would invalidate the token just emailed and send another one
+            if not claim_once(f"password_reset_request:{user.id}", settings.PASSWORD_RESET_REQUEST_INTERVAL_SECONDS):
+                incr_metric(UNIQUE_TASK_METRIC_NAME, f"{send_password_reset_notification.name}:suppressed")
+                logger.info(f"Password reset already requested recently by user: {user.email}")
+                return {
+                    "message": "Password reset email sent",
+                    "status": "success"
+                }
+
+            # Issue a new token; the user's previous reset tokens are invalidated
+            token = get_token_store(self.db).issue(
+                user.id,
+                PASSWORD_RESET,
+                timedelta(hours=settings.ONE_TIME_TOKEN_EXPIRY_HOURS)
             )
-            self.db.add(reset_token)
-            self.db.commit()
 
-            # Send password reset email using the dedicated task
-            send_password_reset_notification.delay(user.id, reset_token.token)
+            # Send password reset email using the dedicated task, once the token is committed
+            enqueue_task(self.db, send_password_reset_notification, user.id, token)
+            self.db.commit()
             logger.info(f"Password reset email sent to user: {user.email}")
 
             return {
@@ -117,22 +88,17 @@ class PasswordResetService:
             HTTPException: If token is invalid or expired
         """
         try:
-            # Find valid password reset record
-            reset_record = self.db.query(PasswordReset).filter(
-                and_(
-                    PasswordReset.token == token,
-                    PasswordReset.is_used == False,
-                    PasswordReset.expires_at > datetime.utcnow()
-                )
-            ).first()
+            # Look the token up without using it up
+            user_id = get_token_store(self.db).peek(token, PASSWORD_RESET)
+            user = self.db.query(User).filter(User.id == user_id).first() if user_id else None
             
-            if not reset_record:
+            if not user:
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid or expired password reset token"
                 )
             
-            return reset_record.user
+            return user
             
         except HTTPException:
             raise
@@ -154,23 +120,16 @@ class PasswordResetService:
             HTTPException: If token is invalid or other errors occur
         """
         try:
-            # Find valid reset token
-            reset_token = self.db.query(PasswordReset).filter(
-                and_(
-                    PasswordReset.token == token,
-                    PasswordReset.expires_at > datetime.utcnow(),
-                    PasswordReset.is_used == False
-                )
-            ).first()
-
-            if not reset_token:
+            # Use up the token; it stays locked until the new password is committed
+            user_id = get_token_store(self.db).consume(token, PASSWORD_RESET)
+            if not user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid or expired token"
                 )
 
             # Get user and update password
-            user = self.db.query(User).filter(User.id == reset_token.user_id).first()
+            user = self.db.query(User).filter(User.id == user_id).first()
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -179,14 +138,15 @@ class PasswordResetService:
 
             # Update password
             user.set_password(new_password)
-            reset_token.is_used = True
-            self.db.commit()
 
-            # Send confirmation email using the dedicated task
-            send_password_reset_notification.delay(
+            # Send confirmation email using the dedicated task, once the new password is committed
+            enqueue_task(
+                self.db,
+                send_password_reset_notification,
                 user.id,
                 "Password Reset Successful"
             )
+            self.db.commit()
             logger.info(f"Password reset successful for user: {user.email}")
 
             return {
@@ -15,6 +15,9 @@ from core.logger import logger
 from services.country.country_service import CountryService
 from core.config import settings
 from services.city.city_service import CityService
+from services.user.user_location_service import UserLocationService
+from services.user.user_rollup_service import UserRollupService, placement
+from core.outbox import enqueue_task
 from models.country import Country
 from models.city import City
 
@@ -100,6 +103,9 @@ class RegisterService:
             # Add user to database
             self.db.add(new_user)
             self.db.flush()  # Flush to get the user ID
+            if new_user.city_id:
+                UserLocationService(self.db).sync(user_ids=[new_user.id])
+            UserRollupService(self.db).apply([(None, placement(new_user))])
             
             # Create JWT tokens
             tokens = JWTManager.create_tokens_response(
@@ -123,14 +129,16 @@ class RegisterService:
             )
             
             self.db.add(new_session)
-            self.db.commit()
-            
-            # Send welcome email asynchronously
-            send_email.delay(
+
+            # Send welcome email asynchronously, once the registration commits
+            enqueue_task(
+                self.db,
+                send_email,
                 to_email=new_user.email,
                 subject="Welcome to Our Platform!",
                 body=f"Welcome {new_user.first_name}! Thank you for registering."
             )
+            self.db.commit()
             
             return {
                 "message": "Registration successful",
@@ -0,0 +1,120 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+from core.config import settings
+from core.logger import logger
+from core.metrics import incr_metric
+from typing import Dict, List, Optional
+import math
+import re
+
+METRIC_NAME = "session_partitions"
+
+# Monthly partitions of sessions by expires_at: pYYYYMM holds the sessions expiring in that month.
+# pmax catches anything beyond the last month and is kept empty by adding months ahead of time.
+PARTITION_NAME = re.compile(r"^p(\d{4})(\d{2})$")
+MAX_PARTITION = "pmax"
+
+PARTITIONS_SQL = """
+SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sessions'
+ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+def month_start(year: int, month: int) -> datetime:
+    """Get the first instant of a month, months past December rolling over to the next years."""
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return datetime(year, month, 1)
+
+def partition_name(start: datetime) -> str:
+    return f"p{start.year:04d}{start.month:02d}"
+
+def partition_definition(start: datetime) -> str:
+    """Get the definition of the partition of the month starting at start."""
+    end = month_start(start.year, start.month + 1)
+    return f"PARTITION {partition_name(start)} VALUES LESS THAN ('{end:%Y-%m-%d %H:%M:%S}')"
+
+class SessionPartitionService:
+    """
+    Maintain the monthly partitions of the sessions table: months are added ahead of the
+    longest session lifetime, and months whose sessions have all expired are dropped whole,
+    which is a metadata operation instead of a row-by-row delete.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_partitions(self) -> List[str]:
+        """Get the partition names of sessions, oldest first; empty if the table is not partitioned."""
+        names = self.db.execute(text(PARTITIONS_SQL)).scalars().all()
+        return [name for name in names if name is not None]
+
+    def months_ahead(self) -> int:
+        """Get how many months past the current one must have partitions."""
+        # Logins use SESSION_EXPIRY_DAYS, refreshes REFRESH_TOKEN_EXPIRE_DAYS
+        lifetime_days = max(settings.SESSION_EXPIRY_DAYS, settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        lifetime_months = math.ceil(lifetime_days / 28)
+        return max(settings.SESSION_PARTITION_MONTHS_AHEAD, lifetime_months)
+
+    def add_future_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Split the months up to months_ahead() out of pmax.
+
+        Returns:
+            list: Names of the partitions added
+        """
+        now = now or datetime.utcnow()
+        existing = set(self.get_partitions())
+        starts = [month_start(now.year, now.month + offset) for offset in range(self.months_ahead() + 1)]
+        missing = [start for start in starts if partition_name(start) not in existing]
+        if existing and MAX_PARTITION not in existing:
+            raise RuntimeError("sessions has no pmax partition to split new months from")
+
+        months = [month for month in (PARTITION_NAME.match(name) for name in existing) if month]
+        last = max((datetime(int(m.group(1)), int(m.group(2)), 1) for m in months), default=None)
+        # Months can only be appended after the last one; earlier gaps were never needed
+        missing = [start for start in missing if last is None or start > last]
+        if not missing:
+            return []
+
+        definitions = ", ".join(partition_definition(start) for start in missing)
+        self.db.execute(text(
+            f"ALTER TABLE sessions REORGANIZE PARTITION {MAX_PARTITION} INTO "
+            f"({definitions}, PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        ))
+        added = [partition_name(start) for start in missing]
+        incr_metric(METRIC_NAME, "added", len(added))
+        logger.info(f"Added session partitions {', '.join(added)}")
+        return added
+
+    def drop_expired_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Drop the partitions of months that have ended: all their sessions have expired.
+        Always keeps at least one dated partition next to pmax.
+
+        Returns:
+            list: Names of the partitions dropped
+        """
+        now = now or datetime.utcnow()
+        dated = [name for name in self.get_partitions() if PARTITION_NAME.match(name)]
+        expired = []
+        for name in dated[:-1]:
+            match = PARTITION_NAME.match(name)
+            if month_start(int(match.group(1)), int(match.group(2)) + 1) <= now:
+                expired.append(name)
+        if not expired:
+            return []
+
+        self.db.execute(text(f"ALTER TABLE sessions DROP PARTITION {', '.join(expired)}"))
+        incr_metric(METRIC_NAME, "dropped", len(expired))
+        logger.info(f"Dropped expired session partitions {', '.join(expired)}")
+        return expired
+
+    def maintain(self) -> Dict[str, List[str]]:
+        """
+        Add the coming months and drop the expired ones.
+
+        Returns:
+            dict: Partitions added and dropped
+        """
+        return {"added": self.add_future_partitions(), "dropped": self.drop_expired_partitions()}
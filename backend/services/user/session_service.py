@@ -1,7 +1,18 @@
 from sqlalchemy.orm import Session
 from models.session import Session as SessionModel
-from sqlalchemy import and_
+from sqlalchemy import and_, text, bindparam
 from datetime import datetime
+from core.config import settings
+from core.logger import logger
+from core.metrics import incr_metric
+
+# Active sessions of a user beyond the :keep most recently active ones (index on user_id, last_activity)
+SESSIONS_OVER_CAP_SQL = """
+SELECT id FROM sessions
+WHERE user_id = :user_id AND is_active = 1 AND expires_at > :now
+ORDER BY last_activity DESC, id DESC
+LIMIT 18446744073709551615 OFFSET :keep
+"""
 
 class SessionService:
     def __init__(self, db: Session):
@@ -42,4 +53,37 @@ class SessionService:
             
         except Exception as e:
             self.db.rollback()
-            raise e 
\ No newline at end of file
+            raise e
+
+    def make_room_for_session(self, user_id: int) -> int:
+        """
+        Evict the least recently active sessions of a user so that one more session fits
+        under MAX_ACTIVE_SESSIONS_PER_USER. Call right before adding the new session:
+        the user row is locked until the caller commits, so concurrent logins of the same
+        user cannot both pass the cap.
+
+        Args:
+            user_id (int): ID of the user about to get a new session
+
+        Returns:
+            int: Number of sessions evicted
+        """
+        cap = settings.MAX_ACTIVE_SESSIONS_PER_USER
+        if cap <= 0:
+            return 0
+
+        self.db.execute(text("SELECT id FROM users WHERE id = :user_id FOR UPDATE"), {"user_id": user_id})
+        evicted_ids = self.db.execute(
+            text(SESSIONS_OVER_CAP_SQL),
+            {"user_id": user_id, "now": datetime.utcnow(), "keep": cap - 1}
+        ).scalars().all()
+        if not evicted_ids:
+            return 0
+
+        self.db.execute(
+            text("DELETE FROM sessions WHERE user_id = :user_id AND id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"user_id": user_id, "ids": evicted_ids}
+        )
+        incr_metric("sessions", "evicted", len(evicted_ids))
+        logger.info(f"Evicted {len(evicted_ids)} least recently active sessions of user {user_id}")
+        return len(evicted_ids)
@@ -0,0 +1,281 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, insert, bindparam
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from concurrent.futures import ProcessPoolExecutor
+from models.user import User
+from core.roles import UserRole
+from core.config import settings
+from core.security import get_password_hash
+from core.logger import logger
+from schemas.user import RegisterRequest
+from services.user.user_location_service import UserLocationService
+from services.user.user_rollup_service import UserRollupService
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import csv
+import io
+import json
+import multiprocessing
+import os
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Below this many passwords, starting worker processes costs more than it saves
+MIN_PARALLEL_HASHES = 16
+
+def parse_rows(content: bytes, file_format: str) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Parse a CSV (with a header row) or NDJSON file of users.
+
+    Args:
+        content (bytes): UTF-8 file content
+        file_format (str): 'csv' or 'ndjson'
+
+    Returns:
+        tuple: (row number, fields) of each parsed record, and errors of records that could not be parsed
+    """
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{file_format}'"
+        )
+    try:
+        lines = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is not valid UTF-8"
+        )
+
+    rows, errors = [], []
+    if file_format == "csv":
+        for number, record in enumerate(csv.DictReader(io.StringIO(lines)), start=1):
+            # Empty cells are missing fields; cells beyond the header are dropped
+            rows.append((number, {key: value for key, value in record.items() if key and value not in ("", None)}))
+        return rows, errors
+
+    number = 0
+    for line in lines.splitlines():
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            errors.append({"row": number, "email": None, "error": f"Invalid JSON: {str(e)}"})
+            continue
+        if not isinstance(record, dict):
+            errors.append({"row": number, "email": None, "error": "Record is not a JSON object"})
+            continue
+        rows.append((number, record))
+    return rows, errors
+
+def create_hash_pool(workers: int, passwords: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Create the process pool hashing the passwords of an import, reused for all its batches.
+
+    Args:
+        workers (int): Number of processes
+        passwords (int): Number of passwords to hash
+
+    Returns:
+        ProcessPoolExecutor: Pool to shut down after the import, or None to hash in this process
+    """
+    if workers == 1 or passwords < MIN_PARALLEL_HASHES:
+        return None
+    # Spawned, not forked: the API process is multi-threaded, and a forked child could
+    # inherit a lock held by another thread (logging, connection pools) and hang
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def hash_passwords(passwords: List[str], pool: Optional[ProcessPoolExecutor] = None, workers: int = 1) -> List[str]:
+    """
+    Hash passwords with bcrypt, across a process pool if one is given.
+
+    Args:
+        passwords (List[str]): Plain text passwords
+        pool (ProcessPoolExecutor, optional): Pool from create_hash_pool
+        workers (int): Number of processes of the pool, to size the chunks
+
+    Returns:
+        list: Hashes, in the order of the passwords
+    """
+    if pool is None:
+        return [get_password_hash(password) for password in passwords]
+    return list(pool.map(get_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+class UserImportService:
+    """
+    Create many user accounts at once from a CSV or NDJSON file.
+    Rows are validated like registrations, against in-memory country and city maps;
+    invalid rows are reported and skipped without affecting the others. Imported users
+    get no session, tokens or welcome email: they sign in or reset their password themselves.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_users(
+        self,
+        content: bytes,
+        file_format: str,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Import users from a file.
+
+        Args:
+            content (bytes): File content
+            file_format (str): 'csv' or 'ndjson'
+            batch_size (int, optional): Users per multi-row INSERT
+            workers (int, optional): Processes hashing passwords
+
+        Returns:
+            dict: total_rows, imported and failed counts, and the error of each failed row
+        """
+        rows, errors = parse_rows(content, file_format)
+        total_rows = len(rows) + len(errors)
+        if total_rows > settings.USER_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.USER_IMPORT_MAX_ROWS} rows can be imported at once"
+            )
+
+        valid = self._validate(rows, errors)
+        batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        workers = workers or settings.USER_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+        pool = create_hash_pool(workers, len(valid))
+        try:
+            imported = self._import_batches(valid, batch_size, pool, workers, errors)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        errors.sort(key=lambda error: error["row"])
+        return {
+            "total_rows": total_rows,
+            "imported": imported,
+            "failed": total_rows - imported,
+            "errors": errors
+        }
+
+    def _import_batches(
+        self,
+        valid: List[Tuple[int, RegisterRequest]],
+        batch_size: int,
+        pool: Optional[ProcessPoolExecutor],
+        workers: int,
+        errors: List[Dict[str, Any]]
+    ) -> int:
+        """Hash and insert the valid users batch by batch. Returns the number of users inserted."""
+        imported = 0
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            hashes = hash_passwords([data.password for _, data in batch], pool, workers)
+            users = [
+                {
+                    "email": data.email,
+                    "first_name": data.first_name,
+                    "last_name": data.last_name,
+                    "role": UserRole.USER.value,
+                    "password": password,
+                    "language": data.language or 'en',
+                    "country_id": data.country_id,
+                    "city_id": data.city_id,
+                    "subscription": 'FREE'
+                }
+                for (_, data), password in zip(batch, hashes)
+            ]
+            imported += self._insert_batch([number for number, _ in batch], users, errors)
+            logger.info(f"Imported {imported} of {len(valid)} valid users")
+        return imported
+
+    def _validate(self, rows: Iterable[Tuple[int, Dict[str, Any]]], errors: List[Dict[str, Any]]) -> List[Tuple[int, RegisterRequest]]:
+        """Validate rows, appending an error for each invalid row and returning the valid ones."""
+        countries = {row.id for row in self.db.execute(text("SELECT id FROM countries"))}
+        city_countries = dict(self.db.execute(text("SELECT id, country_id FROM cities")).all())
+
+        valid, emails = [], {}
+        for number, record in rows:
+            try:
+                data = RegisterRequest(**record)
+            except ValidationError as e:
+                first = e.errors()[0]
+                field = ".".join(str(part) for part in first["loc"])
+                email = record.get("email")
+                errors.append({"row": number, "email": email if isinstance(email, str) else None, "error": f"{field}: {first['msg']}"})
+                continue
+
+            error = None
+            if data.city_id is not None:
+                if data.city_id not in city_countries:
+                    error = f"City with ID {data.city_id} not found"
+                elif data.country_id is None:
+                    data.country_id = city_countries[data.city_id]
+                elif city_countries[data.city_id] != data.country_id:
+                    error = f"City with ID {data.city_id} not found in country {data.country_id}"
+            if error is None and data.country_id is not None and data.country_id not in countries:
+                error = f"Country with ID {data.country_id} not found"
+            key = data.email.lower()
+            if error is None and key in emails:
+                error = f"Duplicate of row {emails[key]}"
+            if error:
+                errors.append({"row": number, "email": data.email, "error": error})
+                continue
+            emails[key] = number
+            valid.append((number, data))
+
+        # Emails already registered, checked in chunks
+        existing = set()
+        email_list = list(emails)
+        query = text("SELECT email FROM users WHERE email IN :emails").bindparams(bindparam("emails", expanding=True))
+        for start in range(0, len(email_list), settings.USER_IMPORT_BATCH_SIZE):
+            chunk = email_list[start:start + settings.USER_IMPORT_BATCH_SIZE]
+            existing.update(email.lower() for (email,) in self.db.execute(query, {"emails": chunk}))
+        if not existing:
+            return valid
+
+        accepted = []
+        for number, data in valid:
+            if data.email.lower() in existing:
+                errors.append({"row": number, "email": data.email, "error": "Email already registered"})
+            else:
+                accepted.append((number, data))
+        return accepted
+
+    def _insert_batch(self, numbers: List[int], users: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> int:
+        """
+        Insert a batch of users with one multi-row INSERT, falling back to one INSERT per user
+        when the batch is rejected (e.g. an email registered meanwhile), so that only the
+        offending rows fail. Users are located and counted in the rollups in the transaction
+        that inserts them. Returns the number of users inserted.
+        """
+        try:
+            self.db.execute(insert(User.__table__), users)
+            self._after_insert(users)
+            self.db.commit()
+            return len(users)
+        except IntegrityError:
+            self.db.rollback()
+
+        inserted = 0
+        for number, user in zip(numbers, users):
+            try:
+                self.db.execute(insert(User.__table__), [user])
+                self._after_insert([user])
+                self.db.commit()
+                inserted += 1
+            except IntegrityError as e:
+                self.db.rollback()
+                errors.append({"row": number, "email": user["email"], "error": f"Rejected by the database: {e.orig}"})
+        return inserted
+
+    def _after_insert(self, users: List[Dict[str, Any]]) -> None:
+        """Locate the new users and count them in the rollups."""
+        query = text("SELECT id, country_id, city_id FROM users WHERE email IN :emails").bindparams(
+            bindparam("emails", expanding=True)
+        )
+        created = self.db.execute(query, {"emails": [user["email"] for user in users]}).all()
+        UserLocationService(self.db).sync(user_ids=[row.id for row in created if row.city_id])
+        UserRollupService(self.db).apply((None, (row.country_id, row.city_id)) for row in created)
@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, bindparam
+from core.logger import logger
+from typing import Iterable, Optional
+
+# Set-based maintenance of user_locations from users and cities; shared with the LOAD DATA loader.
+# Each statement can be narrowed by appending a filter on the users (u) rows.
+DELETE_USER_LOCATIONS_SQL = """
+DELETE ul FROM user_locations ul
+JOIN users u ON u.id = ul.user_id
+LEFT JOIN cities c ON c.id = u.city_id
+WHERE (c.id IS NULL OR c.latitude IS NULL OR c.longitude IS NULL)
+"""
+UPDATE_USER_LOCATIONS_SQL = """
+UPDATE user_locations ul
+JOIN users u ON u.id = ul.user_id
+JOIN cities c ON c.id = u.city_id
+SET ul.city_id = c.id, ul.country_id = c.country_id, ul.location = POINT(c.longitude, c.latitude), ul.updated_at = UTC_TIMESTAMP()
+WHERE c.latitude IS NOT NULL AND c.longitude IS NOT NULL
+AND (ul.city_id <> c.id OR ul.country_id <> c.country_id OR NOT ST_Equals(ul.location, POINT(c.longitude, c.latitude)))
+"""
+INSERT_USER_LOCATIONS_SQL = """
+INSERT INTO user_locations (user_id, city_id, country_id, location, updated_at)
+SELECT u.id, c.id, c.country_id, POINT(c.longitude, c.latitude), UTC_TIMESTAMP()
+FROM users u
+JOIN cities c ON c.id = u.city_id
+WHERE c.latitude IS NOT NULL AND c.longitude IS NOT NULL
+AND NOT EXISTS (SELECT 1 FROM user_locations ul WHERE ul.user_id = u.id)
+"""
+SYNC_USER_LOCATIONS_SQL = (DELETE_USER_LOCATIONS_SQL, UPDATE_USER_LOCATIONS_SQL, INSERT_USER_LOCATIONS_SQL)
+
+class UserLocationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sync(self, user_ids: Optional[Iterable[int]] = None, city_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Bring user_locations in line with the users' cities, for all users or only
+        the given users or the users of the given cities. Locations are those of the
+        cities (users are never located more precisely than their city).
+        Changes become visible when the caller's transaction commits.
+
+        Args:
+            user_ids (Iterable[int], optional): Users whose city changed
+            city_ids (Iterable[int], optional): Cities whose coordinates or country changed
+        """
+        if user_ids is None and city_ids is None:
+            for statement in SYNC_USER_LOCATIONS_SQL:
+                self.db.execute(text(statement))
+            logger.info("Synced locations of all users")
+            return
+
+        column, ids = ("u.id", user_ids) if user_ids is not None else ("u.city_id", city_ids)
+        ids = sorted({value for value in ids if value is not None})
+        if not ids:
+            return
+        for statement in SYNC_USER_LOCATIONS_SQL:
+            query = text(statement + f" AND {column} IN :ids").bindparams(bindparam("ids", expanding=True))
+            self.db.execute(query, {"ids": ids})
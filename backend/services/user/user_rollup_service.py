@@ -0,0 +1,171 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, bindparam
+from collections import Counter
+from models.city import City
+from models.user_rollup import LEVEL_COUNTRY, LEVEL_STATE, LEVEL_CITY
+from core.logger import logger
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# What the rollups count a user by: (country_id, city_id) while active, None otherwise
+Placement = Optional[Tuple[Optional[int], Optional[int]]]
+
+# Set-based rebuild of user_rollups from users and cities, one statement per level.
+# Users with a city are placed in the city's country; users without one only count for their country.
+DELETE_USER_ROLLUPS_SQL = "DELETE FROM user_rollups"
+INSERT_USER_ROLLUPS_SQL = (
+    """
+    INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+    SELECT 0, COALESCE(c.country_id, u.country_id), 0, 0, COUNT(*), UTC_TIMESTAMP()
+    FROM users u LEFT JOIN cities c ON c.id = u.city_id
+    WHERE u.is_active = 1 AND COALESCE(c.country_id, u.country_id) IS NOT NULL
+    GROUP BY COALESCE(c.country_id, u.country_id)
+    """,
+    """
+    INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+    SELECT 1, c.country_id, c.state_id, 0, COUNT(*), UTC_TIMESTAMP()
+    FROM users u JOIN cities c ON c.id = u.city_id
+    WHERE u.is_active = 1
+    GROUP BY c.country_id, c.state_id
+    """,
+    """
+    INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+    SELECT 2, c.country_id, c.state_id, c.id, COUNT(*), UTC_TIMESTAMP()
+    FROM users u JOIN cities c ON c.id = u.city_id
+    WHERE u.is_active = 1
+    GROUP BY c.country_id, c.state_id, c.id
+    """
+)
+
+# Rows are locked in primary key order, so concurrent deltas cannot deadlock
+APPLY_DELTAS_SQL = """
+INSERT INTO user_rollups (level, country_id, state_id, city_id, user_count, updated_at)
+VALUES (:level, :country_id, :state_id, :city_id, :delta, UTC_TIMESTAMP())
+ON DUPLICATE KEY UPDATE user_count = user_count + VALUES(user_count), updated_at = VALUES(updated_at)
+"""
+
+DISTRIBUTION_SQL = """
+SELECT r.level, r.country_id, r.state_id, r.city_id, r.user_count,
+       CASE r.level WHEN 0 THEN co.name WHEN 1 THEN s.state_name ELSE ci.name END AS name
+FROM user_rollups r
+LEFT JOIN countries co ON r.level = 0 AND co.id = r.country_id
+LEFT JOIN states s ON r.level = 1 AND s.country_id = r.country_id AND s.state_id = r.state_id
+LEFT JOIN cities ci ON r.level = 2 AND ci.id = r.city_id
+WHERE r.level IN :levels AND r.user_count > 0
+"""
+
+def placement(user) -> Placement:
+    """Get what the rollups count a user by."""
+    if not user.is_active:
+        return None
+    return (user.country_id, user.city_id)
+
+class UserRollupService:
+    """
+    Maintain and read the user counts per country, state and city (user_rollups).
+    Writers pass each user's placement before and after their change; the counts move
+    in the writer's transaction. A nightly rebuild corrects any drift, such as cities
+    moving to another state or country.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, changes: Iterable[Tuple[Placement, Placement]]) -> None:
+        """
+        Move users between rollup rows. Changes become visible when the caller's transaction commits.
+
+        Args:
+            changes (Iterable[tuple]): (before, after) placement of each changed user;
+                None before for a new user, None after for a deactivated one
+        """
+        changes = [(before, after) for before, after in changes if before != after]
+        if not changes:
+            return
+
+        city_ids = {place[1] for change in changes for place in change if place and place[1]}
+        cities = {}
+        if city_ids:
+            rows = self.db.query(City.id, City.country_id, City.state_id).filter(City.id.in_(city_ids)).all()
+            cities = {row.id: (row.country_id, row.state_id) for row in rows}
+
+        deltas = Counter()
+        for before, after in changes:
+            for key in self._keys(before, cities):
+                deltas[key] -= 1
+            for key in self._keys(after, cities):
+                deltas[key] += 1
+
+        rows = [
+            {"level": level, "country_id": country_id, "state_id": state_id, "city_id": city_id, "delta": delta}
+            for (level, country_id, state_id, city_id), delta in sorted(deltas.items())
+            if delta
+        ]
+        if rows:
+            self.db.execute(text(APPLY_DELTAS_SQL), rows)
+
+    @staticmethod
+    def _keys(place: Placement, cities: Dict[int, Tuple[int, int]]) -> List[Tuple[int, int, int, int]]:
+        if place is None:
+            return []
+        country_id, city_id = place
+        city = cities.get(city_id)
+        if city is None:
+            return [(LEVEL_COUNTRY, country_id, 0, 0)] if country_id else []
+        city_country_id, state_id = city
+        return [
+            (LEVEL_COUNTRY, city_country_id, 0, 0),
+            (LEVEL_STATE, city_country_id, state_id, 0),
+            (LEVEL_CITY, city_country_id, state_id, city_id)
+        ]
+
+    def rebuild(self) -> None:
+        """
+        Rebuild user_rollups from users and cities.
+        Readers keep seeing the previous rows until the caller's transaction commits.
+        """
+        self.db.execute(text(DELETE_USER_ROLLUPS_SQL))
+        for statement in INSERT_USER_ROLLUPS_SQL:
+            self.db.execute(text(statement))
+        logger.info("Rebuilt user rollups")
+
+    def get_distribution(self, depth: int = LEVEL_STATE, country_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the user counts as a country > state > city hierarchy, largest first.
+        A country's count includes its users without a city, so it can exceed the sum of its states.
+
+        Args:
+            depth (int): Deepest level to include (LEVEL_COUNTRY, LEVEL_STATE or LEVEL_CITY)
+            country_id (int, optional): Only this country
+
+        Returns:
+            dict: Countries with nested states and cities (data) and the number of counted users (total)
+        """
+        sql = DISTRIBUTION_SQL
+        params = {"levels": list(range(depth + 1))}
+        if country_id is not None:
+            sql += " AND r.country_id = :country_id"
+            params["country_id"] = country_id
+        query = text(sql).bindparams(bindparam("levels", expanding=True))
+        rows = self.db.execute(query, params).mappings().all()
+
+        countries, states = {}, {}
+        for row in sorted(rows, key=lambda row: (row["level"], -row["user_count"], row["name"] or "")):
+            node = {"name": row["name"], "user_count": row["user_count"]}
+            if row["level"] == LEVEL_COUNTRY:
+                countries[row["country_id"]] = {"id": row["country_id"], **node}
+                if depth > LEVEL_COUNTRY:
+                    countries[row["country_id"]]["states"] = []
+            elif row["level"] == LEVEL_STATE:
+                state = {"id": row["state_id"], **node}
+                if depth > LEVEL_STATE:
+                    state["cities"] = []
+                states[(row["country_id"], row["state_id"])] = state
+                if row["country_id"] in countries:
+                    countries[row["country_id"]]["states"].append(state)
+            elif (row["country_id"], row["state_id"]) in states:
+                states[(row["country_id"], row["state_id"])]["cities"].append({"id": row["city_id"], **node})
+
+        return {
+            "data": list(countries.values()),
+            "total": sum(country["user_count"] for country in countries.values())
+        }
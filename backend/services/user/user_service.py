@@ -3,6 +3,7 @@ from fastapi import HTTPException, status
 from models.user import User
 from models.session import Session as SessionModel
 from sqlalchemy import and_
+from sqlalchemy.orm import lazyload
 from datetime import datetime, timedelta
 from core.jwt import JWTManager
 from core.logger import logger
@@ -15,6 +16,13 @@ from typing import Optional
 from tasks.email_tasks import send_password_change_notification
 from models.country import Country
 from models.city import City
+from services.catalog.geo_resolver import GeoResolver
+from services.city.reverse_geocoder import ReverseGeocoder
+from core.profile_cache import get_cached_profile, cache_profile, invalidate_profile
+from services.user.user_location_service import UserLocationService
+from services.user.user_rollup_service import UserRollupService, placement
+from core.token_store import get_token_store, EMAIL_VERIFICATION
+from core.outbox import enqueue_task
 
 class UserService:
     def __init__(self, db: Session):
@@ -23,6 +31,8 @@ class UserService:
     def get_current_user(self, access_token: str) -> User:
         """
         Get current user data from access token.
+        The profile is served from the Redis profile cache when possible; every
+        change to the user invalidates or rewrites the cached entry.
         
         Args:
             access_token (str): JWT access token
@@ -54,38 +64,28 @@ class UserService:
                     detail="Invalid or expired session"
                 )
 
-            # Get user data
-            user = self.db.query(User).filter(User.id == user_id).first()
+            # Update last activity, at most once per SESSION_ACTIVITY_RESOLUTION_SECONDS
+            now = datetime.utcnow()
+            if not session.last_activity or now - session.last_activity >= timedelta(seconds=settings.SESSION_ACTIVITY_RESOLUTION_SECONDS):
+                session.last_activity = now
+                self.db.commit()
+
+            response = get_cached_profile(user_id)
+            if response is not None:
+                return response
+
+            # Get user data, without the eagerly joined relationships the profile does not use
+            user = self.db.query(User).options(lazyload("*")).filter(User.id == user_id).first()
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="User not found"
                 )
 
-            # Update last activity
-            session.last_activity = datetime.utcnow()
-            self.db.commit()
-
-            country_name = None
-            country_code = None
-            city_name = None
-            
-            if user.country_id:
-                country = self.db.query(Country).filter(Country.id == user.country_id).first()
-                if country:
-                    country_name = country.name
-                    country_code = country.iso2
-            
-            if user.city_id:
-                city = self.db.query(City).filter(City.id == user.city_id).first()
-                if city:
-                    city_name = city.name
-            
             # Create response with country and city names
             response = UserResponse.from_orm(user)
-            response.country_name = country_name
-            response.country_code = country_code
-            response.city_name = city_name
+            GeoResolver(self.db).enrich_users([response])
+            cache_profile(response)
             
             return response
 
@@ -120,9 +120,27 @@ class UserService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="User not found"
                 )
+            placement_before = placement(user)
 
             # Update only the fields that are provided
             update_dict = update_data.dict(exclude_unset=True)
+
+            # Resolve GPS coordinates to the nearest city unless a city is given explicitly
+            latitude, longitude = update_dict.get('latitude'), update_dict.get('longitude')
+            if (latitude is None) != (longitude is None):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Latitude and longitude must be given together"
+                )
+            if latitude is not None and update_dict.get('city_id') is None:
+                located = ReverseGeocoder(self.db).reverse([(latitude, longitude)])[0]
+                if located["city"] is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="No city found near the given coordinates"
+                    )
+                update_dict['country_id'] = located["city"]["country_id"]
+                update_dict['city_id'] = located["city"]["id"]
             
             # Handle country_id if provided
             if 'country_id' in update_dict:
@@ -151,36 +169,24 @@ class UserService:
 
             # Update other fields
             for field, value in update_dict.items():
-                if field not in ['country_id', 'city_id']:
+                if field not in ['country_id', 'city_id', 'latitude', 'longitude']:
                     setattr(user, field, value)
 
             # Update the updated_at timestamp
             user.updated_at = datetime.utcnow()
+            if 'city_id' in update_dict:
+                # Flush so that the sync's SQL reads the new city (the session does not autoflush)
+                self.db.flush()
+                UserLocationService(self.db).sync(user_ids=[user.id])
+            UserRollupService(self.db).apply([(placement_before, placement(user))])
             
             self.db.commit()
             self.db.refresh(user)
             
-            # Get country and city names
-            country_name = None
-            country_code = None
-            city_name = None
-            
-            if user.country_id:
-                country = self.db.query(Country).filter(Country.id == user.country_id).first()
-                if country:
-                    country_name = country.name
-                    country_code = country.iso2
-            
-            if user.city_id:
-                city = self.db.query(City).filter(City.id == user.city_id).first()
-                if city:
-                    city_name = city.name
-            
             # Create response with country and city names
             response = UserResponse.from_orm(user)
-            response.country_name = country_name
-            response.country_code = country_code
-            response.city_name = city_name
+            GeoResolver(self.db).enrich_users([response])
+            cache_profile(response)
             
             logger.info(f"User profile updated successfully for user: {user.email}")
             return response
@@ -216,13 +222,12 @@ class UserService:
                     detail="User not found"
                 )
 
-            # Generate a secure random token
-            token = secrets.token_urlsafe(32)
-            
-            # Store the token in the user's verification_token field
-            user.verification_token = token
-            user.verification_token_expires = datetime.utcnow() + timedelta(hours=24)
-            
+            # Issue a new token; the user's previous verification tokens are invalidated
+            token = get_token_store(self.db).issue(
+                user_id,
+                EMAIL_VERIFICATION,
+                timedelta(hours=settings.ONE_TIME_TOKEN_EXPIRY_HOURS)
+            )
             self.db.commit()
             logger.info(f"Generated verification token for user: {user.email}")
             
@@ -252,13 +257,9 @@ class UserService:
             HTTPException: If token is invalid or expired
         """
         try:
-            # Find user with matching token
-            user = self.db.query(User).filter(
-                and_(
-                    User.verification_token == token,
-                    User.verification_token_expires > datetime.utcnow()
-                )
-            ).first()
+            # Use up the token
+            user_id = get_token_store(self.db).consume(token, EMAIL_VERIFICATION)
+            user = self.db.query(User).filter(User.id == user_id).first() if user_id else None
 
             if not user:
                 raise HTTPException(
@@ -268,11 +269,10 @@ class UserService:
 
             # Update user's verification status
             user.is_verified = True
-            user.verification_token = None
-            user.verification_token_expires = None
             user.updated_at = datetime.utcnow()
             
             self.db.commit()
+            invalidate_profile(user.id)
             logger.info(f"Email verified for user: {user.email}")
             
             return user
@@ -350,21 +350,20 @@ class UserService:
                 is_active=True
             )
             self.db.add(new_session)
+
+            # Send password change notification email once the change commits
+            enqueue_task(
+                self.db,
+                send_password_change_notification,
+                to_email=user.email,
+                username=f"{user.first_name} {user.last_name}",
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
             
             # Commit all changes
             self.db.commit()
-            
-            # Send password change notification email
-            try:
-                send_password_change_notification.delay(
-                    to_email=user.email,
-                    username=f"{user.first_name} {user.last_name}",
-                    ip_address=ip_address,
-                    user_agent=user_agent
-                )
-            except Exception as e:
-                logger.error(f"Failed to send password change notification email: {str(e)}")
-                # Don't raise the exception as the password change was successful
+            invalidate_profile(user.id)
             
             logger.info(f"Password changed successfully for user {user.email}")
             return tokens
@@ -400,6 +399,7 @@ class UserService:
             user.role = new_role
             user.updated_at = datetime.utcnow()
             self.db.commit()
+            invalidate_profile(user.id)
             self.db.refresh(user)
             return UserResponse.from_orm(user)
         except HTTPException:
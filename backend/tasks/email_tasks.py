@@ -8,7 +8,7 @@ from models.user import User
 from datetime import datetime, timedelta
 from sqlalchemy import and_
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_email(to_email: str, subject: str, body: str) -> dict:
     """
     Send an email using Mailgun API.
@@ -27,7 +27,7 @@ def send_email(to_email: str, subject: str, body: str) -> dict:
         
     return mail_service.send_email(to_email, subject, body)
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_welcome_email(to_email: str, username: str) -> dict:
     """
     Send a welcome email to a new user.
@@ -54,7 +54,7 @@ def send_welcome_email(to_email: str, username: str) -> dict:
     """
     return mail_service.send_email(to_email, subject, body)
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_password_reset_email(to_email: str, reset_token: str) -> dict:
     """
     Send a password reset email.
@@ -87,7 +87,7 @@ def send_password_reset_email(to_email: str, reset_token: str) -> dict:
     """
     return mail_service.send_email(to_email, subject, body)
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_password_change_notification(to_email: str, username: str, ip_address: str = None, user_agent: str = None) -> dict:
     """
     Send a notification email when a user changes their password.
@@ -139,7 +139,7 @@ def send_password_change_notification(to_email: str, username: str, ip_address:
     
     return mail_service.send_email(to_email, subject, body)
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_login_notification(to_email: str, username: str, ip_address: str = None, user_agent: str = None) -> dict:
     """
     Send a notification email when a user logs in.
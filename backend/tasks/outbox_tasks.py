@@ -0,0 +1,43 @@
+from core.logger import logger
+from core.chunked_job import ChunkedJob
+from core.config import settings
+from core.outbox import relay_outbox
+from core.unique_task import unique_task
+from core.lease_lock import with_lease
+from datetime import datetime, timedelta
+
+@unique_task("", ttl=60, name="relay_outbox", ignore_result=True)
+def relay_outbox_messages():
+    """
+    Publish the tasks written to the outbox by committed transactions.
+    """
+    try:
+        stats = relay_outbox()
+        if stats["published"] or stats["failed"]:
+            logger.info(f"Outbox relay published {stats['published']} messages, {stats['failed']} failed")
+        return {"status": "success", **stats}
+    except Exception as e:
+        logger.error(f"Error relaying outbox messages: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+@unique_task("", ttl=3600, name="cleanup_sent_outbox")
+@with_lease("cleanup_sent_outbox")
+def cleanup_sent_outbox():
+    """
+    Delete the outbox messages sent more than OUTBOX_RETENTION_HOURS ago, one primary key chunk at a time.
+    """
+    try:
+        sent_before = datetime.utcnow() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        job = ChunkedJob(
+            "cleanup_sent_outbox",
+            "outbox_messages",
+            "DELETE FROM outbox_messages WHERE id BETWEEN :first_id AND :last_id AND sent_at < :sent_before",
+            params={"sent_before": sent_before}
+        )
+        stats = job.run()
+        logger.info(f"Cleaned up {stats['rows']} sent outbox messages")
+        return {"status": "success", "deleted_messages": stats["rows"]}
+
+    except Exception as e:
+        logger.error(f"Error cleaning up sent outbox messages: {str(e)}")
+        return {"status": "error", "error": str(e)}
@@ -1,85 +1,72 @@
-from core.celery_app import celery_app
 from core.logger import logger
 from sqlalchemy.orm import Session
-from core.database import SessionLocal
-from models.password_reset import PasswordReset
+from core.database import task_session
+from core.chunked_job import ChunkedJob
+from core.unique_task import unique_task
+from core.lease_lock import with_lease
+from core.token_store import get_token_store, PASSWORD_RESET
 from models.user import User
-from datetime import datetime, timedelta
-from sqlalchemy import and_
+from datetime import datetime
 from tasks.email_tasks import send_password_reset_email
 
-@celery_app.task(name="cleanup_expired_password_resets")
-def cleanup_expired_password_resets():
+@unique_task("", ttl=3600, name="cleanup_expired_tokens")
+@with_lease("cleanup_expired_tokens")
+def cleanup_expired_tokens():
     """
-    Clean up expired password reset tokens.
+    Delete expired and used one-time tokens (password reset, email verification), one primary key chunk at a time.
+    Tokens in the Redis store expire by themselves.
     """
     try:
-        db = SessionLocal()
-        # Find and delete expired password reset tokens
-        expired_resets = db.query(PasswordReset).filter(
-            PasswordReset.expires_at < datetime.utcnow()
-        ).all()
-
-        for reset in expired_resets:
-            db.delete(reset)
-            logger.info(f"Deleted expired password reset token for user: {reset.user_id}")
-
-        db.commit()
-        logger.info(f"Cleaned up {len(expired_resets)} expired password reset tokens")
-        return {"status": "success", "deleted_tokens": len(expired_resets)}
+        job = ChunkedJob(
+            "cleanup_expired_tokens",
+            "one_time_tokens",
+            "DELETE FROM one_time_tokens WHERE id BETWEEN :first_id AND :last_id AND (expires_at < :now OR is_used = 1)",
+            params={"now": datetime.utcnow()}
+        )
+        stats = job.run()
+        logger.info(f"Cleaned up {stats['rows']} expired one-time tokens")
+        return {"status": "success", "deleted_tokens": stats["rows"]}
 
     except Exception as e:
-        logger.error(f"Error cleaning up expired password reset tokens: {str(e)}")
+        logger.error(f"Error cleaning up expired one-time tokens: {str(e)}")
         return {"status": "error", "error": str(e)}
-    finally:
-        db.close()
 
-@celery_app.task(name="send_password_reset_notification")
+# Keyed by token too: each new reset token invalidates the previous one, whose email must not stand in for it
+@unique_task("{user_id}:{reset_token}", ttl=600, name="send_password_reset_notification", ignore_result=True)
 def send_password_reset_notification(user_id: int, reset_token: str):
     """
     Send password reset notification email.
     """
     try:
-        db = SessionLocal()
-        user = db.query(User).filter(User.id == user_id).first()
-        
-        if not user:
-            logger.error(f"User not found: {user_id}")
-            return {"status": "error", "error": "User not found"}
+        with task_session() as db:
+            user = db.query(User).filter(User.id == user_id).first()
+            
+            if not user:
+                logger.error(f"User not found: {user_id}")
+                return {"status": "error", "error": "User not found"}
 
-        # Send password reset email
-        send_password_reset_email.delay(user.email, reset_token)
-        logger.info(f"Sent password reset notification to user: {user.email}")
-        return {"status": "success", "user_id": user_id}
+            # Send password reset email
+            send_password_reset_email.delay(user.email, reset_token)
+            logger.info(f"Sent password reset notification to user: {user.email}")
+            return {"status": "success", "user_id": user_id}
 
     except Exception as e:
         logger.error(f"Error sending password reset notification: {str(e)}")
         return {"status": "error", "error": str(e)}
-    finally:
-        db.close()
 
-@celery_app.task(name="invalidate_user_password_resets")
+@unique_task("{user_id}", ttl=300, name="invalidate_user_password_resets", ignore_result=True)
 def invalidate_user_password_resets(user_id: int):
     """
     Invalidate all password reset tokens for a specific user.
     """
     try:
-        db = SessionLocal()
-        # Find and invalidate all password reset tokens for the user
-        resets = db.query(PasswordReset).filter(
-            PasswordReset.user_id == user_id
-        ).all()
+        with task_session() as db:
+            # Invalidate all password reset tokens of the user in one statement
+            invalidated = get_token_store(db).invalidate(user_id, PASSWORD_RESET)
 
-        for reset in resets:
-            reset.is_used = True
-            logger.info(f"Invalidated password reset token for user: {user_id}")
-
-        db.commit()
-        logger.info(f"Invalidated {len(resets)} password reset tokens for user: {user_id}")
-        return {"status": "success", "invalidated_tokens": len(resets)}
+        logger.info(f"Invalidated {invalidated} password reset tokens for user: {user_id}")
+        return {"status": "success", "invalidated_tokens": invalidated}
 
     except Exception as e:
         logger.error(f"Error invalidating password reset tokens: {str(e)}")
-        return {"status": "error", "error": str(e)}
-    finally:
-        db.close() 
\ No newline at end of file
+        return {"status": "error", "error": str(e)} 
\ No newline at end of file
@@ -0,0 +1,64 @@
+from core.celery_app import celery_app
+from core.logger import logger
+from core.database import task_session
+from services.import_job.import_job_service import ImportJobService
+from services.city.city_service import CityService
+from services.city.city_store import CityStoreBuilder
+from services.country.country_service import CountryService
+
+@celery_app.task(name="import_reference_data", acks_late=True, reject_on_worker_lost=True)
+def import_reference_data(job_id: int):
+    """
+    Import a reference dataset (countries or cities) for an import job.
+    Each batch commits together with the job checkpoint, so a crashed or
+    re-delivered job resumes from the last committed batch.
+
+    Args:
+        job_id (int): ID of the import job to run
+    """
+    with task_session() as db:
+        try:
+            job_service = ImportJobService(db)
+            job = job_service.start_run(job_id)
+            base = job_service.get_counters(job)
+
+            def on_batch(processed_rows: int, total_rows: int, stats: dict) -> None:
+                job_service.record_checkpoint(job, base, processed_rows, total_rows, stats)
+
+            logger.info(f"Running import job {job.id} for {job.dataset} from row {job.processed_rows}")
+            if job.dataset == "cities":
+                CityService(db).initialize_cities(start_row=job.processed_rows or 0, on_batch=on_batch)
+            else:
+                CountryService(db).initialize_countries(start_row=job.processed_rows or 0, on_batch=on_batch)
+
+            job_service.complete(job)
+
+        except Exception as e:
+            logger.error(f"Error running import job {job_id}: {str(e)}")
+            ImportJobService(db).fail(job_id, str(e))
+            return {"status": "error", "error": str(e)}
+
+        if job.dataset == "cities":
+            # Publish a new memory-mapped city store for the API workers. The import is
+            # committed by now: a failed build must not mark the job as failed.
+            try:
+                CityStoreBuilder(db).build()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error building the city store after import job {job_id}: {str(e)}")
+        return {"status": "success", "job_id": job_id}
+
+@celery_app.task(name="build_city_store")
+def build_city_store():
+    """
+    Rebuild the memory-mapped city store from the cities table.
+    Enqueued after city writes; imports rebuild the store inline.
+    """
+    try:
+        with task_session() as db:
+            path = CityStoreBuilder(db).build()
+        return {"status": "success", "version": path.name}
+    except Exception as e:
+        logger.error(f"Error building city store: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
@@ -1,72 +1,82 @@
 from core.celery_app import celery_app
 from core.logger import logger
 from sqlalchemy.orm import Session
-from core.database import SessionLocal
+from core.database import task_session
+from core.chunked_job import ChunkedJob
+from core.unique_task import unique_task
+from core.lease_lock import with_lease
 from models.session import Session as SessionModel
+from services.user.session_partition_service import SessionPartitionService
 from datetime import datetime, timedelta
 from sqlalchemy import and_
 from celery import shared_task
 
-@shared_task(name="cleanup_expired_sessions")
+@unique_task("", ttl=3600, name="cleanup_expired_sessions")
+@with_lease("cleanup_expired_sessions")
 def cleanup_expired_sessions():
     """
-    Clean up expired sessions from the database.
+    Clean up expired sessions from the database, one primary key chunk at a time.
     """
     try:
-        db = SessionLocal()
-        try:
-            # Delete expired sessions
-            expired_sessions = db.query(SessionModel).filter(
-                SessionModel.expires_at < datetime.utcnow()
-            ).all()
-            
-            for session in expired_sessions:
-                db.delete(session)
-            
-            db.commit()
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
-            
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error cleaning up expired sessions: {str(e)}")
-            raise
-        finally:
-            db.close()
+        job = ChunkedJob(
+            "cleanup_expired_sessions",
+            "sessions",
+            "DELETE FROM sessions WHERE id BETWEEN :first_id AND :last_id AND expires_at < :now",
+            params={"now": datetime.utcnow()}
+        )
+        stats = job.run()
+        logger.info(f"Cleaned up {stats['rows']} expired sessions")
+        return stats
             
     except Exception as e:
         logger.error(f"Error in cleanup_expired_sessions task: {str(e)}")
         raise
 
-@shared_task(name="invalidate_all_sessions")
+@unique_task("", ttl=3600, name="maintain_session_partitions")
+@with_lease("maintain_session_partitions")
+def maintain_session_partitions():
+    """
+    Add the coming monthly partitions of sessions and drop the partitions whose sessions
+    have all expired. Falls back to the chunked delete when sessions is not partitioned
+    (e.g. a table created by create_all instead of the migrations).
+    """
+    try:
+        with task_session() as db:
+            partition_service = SessionPartitionService(db)
+            partitioned = bool(partition_service.get_partitions())
+            if partitioned:
+                result = partition_service.maintain()
+
+        if not partitioned:
+            logger.warning("sessions is not partitioned; deleting expired sessions row by row")
+            return cleanup_expired_sessions()
+        logger.info(f"Session partitions added: {result['added']}, dropped: {result['dropped']}")
+        return {"status": "success", **result}
+
+    except Exception as e:
+        logger.error(f"Error in maintain_session_partitions task: {str(e)}")
+        raise
+
+@shared_task(name="invalidate_all_sessions", ignore_result=True)
 def invalidate_all_sessions():
     """
     Invalidate all existing sessions.
     This is useful when rotating JWT secret keys or during security incidents.
     """
     try:
-        db = SessionLocal()
-        try:
+        with task_session() as db:
             # Mark all sessions as inactive
             db.query(SessionModel).update({
                 SessionModel.is_active: False,
                 SessionModel.updated_at: datetime.utcnow()
             })
-            
-            db.commit()
-            logger.info("All sessions have been invalidated")
-            
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error invalidating sessions: {str(e)}")
-            raise
-        finally:
-            db.close()
+        logger.info("All sessions have been invalidated")
             
     except Exception as e:
         logger.error(f"Error in invalidate_all_sessions task: {str(e)}")
         raise
 
-@shared_task(name="invalidate_user_sessions")
+@unique_task("{user_id}", ttl=300, name="invalidate_user_sessions", ignore_result=True)
 def invalidate_user_sessions(user_id: int):
     """
     Invalidate all sessions for a specific user.
@@ -75,8 +85,7 @@ def invalidate_user_sessions(user_id: int):
         user_id (int): ID of the user whose sessions should be invalidated
     """
     try:
-        db = SessionLocal()
-        try:
+        with task_session() as db:
             # Mark all user's sessions as inactive
             db.query(SessionModel).filter(
                 SessionModel.user_id == user_id
@@ -84,47 +93,32 @@ def invalidate_user_sessions(user_id: int):
                 SessionModel.is_active: False,
                 SessionModel.updated_at: datetime.utcnow()
             })
-            
-            db.commit()
-            logger.info(f"All sessions for user {user_id} have been invalidated")
-            
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error invalidating user sessions: {str(e)}")
-            raise
-        finally:
-            db.close()
+        logger.info(f"All sessions for user {user_id} have been invalidated")
             
     except Exception as e:
         logger.error(f"Error in invalidate_user_sessions task: {str(e)}")
         raise
 
-@celery_app.task(name="check_session_activity")
+@unique_task("", ttl=3600, name="check_session_activity")
+@with_lease("check_session_activity")
 def check_session_activity():
     """
-    Check for inactive sessions and invalidate them.
+    Check for inactive sessions and invalidate them, one primary key chunk at a time.
     """
     try:
-        db = SessionLocal()
-        # Find sessions with no activity for more than 24 hours
+        # Sessions with no activity for more than 24 hours
         inactive_threshold = datetime.utcnow() - timedelta(hours=24)
-        inactive_sessions = db.query(SessionModel).filter(
-            and_(
-                SessionModel.last_activity < inactive_threshold,
-                SessionModel.is_active == True
-            )
-        ).all()
-
-        for session in inactive_sessions:
-            session.is_active = False
-            logger.info(f"Invalidated inactive session for user: {session.user_id}")
-
-        db.commit()
-        logger.info(f"Checked and invalidated {len(inactive_sessions)} inactive sessions")
-        return {"status": "success", "invalidated_sessions": len(inactive_sessions)}
+        job = ChunkedJob(
+            "check_session_activity",
+            "sessions",
+            "UPDATE sessions SET is_active = 0 WHERE id BETWEEN :first_id AND :last_id "
+            "AND last_activity < :inactive_threshold AND is_active = 1",
+            params={"inactive_threshold": inactive_threshold}
+        )
+        stats = job.run()
+        logger.info(f"Checked and invalidated {stats['rows']} inactive sessions")
+        return {"status": "success", "invalidated_sessions": stats["rows"]}
 
     except Exception as e:
         logger.error(f"Error checking session activity: {str(e)}")
-        return {"status": "error", "error": str(e)}
-    finally:
-        db.close() 
\ No newline at end of file
+        return {"status": "error", "error": str(e)} 
\ No newline at end of file
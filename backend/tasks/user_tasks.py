@@ -1,59 +1,85 @@
 from core.celery_app import celery_app
 from core.logger import logger
+from core.profile_cache import invalidate_profile
 from sqlalchemy.orm import Session
-from core.database import SessionLocal
+from core.database import task_session
+from core.chunked_job import ChunkedJob
+from core.unique_task import unique_task
+from core.lease_lock import with_lease
+from core.celeryconfig import PRIORITY_LOW
 from models.user import User
+from services.user.user_rollup_service import UserRollupService
+from services.user.account_erasure_service import AccountErasureService
 from datetime import datetime, timedelta
-from sqlalchemy import and_
+from sqlalchemy import and_, text, bindparam
 
-@celery_app.task(name="cleanup_inactive_users")
+class DeactivateInactiveUsersJob(ChunkedJob):
+    """Deactivate users who have not logged in since a date, moving them out of the rollups."""
+
+    def __init__(self, last_login_before: datetime):
+        super().__init__("cleanup_inactive_users", "users", params={"last_login_before": last_login_before})
+        self.deactivated_ids = []
+
+    def process_chunk(self, db, first_id: int, last_id: int) -> int:
+        users = db.execute(
+            text(
+                "SELECT id, country_id, city_id FROM users WHERE id BETWEEN :first_id AND :last_id "
+                "AND last_login < :last_login_before AND is_active = 1 FOR UPDATE"
+            ),
+            {**self.params, "first_id": first_id, "last_id": last_id}
+        ).all()
+        if not users:
+            self.deactivated_ids = []
+            return 0
+
+        self.deactivated_ids = [user.id for user in users]
+        db.execute(
+            text("UPDATE users SET is_active = 0 WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": self.deactivated_ids}
+        )
+        UserRollupService(db).apply(((user.country_id, user.city_id), None) for user in users)
+        return len(users)
+
+    def after_commit(self) -> None:
+        for user_id in self.deactivated_ids:
+            invalidate_profile(user_id)
+
+@unique_task("", ttl=3600, name="cleanup_inactive_users")
+@with_lease("cleanup_inactive_users")
 def cleanup_inactive_users():
     """
-    Clean up inactive users who haven't logged in for a long time.
+    Clean up inactive users who haven't logged in for a long time, one primary key chunk at a time.
     """
     try:
-        db = SessionLocal()
-        # Find users who haven't logged in for 6 months
+        # Users who haven't logged in for 6 months
         six_months_ago = datetime.utcnow() - timedelta(days=180)
-        inactive_users = db.query(User).filter(
-            and_(
-                User.last_login < six_months_ago,
-                User.is_active == True
-            )
-        ).all()
-
-        for user in inactive_users:
-            user.is_active = False
-            logger.info(f"Deactivated inactive user: {user.email}")
-
-        db.commit()
-        logger.info(f"Cleaned up {len(inactive_users)} inactive users")
-        return {"status": "success", "deactivated_users": len(inactive_users)}
+        stats = DeactivateInactiveUsersJob(six_months_ago).run()
+        logger.info(f"Cleaned up {stats['rows']} inactive users")
+        return {"status": "success", "deactivated_users": stats["rows"]}
 
     except Exception as e:
         logger.error(f"Error cleaning up inactive users: {str(e)}")
         return {"status": "error", "error": str(e)}
-    finally:
-        db.close()
 
-@celery_app.task(name="send_inactivity_notification")
+@unique_task("{user_id}", ttl=3600, name="send_inactivity_notification", ignore_result=True)
 def send_inactivity_notification(user_id: int):
     """
     Send notification to users who haven't logged in for a while.
     """
     try:
-        db = SessionLocal()
-        user = db.query(User).filter(User.id == user_id).first()
+        with task_session() as db:
+            user = db.query(User).filter(User.id == user_id).first()
         
-        if not user:
-            logger.error(f"User not found: {user_id}")
-            return {"status": "error", "error": "User not found"}
+            if not user:
+                logger.error(f"User not found: {user_id}")
+                return {"status": "error", "error": "User not found"}
+            email, first_name = user.email, user.first_name
 
         # Send email notification
         from tasks.email_tasks import send_email
         subject = "We Miss You!"
         body = f"""
-        Hello {user.first_name},
+        Hello {first_name},
 
         We noticed you haven't logged in for a while. We hope everything is okay!
         Come back and check out what's new.
@@ -61,20 +87,66 @@ def send_inactivity_notification(user_id: int):
         Best regards,
         The Team
         """
-        html_body = f"""
-        <h1>We Miss You!</h1>
-        <p>Hello {user.first_name},</p>
-        <p>We noticed you haven't logged in for a while. We hope everything is okay!</p>
-        <p>Come back and check out what's new.</p>
-        <p>Best regards,<br>The Team</p>
-        """
-        
-        send_email.delay(user.email, subject, body, html_body)
-        logger.info(f"Sent inactivity notification to user: {user.email}")
+
+        # One of many: keep it off the transactional queue
+        send_email.apply_async((email, subject, body), queue="bulk", priority=PRIORITY_LOW)
+        logger.info(f"Sent inactivity notification to user: {email}")
         return {"status": "success", "user_id": user_id}
 
     except Exception as e:
         logger.error(f"Error sending inactivity notification: {str(e)}")
         return {"status": "error", "error": str(e)}
-    finally:
-        db.close() 
\ No newline at end of file
+
+@unique_task("", ttl=3600, name="rebuild_user_rollups")
+@with_lease("rebuild_user_rollups")
+def rebuild_user_rollups():
+    """
+    Rebuild the user counts per country, state and city from users and cities,
+    correcting any drift of the incremental updates.
+    """
+    try:
+        with task_session() as db:
+            UserRollupService(db).rebuild()
+        return {"status": "success"}
+    except Exception as e:
+        logger.error(f"Error rebuilding user rollups: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+@celery_app.task(name="erase_user_account", acks_late=True, reject_on_worker_lost=True)
+def erase_user_account(erasure_id: int):
+    """
+    Erase a user account table by table for an account erasure.
+    Each batch commits together with the erasure checkpoint, so a crashed or
+    re-delivered erasure resumes from its current step.
+
+    Args:
+        erasure_id (int): ID of the account erasure to run
+    """
+    with task_session() as db:
+        try:
+            erasure_service = AccountErasureService(db)
+            erasure = erasure_service.start_run(erasure_id)
+            logger.info(f"Running erasure {erasure.id} of user {erasure.user_id} from step {erasure.step}")
+            erasure_service.run(erasure)
+            return {"status": "success", "erasure_id": erasure_id}
+
+        except Exception as e:
+            logger.error(f"Error running account erasure {erasure_id}: {str(e)}")
+            AccountErasureService(db).fail(erasure_id, str(e))
+            return {"status": "error", "error": str(e)}
+
+@unique_task("", ttl=900, name="resume_account_erasures")
+@with_lease("resume_account_erasures")
+def resume_account_erasures():
+    """
+    Re-enqueue the account erasures whose worker died without failing them.
+    """
+    try:
+        with task_session() as db:
+            resumed = AccountErasureService(db).resume_stale()
+        if resumed:
+            logger.info(f"Resumed {resumed} stale account erasures")
+        return {"status": "success", "resumed_erasures": resumed}
+    except Exception as e:
+        logger.error(f"Error resuming account erasures: {str(e)}")
+        return {"status": "error", "error": str(e)}